@@ -77,8 +77,8 @@ class AnsibleInventoryGenerator:
             )
 
         # Add host variables
-        if host.host_vars:
-            host_data.update(host.host_vars)
+        for var in host.structured_variables.all():
+            host_data[var.key] = var.get_typed_value()
 
         # Add host type information
         host_data["host_type"] = host.host_type
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Ansible dynamic inventory script backed by the inventory API.
+
+Fetches the whole inventory, including ``_meta.hostvars``, with a single request
+and caches it locally so that ``--host`` lookups and repeated runs do not hit
+the API. Only the standard library is required on the Ansible controller.
+
+Configuration is read from the environment:
+
+    INVENTORY_API_URL     Base URL of the API, e.g. https://inventory.example.com
+    INVENTORY_API_TOKEN   API token (sent as ``Authorization: Token <token>``)
+    INVENTORY_ID          ID of the AnsibleInventory to load
+    INVENTORY_CACHE_PATH  Cache file (default: ~/.cache/inventory_api/<id>.json)
+    INVENTORY_CACHE_TTL   Seconds before the cache is revalidated (default: 300)
+
+Usage:
+
+    ansible-playbook -i dynamic_inventory.py site.yml
+    ./dynamic_inventory.py --list
+    ./dynamic_inventory.py --host web-01
+    ./dynamic_inventory.py --list --refresh-cache
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Optional
+
+
+def _cache_path(inventory_id: str) -> str:
+    default = os.path.join(
+        os.path.expanduser("~"), ".cache", "inventory_api", f"{inventory_id}.json"
+    )
+    return os.environ.get("INVENTORY_CACHE_PATH", default)
+
+
+def _read_cache(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_cache(path: str, cache: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+
+def _fetch(url: str, token: str, etag: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Return the fresh inventory and its ETag, or None when unchanged (304)"""
+    request = urllib.request.Request(url, headers={"Accept": "application/json"})
+    if token:
+        request.add_header("Authorization", f"Token {token}")
+    if etag:
+        request.add_header("If-None-Match", etag)
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return {
+                "etag": response.headers.get("ETag"),
+                "inventory": json.load(response),
+            }
+    except urllib.error.HTTPError as exc:
+        if exc.code == 304:
+            return None
+        raise
+
+
+def load_inventory(refresh: bool = False) -> Dict[str, Any]:
+    base_url = os.environ["INVENTORY_API_URL"].rstrip("/")
+    inventory_id = os.environ["INVENTORY_ID"]
+    token = os.environ.get("INVENTORY_API_TOKEN", "")
+    ttl = int(os.environ.get("INVENTORY_CACHE_TTL", "300"))
+    path = _cache_path(inventory_id)
+
+    cache = _read_cache(path)
+    if cache and not refresh and time.time() - cache.get("fetched_at", 0) < ttl:
+        return cache["inventory"]
+
+    url = f"{base_url}/api/v1/ansible-inventories/{inventory_id}/dynamic_inventory"
+    etag = cache.get("etag") if cache and not refresh else None
+    try:
+        fresh = _fetch(url, token, etag)
+    except (urllib.error.URLError, OSError):
+        # Serve a stale inventory rather than failing the playbook run
+        if cache:
+            return cache["inventory"]
+        raise
+
+    # A 304 only happens when a cached copy was sent for revalidation
+    cache = {**(cache or {}), **(fresh or {}), "fetched_at": time.time()}
+    _write_cache(path, cache)
+    return cache["inventory"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Ansible dynamic inventory for the inventory API")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--list", action="store_true", help="Print the whole inventory")
+    group.add_argument("--host", help="Print the variables of one host")
+    parser.add_argument(
+        "--refresh-cache", action="store_true", help="Ignore the local cache and refetch"
+    )
+    args = parser.parse_args()
+
+    inventory = load_inventory(refresh=args.refresh_cache)
+    if args.host:
+        output = inventory.get("_meta", {}).get("hostvars", {}).get(args.host, {})
+    else:
+        output = inventory
+    json.dump(output, sys.stdout)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
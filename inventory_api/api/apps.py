@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "inventory_api.api"
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401
@@ -0,0 +1,138 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import connection
+
+from . import models
+
+# Levels of the physical hierarchy, top down: (name, model, field linking to the
+# level above, key of the children list in the report)
+LEVELS = [
+    ("fab", models.Fab, None, "fabs"),
+    ("phase", models.Phase, "fab", "phases"),
+    ("datacenter", models.DataCenter, "phase", "data_centers"),
+    ("room", models.Room, "datacenter", "rooms"),
+    ("rack", models.Rack, "room", "racks"),
+]
+
+STATUSES = [status for status, _ in models.Baremetal._meta.get_field("status").choices]
+AVAILABLE_FIELDS = ["available_cpu", "available_memory", "available_storage", "available_gpu"]
+
+
+def _column(model: Any, field: str) -> str:
+    return connection.ops.quote_name(model._meta.get_field(field).column)
+
+
+def _table(model: Any) -> str:
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _from_clause() -> str:
+    """Baremetals joined up through their rack to the fab; t<depth> aliases each level"""
+    last = len(LEVELS) - 1
+    rack = LEVELS[last][1]
+    sql = (
+        f"{_table(models.Baremetal)} b LEFT JOIN {_table(rack)} t{last} "
+        f"ON t{last}.{_column(rack, 'id')} = b.{_column(models.Baremetal, 'rack')}"
+    )
+    for depth in range(len(LEVELS) - 1, 0, -1):
+        _, model, parent_field, _ = LEVELS[depth]
+        parent = LEVELS[depth - 1][1]
+        sql += (
+            f" LEFT JOIN {_table(parent)} t{depth - 1} ON t{depth - 1}.{_column(parent, 'id')}"
+            f" = t{depth}.{_column(model, parent_field)}"
+        )
+    return sql
+
+
+def _metrics_clause() -> Tuple[str, List[str]]:
+    status = _column(models.Baremetal, "status")
+    metrics = ["COUNT(*)"]
+    metrics += [f"SUM(CASE WHEN b.{status} = %s THEN 1 ELSE 0 END)" for _ in STATUSES]
+    metrics += [f"SUM(b.{_column(models.Baremetal, field)})" for field in AVAILABLE_FIELDS]
+    return ", ".join(metrics), list(STATUSES)
+
+
+def _keys(depth: int) -> List[str]:
+    return [
+        f"t{level}.{_column(model, field)}"
+        for level, (_, model, _, _) in enumerate(LEVELS[:depth])
+        for field in ("id", "name")
+    ]
+
+
+def rollup_sql(vendor: Optional[str] = None) -> Tuple[str, List[str]]:
+    """
+    One statement returning a row per node of the hierarchy and one for the whole
+    fleet: the (id, name) of every level, a GROUPING() bitmask of the levels
+    rolled up (depth = levels - set bits) and the node's metrics. PostgreSQL uses
+    GROUP BY ROLLUP; other databases get the same rows from a UNION ALL of one
+    GROUP BY per depth.
+    """
+    metrics, params = _metrics_clause()
+    source = _from_clause()
+    levels = len(LEVELS)
+    if (vendor or connection.vendor) == "postgresql":
+        ids = ", ".join(
+            f"t{level}.{_column(model, 'id')}" for level, (_, model, _, _) in enumerate(LEVELS)
+        )
+        sets = ", ".join(f"({', '.join(_keys(level + 1)[-2:])})" for level in range(levels))
+        sql = (
+            f"SELECT {', '.join(_keys(levels))}, GROUPING({ids}), {metrics} "
+            f"FROM {source} GROUP BY ROLLUP ({sets})"
+        )
+        return sql, params
+    branches = []
+    for depth in range(levels + 1):
+        keys = _keys(depth)
+        columns = keys + ["NULL"] * (2 * (levels - depth)) + [str((1 << (levels - depth)) - 1)]
+        group_by = f" GROUP BY {', '.join(keys)}" if keys else ""
+        branches.append(f"SELECT {', '.join(columns)}, {metrics} FROM {source}{group_by}")
+    return " UNION ALL ".join(branches), params * (levels + 1)
+
+
+def _node(row: Tuple[Any, ...]) -> Dict[str, Any]:
+    counts = row[: len(STATUSES) + 1]
+    sums = row[len(STATUSES) + 1 :]
+    return {
+        "baremetals": counts[0] or 0,
+        "status": {status: count or 0 for status, count in zip(STATUSES, counts[1:])},
+        **{field: value or 0 for field, value in zip(AVAILABLE_FIELDS, sums)},
+    }
+
+
+def fleet_rollup() -> Dict[str, Any]:
+    """
+    Baremetal counts by status and summed available_* for the whole fleet and for
+    every fab, phase, data center, room and rack, as a tree, from one query.
+    Baremetals outside a level (e.g. without a rack) are grouped under an entry
+    whose id and name are null.
+    """
+    sql, params = rollup_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    levels = len(LEVELS)
+    nodes: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    depths = [(levels - bin(row[2 * levels]).count("1"), row) for row in rows]
+    # Parents first, so every node finds the children list of its parent
+    for depth, row in sorted(depths, key=lambda item: item[0]):
+        node = _node(row[2 * levels + 1 :])
+        if depth == 0:
+            nodes[()] = {**node, LEVELS[0][3]: []}
+            continue
+        _, model, _, _ = LEVELS[depth - 1]
+        raw_id, name = row[2 * (depth - 1)], row[2 * depth - 1]
+        path = tuple(row[: 2 * depth : 2])
+        node = {"id": model._meta.pk.to_python(raw_id), "name": name, **node}
+        if depth < levels:
+            node[LEVELS[depth][3]] = []
+        nodes[path] = node
+        nodes[path[:-1]][LEVELS[depth - 1][3]].append(node)
+
+    for node in nodes.values():
+        for _, _, _, children in LEVELS:
+            if children in node:
+                node[children].sort(key=lambda child: (child["name"] is None, child["name"] or ""))
+    # GROUP BY () always yields the fleet row, even without baremetals
+    return nodes[()]
@@ -0,0 +1,333 @@
+import csv
+import io
+import json
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Model
+
+from . import models
+from .models.baremetal import AVAILABLE_CAPACITY_FIELDS
+from .signals import bulk_created, bulk_updated, stored_values
+
+IMPORT_CHUNK_SIZE = 5000
+
+# Row errors kept in the report; the count covers all of them
+MAX_REPORTED_ERRORS = 100
+
+# Importable row types. ``fields`` are copied from the row, ``parents`` are columns
+# holding the external_system_id of a parent in the hierarchy, and ``lookups`` are
+# columns holding a natural key of a model without an external_system_id.
+# ``before_create`` sets the ``derived`` fields, which rows cannot hold, on the
+# new objects of each chunk; ``after_create`` is called with them once inserted.
+IMPORT_SPECS: Dict[str, Dict[str, Any]] = {
+    "fab": {"model": models.Fab, "fields": ["name"], "parents": {}, "lookups": {}},
+    "phase": {
+        "model": models.Phase,
+        "fields": ["name"],
+        "parents": {"fab": models.Fab},
+        "lookups": {},
+    },
+    "datacenter": {
+        "model": models.DataCenter,
+        "fields": ["name"],
+        "parents": {"phase": models.Phase},
+        "lookups": {},
+    },
+    "room": {
+        "model": models.Room,
+        "fields": ["name"],
+        "parents": {"datacenter": models.DataCenter},
+        "lookups": {},
+    },
+    "rack": {
+        "model": models.Rack,
+        "fields": [
+            "name",
+            "bgp_number",
+            "as_number",
+            "height_units",
+            "power_capacity",
+            "status",
+        ],
+        "parents": {"room": models.Room},
+        "lookups": {},
+        "after_create": models.provision_rack_units,
+    },
+    "baremetal": {
+        "model": models.Baremetal,
+        "fields": [
+            "name",
+            "serial_number",
+            "room",
+            "status",
+        ],
+        "parents": {
+            "fabrication": models.Fab,
+            "phase": models.Phase,
+            "data_center": models.DataCenter,
+            "rack": models.Rack,
+        },
+        "lookups": {
+            "model": (models.BaremetalModel, "name"),
+            "group": (models.BaremetalGroup, "name"),
+            "pr": (models.PurchaseRequisition, "pr_number"),
+            "po": (models.PurchaseOrder, "po_number"),
+        },
+        "derived": AVAILABLE_CAPACITY_FIELDS,
+        "before_create": models.Baremetal.derive_initial_capacity,
+    },
+}
+
+
+class RowError(Exception):
+    pass
+
+
+def iter_csv_rows(stream: IO[str]) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """(line number, row) pairs of a CSV file with a header line"""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def iter_ndjson_rows(stream: IO[str]) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """(line number, row) pairs of a newline-delimited JSON file; None for malformed lines"""
+    for line_num, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_num, row if isinstance(row, dict) else None
+
+
+ROW_READERS = {"csv": iter_csv_rows, "ndjson": iter_ndjson_rows}
+
+
+def open_text(stream: IO[bytes]) -> IO[str]:
+    """Decode an uploaded or opened binary file lazily, line by line"""
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+
+class HierarchyImporter:
+    """
+    Upsert Fab/Phase/DataCenter/Room/Rack/Baremetal rows keyed on external_system_id.
+
+    Rows are processed in chunks of ``chunk_size``: each chunk costs one query to
+    find the existing rows, one bulk_create and one bulk_update per row type, in
+    its own transaction. Parents are resolved through an in-memory map of
+    external_system_id -> pk that is filled on first use and kept up to date as
+    rows are written, so parents must come before their children in the stream
+    (or already exist). Invalid rows are skipped and reported by line number.
+    """
+
+    def __init__(self, row_type: Optional[str] = None, chunk_size: int = IMPORT_CHUNK_SIZE):
+        if row_type is not None and row_type not in IMPORT_SPECS:
+            raise ValueError(f"Unknown row type {row_type!r}")
+        self.row_type = row_type
+        self.chunk_size = chunk_size
+        self.external_ids: Dict[Type[Model], Dict[str, Any]] = {}
+        self.natural_keys: Dict[Type[Model], Dict[str, Any]] = {}
+        self.stats = {name: {"created": 0, "updated": 0} for name in IMPORT_SPECS}
+        self.error_count = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "created": sum(stats["created"] for stats in self.stats.values()),
+            "updated": sum(stats["updated"] for stats in self.stats.values()),
+            "by_type": {name: stats for name, stats in self.stats.items() if any(stats.values())},
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+    def add_error(self, line: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def run(self, rows: Iterable[Tuple[int, Optional[Dict[str, Any]]]]) -> Dict[str, Any]:
+        """Import (line number, row) pairs as produced by ``iter_csv_rows``/``iter_ndjson_rows``"""
+        chunk: List[Tuple[int, Dict[str, Any]]] = []
+        for line, row in rows:
+            if row is None:
+                self.add_error(line, "Malformed row")
+                continue
+            chunk.append((line, row))
+            if len(chunk) >= self.chunk_size:
+                self.import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.import_chunk(chunk)
+        return self.report()
+
+    def import_chunk(self, chunk: List[Tuple[int, Dict[str, Any]]]) -> None:
+        # Keep the stream order between types so parents are written before children
+        by_type: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        for line, row in chunk:
+            row_type = self.row_type or row.get("type")
+            if row_type not in IMPORT_SPECS:
+                self.add_error(line, f"Unknown row type {row_type!r}")
+                continue
+            by_type.setdefault(row_type, []).append((line, row))
+        with transaction.atomic():
+            for row_type in IMPORT_SPECS:
+                if row_type in by_type:
+                    self.upsert(row_type, by_type[row_type])
+
+    def upsert(self, row_type: str, rows: List[Tuple[int, Dict[str, Any]]]) -> None:
+        spec = IMPORT_SPECS[row_type]
+        model = spec["model"]
+        self._load_lookups(spec, [row for _, row in rows])
+
+        # The last row for an external id wins
+        values: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        for line, row in rows:
+            external_id = str(row.get("external_system_id") or "").strip()
+            if not external_id:
+                self.add_error(line, "Missing external_system_id")
+                continue
+            try:
+                values[external_id] = (line, self._convert(spec, row))
+            except RowError as exc:
+                self.add_error(line, str(exc))
+
+        existing = {
+            obj.external_system_id: obj
+            for obj in model.objects.filter(external_system_id__in=values.keys())
+        }
+        self._drop_unique_conflicts(model, values)
+        to_create, to_update, update_fields = [], [], set()
+        previous: Dict[Any, Dict[str, Any]] = {}
+        for external_id, (line, attrs) in values.items():
+            obj = existing.get(external_id)
+            if obj is None:
+                missing = self._missing_required(model, attrs, spec.get("derived", []))
+                if missing:
+                    self.add_error(line, f"Missing required fields: {', '.join(missing)}")
+                    continue
+                to_create.append(model(external_system_id=external_id, **attrs))
+            else:
+                previous[obj.pk] = stored_values(obj, attrs)
+                for name, value in attrs.items():
+                    setattr(obj, name, value)
+                update_fields.update(attrs)
+                to_update.append(obj)
+
+        if to_create:
+            if "before_create" in spec:
+                spec["before_create"](to_create)
+            model.objects.bulk_create(to_create)
+            bulk_created.send(sender=model, instances=to_create)
+            if "after_create" in spec:
+                spec["after_create"](to_create)
+        if to_update and update_fields:
+            model.objects.bulk_update(to_update, sorted(update_fields))
+            bulk_updated.send(
+                sender=model,
+                instances=to_update,
+                fields=sorted(update_fields),
+                previous=previous,
+            )
+        # Maps are loaded lazily from the database, so only a loaded one needs updating
+        known = self.external_ids.get(model)
+        if known is not None:
+            known.update((obj.external_system_id, obj.pk) for obj in to_create + to_update)
+        self.stats[row_type]["created"] += len(to_create)
+        self.stats[row_type]["updated"] += len(to_update)
+
+    def _external_id_map(self, model: Type[Model]) -> Dict[str, Any]:
+        if model not in self.external_ids:
+            self.external_ids[model] = dict(
+                model.objects.exclude(external_system_id="").values_list(
+                    "external_system_id", "pk"
+                )
+            )
+        return self.external_ids[model]
+
+    def _load_lookups(self, spec: Dict[str, Any], rows: List[Dict[str, Any]]) -> None:
+        for column, (model, key_field) in spec["lookups"].items():
+            known = self.natural_keys.setdefault(model, {})
+            wanted = {str(row[column]) for row in rows if row.get(column)} - set(known)
+            if wanted:
+                known.update(
+                    model.objects.filter(**{f"{key_field}__in": wanted}).values_list(
+                        key_field, "pk"
+                    )
+                )
+
+    def _convert(self, spec: Dict[str, Any], row: Dict[str, Any]) -> Dict[str, Any]:
+        model = spec["model"]
+        attrs: Dict[str, Any] = {}
+        for name in spec["fields"]:
+            value = row.get(name)
+            if value is None or value == "":
+                continue
+            try:
+                attrs[name] = model._meta.get_field(name).clean(value, None)
+            except ValidationError as exc:
+                raise RowError(f"{name}: {'; '.join(exc.messages)}")
+        for column, parent_model in spec["parents"].items():
+            value = row.get(column)
+            if value:
+                pk = self._external_id_map(parent_model).get(str(value))
+                if pk is None:
+                    raise RowError(f"{column}: unknown external_system_id {value!r}")
+                attrs[f"{column}_id"] = pk
+        for column, (lookup_model, key_field) in spec["lookups"].items():
+            value = row.get(column)
+            if value:
+                pk = self.natural_keys[lookup_model].get(str(value))
+                if pk is None:
+                    raise RowError(f"{column}: unknown {key_field} {value!r}")
+                attrs[f"{column}_id"] = pk
+        return attrs
+
+    def _drop_unique_conflicts(
+        self, model: Type[Model], values: Dict[str, Tuple[int, Dict[str, Any]]]
+    ) -> None:
+        """
+        Report and drop rows whose unique fields (name, serial_number, ...) are
+        already taken by another external id, so one bad row cannot fail the
+        bulk insert of its whole chunk. Costs one query per unique field.
+        """
+        for field in model._meta.concrete_fields:
+            if not field.unique or field.primary_key:
+                continue
+            claimed = {
+                attrs[field.name]: external_id
+                for external_id, (_, attrs) in values.items()
+                if field.name in attrs
+            }
+            if not claimed:
+                continue
+            owners = dict(
+                model.objects.filter(**{f"{field.name}__in": claimed.keys()}).values_list(
+                    field.name, "external_system_id"
+                )
+            )
+            for external_id, (line, attrs) in list(values.items()):
+                value = attrs.get(field.name)
+                if value is None:
+                    continue
+                owner = owners.get(value, external_id)
+                if owner != external_id or claimed[value] != external_id:
+                    self.add_error(line, f"{field.name}: {value!r} is already in use")
+                    del values[external_id]
+
+    @staticmethod
+    def _missing_required(
+        model: Type[Model], attrs: Dict[str, Any], derived: Iterable[str] = ()
+    ) -> List[str]:
+        return [
+            field.name
+            for field in model._meta.concrete_fields
+            if not (field.primary_key or field.null or field.blank or field.has_default())
+            and field.attname not in attrs
+            and field.name not in attrs
+            and field.name not in derived
+        ]
@@ -0,0 +1,328 @@
+import json
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import Prefetch
+
+from . import models
+from .variable_resolver import VariableResolver
+
+# Connection settings exported as host variables when set on AnsibleHost
+HOST_CONNECTION_FIELDS = [
+    "ansible_host",
+    "ansible_port",
+    "ansible_user",
+    "ansible_ssh_private_key_file",
+    "ansible_ssh_common_args",
+    "ansible_ssh_extra_args",
+    "ansible_ssh_executable",
+    "ansible_python_interpreter",
+    "ansible_shell_type",
+]
+
+
+# Part of the cache key; bump whenever the cached state of CompiledInventory changes
+# shape, so entries written by an older release are never restored
+CACHE_FORMAT_VERSION = 2
+
+
+class CompiledInventory:
+    """
+    In-memory graph of one inventory, loaded with a fixed number of bulk queries.
+
+    ``vars`` holds the inventory-wide variables (inventory variables, then the
+    associated variable sets in load order, then the variables of a group named
+    ``all``). ``groups`` maps group names to their own variables, direct host
+    names and direct child group names; Ansible resolves inheritance itself.
+    ``ungrouped`` lists the hosts outside every group. ``hostvars`` maps host
+    names to their connection settings and variables, and ``host_ids`` maps
+    AnsibleHost IDs to host names. Hosts whose target objects share a name are
+    named ``<name>-<host ID>``, so none of them is dropped.
+    """
+
+    def __init__(self, inventory: models.AnsibleInventory) -> None:
+        self.inventory = inventory
+        self.vars: Dict[str, Any] = {}
+        self.groups: Dict[str, Dict[str, Any]] = {}
+        self.hostvars: Dict[str, Dict[str, Any]] = {}
+        self.ungrouped: List[str] = []
+        self.host_ids: Dict[str, str] = {}
+
+    @classmethod
+    def get(cls, inventory: models.AnsibleInventory) -> "CompiledInventory":
+        """Compiled inventory from the cache, keyed on the inventory's content version"""
+        key = (
+            f"ansible-inventory:v{CACHE_FORMAT_VERSION}:{inventory.pk}:{inventory.content_version}"
+        )
+        state = cache.get(key)
+        if state is not None:
+            compiled = cls(inventory)
+            compiled.__dict__.update(state)
+            return compiled
+        compiled = cls.build(inventory)
+        state = {name: value for name, value in vars(compiled).items() if name != "inventory"}
+        cache.set(key, state, settings.ANSIBLE_INVENTORY_CACHE_TIMEOUT)
+        return compiled
+
+    @classmethod
+    def build(cls, inventory: models.AnsibleInventory) -> "CompiledInventory":
+        compiled = cls(inventory)
+        compiled._load_inventory_vars()
+        group_names = compiled._load_groups()
+        host_names = compiled._load_hosts()
+        compiled._load_memberships(group_names, host_names)
+        return compiled
+
+    def _load_inventory_vars(self) -> None:
+        self.vars.update(self.inventory.base_variables())
+
+    def _load_groups(self) -> Dict[Any, str]:
+        group_names = dict(
+            models.AnsibleGroup.objects.filter(inventory=self.inventory, status="active")
+            .order_by("name")
+            .values_list("id", "name")
+        )
+        for name in group_names.values():
+            self.groups[name] = {"vars": {}, "hosts": [], "children": []}
+
+        group_vars = models.AnsibleGroupVariable.objects.filter(
+            group_id__in=group_names.keys()
+        ).values_list("group_id", "key", "typed_value")
+        for group_id, key, value in group_vars:
+            self.groups[group_names[group_id]]["vars"][key] = value
+
+        edges = models.AnsibleGroupRelationship.objects.filter(
+            parent_group_id__in=group_names.keys(), child_group_id__in=group_names.keys()
+        ).values_list("parent_group_id", "child_group_id")
+        for parent_id, child_id in edges:
+            if group_names[child_id] == "all":
+                continue
+            self.groups[group_names[parent_id]]["children"].append(group_names[child_id])
+        for group in self.groups.values():
+            group["children"].sort()
+
+        # Variables of an explicit "all" group apply inventory-wide
+        all_group = self.groups.pop("all", None)
+        if all_group is not None:
+            self.vars.update(all_group["vars"])
+        return group_names
+
+    def _load_hosts(self) -> Dict[Any, str]:
+        hosts = list(
+            models.AnsibleHost.objects.filter(inventory=self.inventory, status="active").only(
+                "id", "content_type_id", "object_id", *HOST_CONNECTION_FIELDS
+            )
+        )
+
+        # Host names live on the VM/Baremetal rows: one query per host model
+        object_ids: Dict[int, List[Any]] = {}
+        for host in hosts:
+            object_ids.setdefault(host.content_type_id, []).append(host.object_id)
+        object_names: Dict[Any, str] = {}
+        for content_type_id, ids in object_ids.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            if model is None:
+                continue
+            if any(field.name == "name" for field in model._meta.concrete_fields):
+                object_names.update(model.objects.filter(pk__in=ids).values_list("pk", "name"))
+            else:
+                object_names.update((obj.pk, str(obj)) for obj in model.objects.filter(pk__in=ids))
+
+        display_names = {host.pk: object_names.get(host.object_id, str(host.pk)) for host in hosts}
+        name_counts = Counter(display_names.values())
+        host_names: Dict[Any, str] = {}
+        for host in sorted(hosts, key=lambda h: (display_names[h.pk], str(h.pk))):
+            name = display_names[host.pk]
+            hostvars = self._connection_vars(host)
+            if name_counts[name] > 1:
+                # Hosts sharing a name (e.g. a VM and a baremetal) would overwrite each
+                # other: each gets its host ID appended and still connects to the name
+                hostvars.setdefault("ansible_host", name)
+                name = f"{name}-{host.pk}"
+            host_names[host.pk] = name
+            self.host_ids[str(host.pk)] = name
+            self.hostvars[name] = hostvars
+
+        host_vars = models.AnsibleHostVariable.objects.filter(
+            host_id__in=host_names.keys()
+        ).values_list("host_id", "key", "typed_value")
+        for host_id, key, value in host_vars:
+            self.hostvars[host_names[host_id]][key] = value
+        return host_names
+
+    @staticmethod
+    def _connection_vars(host: models.AnsibleHost) -> Dict[str, Any]:
+        hostvars: Dict[str, Any] = {}
+        for field in HOST_CONNECTION_FIELDS:
+            value = getattr(host, field)
+            if value not in (None, ""):
+                hostvars[field] = value
+        return hostvars
+
+    def _load_memberships(self, group_names: Dict[Any, str], host_names: Dict[Any, str]) -> None:
+        grouped = set()
+        memberships = models.AnsibleHost.groups.through.objects.filter(
+            ansiblehost_id__in=host_names.keys(), ansiblegroup_id__in=group_names.keys()
+        ).values_list("ansiblegroup_id", "ansiblehost_id")
+        for group_id, host_id in memberships:
+            group = self.groups.get(group_names[group_id])
+            if group is not None:
+                group["hosts"].append(host_names[host_id])
+                grouped.add(host_id)
+        for group in self.groups.values():
+            group["hosts"].sort()
+        self.ungrouped = sorted(
+            name for host_id, name in host_names.items() if host_id not in grouped
+        )
+
+    def variable_resolver(self) -> VariableResolver:
+        parents: Dict[str, List[str]] = {}
+        for name, group in self.groups.items():
+            for child in group["children"]:
+                parents.setdefault(child, []).append(name)
+        group_vars = {name: group["vars"] for name, group in self.groups.items()}
+        return VariableResolver(self.vars, group_vars, parents)
+
+    def merged_host_variables(
+        self, host_ids: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fully merged variables of the given hosts (default: all hosts), keyed by host ID"""
+        groups_of_host: Dict[str, List[str]] = {}
+        for name, group in self.groups.items():
+            for host in group["hosts"]:
+                groups_of_host.setdefault(host, []).append(name)
+
+        resolver = self.variable_resolver()
+        merged: Dict[str, Dict[str, Any]] = {}
+        for host_id in self.host_ids if host_ids is None else host_ids:
+            name = self.host_ids.get(str(host_id))
+            if name is not None:
+                merged[str(host_id)] = resolver.host_variables(
+                    groups_of_host.get(name, ()), self.hostvars[name]
+                )
+        return merged
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Static YAML/JSON inventory layout, with host variables defined once under all"""
+        children: Dict[str, Any] = {}
+        for name, group in self.groups.items():
+            data: Dict[str, Any] = {}
+            if group["hosts"]:
+                data["hosts"] = {host: {} for host in group["hosts"]}
+            if group["vars"]:
+                data["vars"] = group["vars"]
+            if group["children"]:
+                data["children"] = {child: {} for child in group["children"]}
+            children[name] = data
+        if self.ungrouped:
+            children["ungrouped"] = {"hosts": {host: {} for host in self.ungrouped}}
+        return {
+            "all": {
+                "vars": self.vars,
+                "hosts": self.hostvars,
+                "children": children,
+            }
+        }
+
+    def as_dynamic_inventory(self) -> Dict[str, Any]:
+        """Ansible dynamic inventory ``--list`` layout, including ``_meta.hostvars``"""
+        nested = {child for group in self.groups.values() for child in group["children"]}
+        data: Dict[str, Any] = {
+            "_meta": {"hostvars": self.hostvars},
+            "all": {
+                "children": ["ungrouped"] + [name for name in self.groups if name not in nested],
+                "vars": self.vars,
+            },
+            "ungrouped": {"hosts": self.ungrouped},
+        }
+        for name, group in self.groups.items():
+            data[name] = {
+                "hosts": group["hosts"],
+                "vars": group["vars"],
+                "children": group["children"],
+            }
+        return data
+
+
+def iter_inventory_records(
+    inventory: models.AnsibleInventory, chunk_size: int = 2000
+) -> Iterator[Dict[str, Any]]:
+    """
+    Inventory as a sequence of records for streaming: the inventory-wide variables,
+    one record per group, then one record per host with its variables and groups.
+    Hosts are read in chunks, so memory does not grow with the number of hosts.
+    """
+    compiled = CompiledInventory(inventory)
+    compiled._load_inventory_vars()
+    group_names = compiled._load_groups()
+
+    yield {"type": "vars", "vars": compiled.vars}
+    for name, group in compiled.groups.items():
+        yield {"type": "group", "name": name, "vars": group["vars"], "children": group["children"]}
+
+    hosts = (
+        models.AnsibleHost.objects.filter(inventory=inventory, status="active")
+        .order_by("id")
+        .prefetch_related(
+            "host",
+            Prefetch(
+                "structured_variables",
+                queryset=models.AnsibleHostVariable.objects.only("host_id", "key", "typed_value"),
+            ),
+            Prefetch("groups", queryset=models.AnsibleGroup.objects.only("id")),
+        )
+    )
+    for host in hosts.iterator(chunk_size=chunk_size):
+        hostvars = CompiledInventory._connection_vars(host)
+        for var in host.structured_variables.all():
+            hostvars[var.key] = var.typed_value
+        groups = [group_names.get(group.pk) for group in host.groups.all()]
+        yield {
+            "type": "host",
+            "name": host.host_name,
+            "vars": hostvars,
+            "groups": sorted(name for name in groups if name in compiled.groups),
+        }
+
+
+def _ini_value(value: Any) -> str:
+    if isinstance(value, str):
+        return json.dumps(value) if not value or any(c.isspace() for c in value) else value
+    if isinstance(value, (bool, int, float)):
+        return str(value)
+    return json.dumps(value, default=str)
+
+
+def _ini_pair(key: str, value: Any) -> str:
+    return f"{key}={_ini_value(value)}"
+
+
+def _ini_section(name: str, lines: List[str]) -> str:
+    return "\n".join([f"[{name}]"] + lines) + "\n"
+
+
+def render_ini(data: Optional[Dict[str, Any]]) -> str:
+    """Render the ``CompiledInventory.as_dict`` layout as an INI inventory"""
+    root = (data or {}).get("all", {})
+    sections = [
+        _ini_section(
+            "all",
+            [
+                " ".join([host] + [_ini_pair(k, v) for k, v in hostvars.items()])
+                for host, hostvars in root.get("hosts", {}).items()
+            ],
+        ),
+        _ini_section("all:vars", [_ini_pair(k, v) for k, v in root.get("vars", {}).items()]),
+    ]
+    for name, group in root.get("children", {}).items():
+        sections.append(_ini_section(name, list(group.get("hosts", {}))))
+        if group.get("vars"):
+            sections.append(
+                _ini_section(f"{name}:vars", [_ini_pair(k, v) for k, v in group["vars"].items()])
+            )
+        if group.get("children"):
+            sections.append(_ini_section(f"{name}:children", list(group["children"])))
+    return "\n".join(sections)
@@ -1,3 +1,4 @@
+import json
 import os
 import random
 
@@ -320,16 +321,10 @@ class Command(BaseCommand):
             model.suppliers.set(selected_suppliers)
 
         # Create Units per rack
-        units_by_rack = {}
-        for rack in racks:
-            rack_units = []
-            for i in range(1, rack.height_units + 1):
-                name = f"U{i}"
-                unit_obj, _ = models.Unit.objects.get_or_create(
-                    rack=rack, name=name, defaults={"unit_number": i}
-                )
-                rack_units.append(unit_obj)
-            units_by_rack[rack.id] = rack_units
+        models.provision_rack_units(racks)
+        units_by_rack = {rack.id: [] for rack in racks}
+        for unit_obj in models.Unit.objects.filter(rack__in=racks).order_by("unit_number"):
+            units_by_rack[unit_obj.rack_id].append(unit_obj)
 
         # Create Baremetal Servers
         baremetals = self._create_or_get_models(
@@ -820,7 +815,7 @@ ntp_servers:
                                 value_type = "integer"
                             elif isinstance(value, (list, dict)):
                                 value_type = "json"
-                                value = str(value)
+                                value = json.dumps(value)
 
                             if models.AnsibleGroupVariable.objects.filter(
                                 group=group, key=key
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory_api.api.hierarchy_import import (
+    IMPORT_CHUNK_SIZE,
+    IMPORT_SPECS,
+    ROW_READERS,
+    HierarchyImporter,
+    open_text,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Upsert Fab/Phase/DataCenter/Room/Rack/Baremetal rows from a CSV or NDJSON dump, "
+        "keyed on external_system_id"
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("path", help="CSV or NDJSON file to import")
+        parser.add_argument(
+            "--format",
+            choices=list(ROW_READERS),
+            help="File format (default: inferred from the file extension)",
+        )
+        parser.add_argument(
+            "--type",
+            choices=list(IMPORT_SPECS),
+            help="Row type of every row (default: read from each row's 'type' column)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help="Rows upserted per transaction",
+        )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        path = options["path"]
+        file_format = options["format"] or path.rsplit(".", 1)[-1].lower()
+        file_format = {"jsonl": "ndjson"}.get(file_format, file_format)
+        if file_format not in ROW_READERS:
+            raise CommandError("Cannot infer the format from the file name, use --format")
+
+        importer = HierarchyImporter(row_type=options["type"], chunk_size=options["chunk_size"])
+        with open(path, "rb") as stream:
+            report = importer.run(ROW_READERS[file_format](open_text(stream)))
+
+        for error in report["errors"]:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        if report["error_count"] > len(report["errors"]):
+            self.stderr.write(f"... {report['error_count'] - len(report['errors'])} more errors")
+        self.stdout.write(
+            f"✔️ {report['created']} created, {report['updated']} updated, "
+            f"{report['error_count']} rows skipped"
+        )
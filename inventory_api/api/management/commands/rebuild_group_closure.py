@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from inventory_api.api.models import AnsibleGroupClosure, AnsibleInventory
+
+
+class Command(BaseCommand):
+    help = "Recompute the group hierarchy closure of inventories from their relationships"
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "inventory_ids", nargs="*", help="Inventories to rebuild (default: all)"
+        )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        inventories = AnsibleInventory.objects.order_by("name")
+        if options["inventory_ids"]:
+            inventories = inventories.filter(pk__in=options["inventory_ids"])
+        rebuilt = 0
+        for inventory_id in inventories.values_list("pk", flat=True):
+            with transaction.atomic():
+                AnsibleGroupClosure.rebuild(inventory_id)
+            rebuilt += 1
+        self.stdout.write(f"✔️ Rebuilt the group closure of {rebuilt} inventories")
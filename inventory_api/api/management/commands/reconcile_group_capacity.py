@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from inventory_api.api.models import (
+    reconcile_baremetal_capacity,
+    reconcile_baremetal_group_capacity,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute available_* of every baremetal from its model and placed VMs, then "
+        "total_*/available_* of every baremetal group from its baremetals"
+    )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        with transaction.atomic():
+            hosts = reconcile_baremetal_capacity()
+            fixed = reconcile_baremetal_group_capacity()
+        self.stdout.write(f"✔️ Fixed capacity of {hosts} baremetals")
+        self.stdout.write(f"✔️ Fixed capacity of {fixed} baremetal groups")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from inventory_api.api.models import reconcile_tenant_quota_usage
+
+
+class Command(BaseCommand):
+    help = "Recompute used_* of every tenant quota from the VMs placed in its group"
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        fixed = reconcile_tenant_quota_usage()
+        self.stdout.write(f"✔️ Fixed usage of {fixed} tenant quotas")
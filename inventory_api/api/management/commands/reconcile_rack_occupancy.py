@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from inventory_api.api.models import reconcile_rack_occupancy
+
+
+class Command(BaseCommand):
+    help = "Recount used_units/available_units of every rack from its baremetals in one query"
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        fixed = reconcile_rack_occupancy()
+        self.stdout.write(f"✔️ Fixed unit counters of {fixed} racks")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from inventory_api.api.utilization import run_snapshot_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Record the utilization of every baremetal group, rack and tenant, roll completed "
+        "hours and days up and prune expired samples; run it periodically, e.g. from cron"
+    )
+
+    def handle(self, *args: tuple, **options: dict) -> None:
+        report = run_snapshot_job()
+        self.stdout.write(
+            f"✔️ Recorded {report['raw']} samples, {report['hourly']} hourly and "
+            f"{report['daily']} daily rollups, pruned {report['pruned']} rows"
+        )
@@ -0,0 +1,162 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0001_initial"),
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ansiblegroup",
+            index=models.Index(fields=["created_at", "id"], name="api_ansible_created_a3e955_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ansiblegrouprelationship",
+            index=models.Index(fields=["created_at", "id"], name="api_ansible_created_a18372_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ansiblegroupvariable",
+            index=models.Index(fields=["created_at", "id"], name="api_ansible_created_d7355f_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ansiblehost",
+            index=models.Index(fields=["created_at", "id"], name="api_ansible_created_90f1c3_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ansiblehostvariable",
+            index=models.Index(fields=["created_at", "id"], name="api_ansible_created_f1ead3_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ansibleinventory",
+            index=models.Index(fields=["created_at", "id"], name="api_ansible_created_f88bb8_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ansibleinventoryplugin",
+            index=models.Index(fields=["created_at", "id"], name="api_ansible_created_483565_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ansibleinventorytemplate",
+            index=models.Index(fields=["created_at", "id"], name="api_ansible_created_762cda_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ansibleinventoryvariable",
+            index=models.Index(fields=["created_at", "id"], name="api_ansible_created_c9e063_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ansibleinventoryvariablesetassociation",
+            index=models.Index(fields=["created_at", "id"], name="api_ansible_created_ef105a_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ansiblevariableset",
+            index=models.Index(fields=["created_at", "id"], name="api_ansible_created_d5d5a7_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="baremetal",
+            index=models.Index(fields=["created_at", "id"], name="api_baremet_created_d240d8_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="baremetalgroup",
+            index=models.Index(fields=["created_at", "id"], name="api_baremet_created_1518e9_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="baremetalgrouptenantquota",
+            index=models.Index(fields=["created_at", "id"], name="api_baremet_created_d7c4b3_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="baremetalmodel",
+            index=models.Index(fields=["created_at", "id"], name="api_baremet_created_ab22f0_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="bastionclusterassociation",
+            index=models.Index(fields=["created_at", "id"], name="api_bastion_created_9d7efb_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="bgpconfig",
+            index=models.Index(fields=["created_at", "id"], name="api_bgpconf_created_8d9aa8_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="datacenter",
+            index=models.Index(fields=["created_at", "id"], name="api_datacen_created_7da64f_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="fab",
+            index=models.Index(fields=["created_at", "id"], name="api_fab_created_a2a006_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="k8scluster",
+            index=models.Index(fields=["created_at", "id"], name="api_k8sclus_created_5be5b7_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="k8sclusterplugin",
+            index=models.Index(fields=["created_at", "id"], name="api_k8sclus_created_946f5d_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="k8sclustertoservicemesh",
+            index=models.Index(fields=["created_at", "id"], name="api_k8sclus_created_bbf05d_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="manufacturer",
+            index=models.Index(fields=["created_at", "id"], name="api_manufac_created_daf587_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="networkinterface",
+            index=models.Index(fields=["created_at", "id"], name="api_network_created_a0ac6a_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="phase",
+            index=models.Index(fields=["created_at", "id"], name="api_phase_created_e98524_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="purchaseorder",
+            index=models.Index(fields=["created_at", "id"], name="api_purchas_created_9c1713_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="purchaserequisition",
+            index=models.Index(fields=["created_at", "id"], name="api_purchas_created_26707c_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="rack",
+            index=models.Index(fields=["created_at", "id"], name="api_rack_created_e10b2c_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="room",
+            index=models.Index(fields=["created_at", "id"], name="api_room_created_ebbd0e_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="servicemesh",
+            index=models.Index(fields=["created_at", "id"], name="api_service_created_30ead0_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="supplier",
+            index=models.Index(fields=["created_at", "id"], name="api_supplie_created_851e33_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="tenant",
+            index=models.Index(fields=["created_at", "id"], name="api_tenant_created_0593d7_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="unit",
+            index=models.Index(fields=["created_at", "id"], name="api_unit_created_63610b_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="virtualmachine",
+            index=models.Index(fields=["created_at", "id"], name="api_virtual_created_2e69bc_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="virtualmachinespecification",
+            index=models.Index(fields=["created_at", "id"], name="api_virtual_created_b92dca_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="vlan",
+            index=models.Index(fields=["created_at", "id"], name="api_vlan_created_008f25_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="vrf",
+            index=models.Index(fields=["created_at", "id"], name="api_vrf_created_60e7d1_idx"),
+        ),
+    ]
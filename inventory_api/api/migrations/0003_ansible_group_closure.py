@@ -0,0 +1,97 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:57
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_closure(apps, schema_editor):
+    """Compute path counts for every existing group relationship"""
+    Relationship = apps.get_model("api", "AnsibleGroupRelationship")
+    Closure = apps.get_model("api", "AnsibleGroupClosure")
+
+    children = {}
+    for parent_id, child_id in Relationship.objects.values_list(
+        "parent_group_id", "child_group_id"
+    ):
+        children.setdefault(parent_id, []).append(child_id)
+
+    path_counts = {}
+
+    def count_paths(group_id, visiting):
+        if group_id in path_counts:
+            return path_counts[group_id]
+        counts = {}
+        visiting.add(group_id)
+        for child_id in children.get(group_id, []):
+            if child_id in visiting:
+                continue
+            counts[child_id] = counts.get(child_id, 0) + 1
+            for descendant_id, paths in count_paths(child_id, visiting).items():
+                counts[descendant_id] = counts.get(descendant_id, 0) + paths
+        visiting.discard(group_id)
+        path_counts[group_id] = counts
+        return counts
+
+    Closure.objects.bulk_create(
+        [
+            Closure(ancestor_id=ancestor_id, descendant_id=descendant_id, path_count=paths)
+            for ancestor_id in list(children)
+            for descendant_id, paths in count_paths(ancestor_id, set()).items()
+            if descendant_id != ancestor_id
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_created_at_id_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnsibleGroupClosure",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("path_count", models.PositiveBigIntegerField(default=1)),
+                (
+                    "ancestor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="descendant_links",
+                        to="api.ansiblegroup",
+                    ),
+                ),
+                (
+                    "descendant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ancestor_links",
+                        to="api.ansiblegroup",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Ansible Group Closure",
+                "verbose_name_plural": "Ansible Group Closures",
+                "abstract": False,
+                "indexes": [
+                    models.Index(
+                        fields=["created_at", "id"], name="api_ansible_created_c88321_idx"
+                    )
+                ],
+                "unique_together": {("ancestor", "descendant")},
+            },
+        ),
+        migrations.RunPython(populate_closure, migrations.RunPython.noop),
+    ]
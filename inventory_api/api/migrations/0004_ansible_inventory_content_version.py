@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0003_ansible_group_closure"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ansibleinventory",
+            name="content_version",
+            field=models.PositiveBigIntegerField(
+                default=0,
+                editable=False,
+                help_text="Bumped whenever anything contributing to the compiled inventory changes",
+            ),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:25
+
+import json
+
+from django.db import migrations, models
+
+VARIABLE_MODELS = ["AnsibleInventoryVariable", "AnsibleGroupVariable", "AnsibleHostVariable"]
+
+
+def decode_legacy_value(value, value_type):
+    """Decode like the former get_typed_value(), keeping undecodable values as text"""
+    try:
+        if value_type == "integer":
+            return int(value)
+        if value_type == "float":
+            return float(value)
+        if value_type == "boolean":
+            return str(value).lower() in ("true", "1", "yes", "on")
+        if value_type in ("json", "list", "dict"):
+            return json.loads(value)
+    except ValueError:
+        pass
+    return value
+
+
+def populate_typed_values(apps, schema_editor):
+    for model_name in VARIABLE_MODELS:
+        model = apps.get_model("api", model_name)
+        batch = []
+        for variable in model.objects.only("id", "value", "value_type").iterator(chunk_size=2000):
+            variable.typed_value = decode_legacy_value(variable.value, variable.value_type)
+            batch.append(variable)
+            if len(batch) >= 2000:
+                model.objects.bulk_update(batch, ["typed_value"])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, ["typed_value"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_ansible_inventory_content_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ansiblegroupvariable",
+            name="typed_value",
+            field=models.JSONField(
+                blank=True,
+                editable=False,
+                help_text="Value decoded according to value_type",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="ansiblehostvariable",
+            name="typed_value",
+            field=models.JSONField(
+                blank=True,
+                editable=False,
+                help_text="Value decoded according to value_type",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="ansibleinventoryvariable",
+            name="typed_value",
+            field=models.JSONField(
+                blank=True,
+                editable=False,
+                help_text="Value decoded according to value_type",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(populate_typed_values, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:30
+
+import hashlib
+import json
+
+import django.core.serializers.json
+import yaml
+from django.db import migrations, models
+
+
+def parse_content(content, content_type):
+    """Same parsing as AnsibleVariableSet.parse_content() at the time of this migration"""
+    try:
+        if content_type == "yaml":
+            return yaml.safe_load(content) or {}
+        if content_type == "json":
+            return json.loads(content) or {}
+        if content_type in ("ini", "env"):
+            result = {}
+            for line in content.split("\n"):
+                line = line.strip()
+                if line and not line.startswith("#") and "=" in line:
+                    key, value = line.split("=", 1)
+                    result[key.strip()] = value.strip()
+            return result
+        return {}
+    except Exception:
+        return {}
+
+
+def populate_parsed_content(apps, schema_editor):
+    AnsibleVariableSet = apps.get_model("api", "AnsibleVariableSet")
+    for variable_set in AnsibleVariableSet.objects.only("id", "content", "content_type"):
+        variable_set.parsed_content = parse_content(
+            variable_set.content, variable_set.content_type
+        )
+        variable_set.content_hash = hashlib.sha256(
+            f"{variable_set.content_type}\0{variable_set.content}".encode()
+        ).hexdigest()
+        variable_set.save(update_fields=["parsed_content", "content_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_variable_typed_value"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ansiblevariableset",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="SHA-256 of content_type and content as of the last parse",
+                max_length=64,
+            ),
+        ),
+        migrations.AddField(
+            model_name="ansiblevariableset",
+            name="parsed_content",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                encoder=django.core.serializers.json.DjangoJSONEncoder,
+                help_text="Content parsed at the last save",
+            ),
+        ),
+        migrations.RunPython(populate_parsed_content, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0006_variable_set_parsed_content"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="baremetal",
+            name="external_system_id",
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name="datacenter",
+            name="external_system_id",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="Identifier from legacy system",
+                max_length=100,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="fab",
+            name="external_system_id",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="Identifier from legacy system",
+                max_length=100,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="phase",
+            name="external_system_id",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="Identifier from legacy system",
+                max_length=100,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="rack",
+            name="external_system_id",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="Identifier from legacy system",
+                max_length=100,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="room",
+            name="external_system_id",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="Identifier from legacy system",
+                max_length=100,
+            ),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:49
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+USAGE_FIELDS = {
+    "used_cpu": "specification__required_cpu",
+    "used_memory": "specification__required_memory",
+    "used_storage": "specification__required_storage",
+}
+
+
+def count_quota_usage(apps, schema_editor):
+    VirtualMachine = apps.get_model("api", "VirtualMachine")
+    Quota = apps.get_model("api", "BaremetalGroupTenantQuota")
+    usage = {
+        (row.pop("tenant"), row.pop("baremetal__group")): row
+        for row in VirtualMachine.objects.filter(baremetal__isnull=False)
+        .order_by()
+        .values("tenant", "baremetal__group")
+        .annotate(**{used: Sum(source) for used, source in USAGE_FIELDS.items()})
+    }
+    quotas = []
+    for quota in Quota.objects.only("id", "tenant", "group"):
+        row = usage.get((quota.tenant_id, quota.group_id))
+        if row:
+            for field, value in row.items():
+                setattr(quota, field, value or 0)
+            quotas.append(quota)
+    Quota.objects.bulk_update(quotas, list(USAGE_FIELDS), batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_external_system_id_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="baremetalgrouptenantquota",
+            name="used_cpu",
+            field=models.IntegerField(default=0, help_text="CPU used by the tenant's VMs"),
+        ),
+        migrations.AddField(
+            model_name="baremetalgrouptenantquota",
+            name="used_memory",
+            field=models.IntegerField(default=0, help_text="Memory used by the tenant's VMs"),
+        ),
+        migrations.AddField(
+            model_name="baremetalgrouptenantquota",
+            name="used_storage",
+            field=models.IntegerField(default=0, help_text="Storage used by the tenant's VMs"),
+        ),
+        migrations.RunPython(count_quota_usage, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:57
+
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0008_tenant_quota_usage"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UtilizationSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[
+                            ("group", "Baremetal Group"),
+                            ("rack", "Rack"),
+                            ("tenant", "Tenant"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                ("object_id", models.UUIDField(help_text="ID of the group, rack or tenant")),
+                (
+                    "resolution",
+                    models.CharField(
+                        choices=[("raw", "Raw"), ("hourly", "Hourly"), ("daily", "Daily")],
+                        max_length=8,
+                    ),
+                ),
+                (
+                    "bucket",
+                    models.DateTimeField(help_text="Sample time, or start of the hour/day"),
+                ),
+                (
+                    "samples",
+                    models.PositiveIntegerField(default=1, help_text="Raw samples averaged"),
+                ),
+                ("total_cpu", models.BigIntegerField(default=0)),
+                ("used_cpu", models.BigIntegerField(default=0)),
+                ("total_memory", models.BigIntegerField(default=0)),
+                ("used_memory", models.BigIntegerField(default=0)),
+                ("total_storage", models.BigIntegerField(default=0)),
+                ("used_storage", models.BigIntegerField(default=0)),
+                ("total_gpu", models.BigIntegerField(default=0)),
+                ("used_gpu", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "abstract": False,
+                "indexes": [
+                    models.Index(
+                        fields=["created_at", "id"], name="api_utiliza_created_3bd4bd_idx"
+                    ),
+                    models.Index(
+                        fields=["resolution", "bucket"], name="api_utiliza_resolut_2c4af2_idx"
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("scope", "resolution", "object_id", "bucket"),
+                        name="utilization_snapshot_series",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:42
+
+from django.db import migrations
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+
+def count_rack_occupancy(apps, schema_editor):
+    """Fill the unit counters of existing racks, as reconcile_rack_occupancy does"""
+    Baremetal = apps.get_model("api", "Baremetal")
+    Rack = apps.get_model("api", "Rack")
+    used = Coalesce(
+        Subquery(
+            Baremetal.objects.filter(rack=OuterRef("pk"), unit__isnull=False)
+            .order_by()
+            .values("rack")
+            .annotate(count=Count("pk"))
+            .values("count")
+        ),
+        0,
+    )
+    Rack.objects.update(used_units=used, available_units=Greatest(F("height_units") - used, 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0009_utilization_snapshot"),
+    ]
+
+    operations = [
+        migrations.RunPython(count_rack_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:15
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+# (baremetal available_*, model total_*, specification required_* reserving it)
+CAPACITY = [
+    ("available_cpu", "total_cpu", "required_cpu"),
+    ("available_memory", "total_memory", "required_memory"),
+    ("available_storage", "total_storage", "required_storage"),
+    ("available_gpu", "total_gpu", None),
+]
+
+
+def subtract_placed_vms(apps, schema_editor):
+    """
+    Derive available_* of existing baremetals from their model totals minus the VMs
+    placed on them, as reconcile_baremetal_capacity does, then the group counters
+    from their baremetals, as reconcile_baremetal_group_capacity does
+    """
+    Baremetal = apps.get_model("api", "Baremetal")
+    BaremetalGroup = apps.get_model("api", "BaremetalGroup")
+    BaremetalModel = apps.get_model("api", "BaremetalModel")
+    VirtualMachine = apps.get_model("api", "VirtualMachine")
+
+    def summed(queryset, key, field):
+        return Coalesce(
+            Subquery(
+                queryset.filter(**{key: OuterRef("pk")})
+                .order_by()
+                .values(key)
+                .annotate(total=Sum(field))
+                .values("total")
+            ),
+            0,
+        )
+
+    hosts = {}
+    for available, total, required in CAPACITY:
+        model_total = Subquery(BaremetalModel.objects.filter(pk=OuterRef("model")).values(total))
+        hosts[available] = model_total
+        if required is not None:
+            placed = VirtualMachine.objects.filter(baremetal__isnull=False)
+            hosts[available] = model_total - summed(
+                placed, "baremetal", f"specification__{required}"
+            )
+    Baremetal.objects.update(**hosts)
+
+    groups = {}
+    for available, total, _ in CAPACITY:
+        groups[total] = summed(Baremetal.objects.all(), "group", f"model__{total}")
+        groups[available] = summed(Baremetal.objects.all(), "group", available)
+    BaremetalGroup.objects.update(**groups)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0010_rack_occupancy_backfill"),
+    ]
+
+    operations = [
+        migrations.RunPython(subtract_placed_vms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0011_baremetal_capacity_backfill"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="baremetalgrouptenantquota",
+            name="used_gpu",
+            field=models.IntegerField(default=0, help_text="GPUs used by the tenant's VMs"),
+        ),
+        migrations.AddField(
+            model_name="virtualmachine",
+            name="gpu",
+            field=models.IntegerField(default=0, help_text="GPUs reserved on the baremetal"),
+        ),
+    ]
@@ -1,6 +1,8 @@
 # Import all models to maintain backward compatibility
 from .ansible import (
+    AbstractVariable,
     AnsibleGroup,
+    AnsibleGroupClosure,
     AnsibleGroupRelationship,
     AnsibleGroupVariable,
     AnsibleHost,
@@ -11,6 +13,8 @@ from .ansible import (
     AnsibleInventoryVariable,
     AnsibleInventoryVariableSetAssociation,
     AnsibleVariableSet,
+    decode_variable_value,
+    encode_variable_value,
 )
 from .baremetal import (
     Baremetal,
@@ -20,12 +24,23 @@ from .baremetal import (
     Manufacturer,
     Supplier,
     Tenant,
+    reconcile_baremetal_group_capacity,
 )
 from .base import AbstractBase
-from .infrastructure import DataCenter, Fab, Phase, Rack, Room, Unit
+from .infrastructure import (
+    DataCenter,
+    Fab,
+    Phase,
+    Rack,
+    Room,
+    Unit,
+    provision_rack_units,
+    reconcile_rack_occupancy,
+)
 from .network import VLAN, VRF, BGPConfig, NetworkInterface
 from .purchase import PurchaseOrder, PurchaseRequisition
 from .users import CustomUser
+from .utilization import UtilizationSnapshot
 from .virtual import (
     BastionClusterAssociation,
     K8sCluster,
@@ -34,6 +49,8 @@ from .virtual import (
     ServiceMesh,
     VirtualMachine,
     VirtualMachineSpecification,
+    reconcile_baremetal_capacity,
+    reconcile_tenant_quota_usage,
 )
 
 # Export all models
@@ -49,6 +66,8 @@ __all__ = [
     "Room",
     "Rack",
     "Unit",
+    "provision_rack_units",
+    "reconcile_rack_occupancy",
     # Network
     "VLAN",
     "VRF",
@@ -64,6 +83,7 @@ __all__ = [
     "BaremetalModel",
     "Baremetal",
     "Tenant",
+    "reconcile_baremetal_group_capacity",
     "BaremetalGroupTenantQuota",
     # Virtual
     "VirtualMachineSpecification",
@@ -73,13 +93,21 @@ __all__ = [
     "K8sClusterToServiceMesh",
     "VirtualMachine",
     "BastionClusterAssociation",
+    "reconcile_baremetal_capacity",
+    "reconcile_tenant_quota_usage",
+    # Utilization
+    "UtilizationSnapshot",
     # Ansible
+    "AbstractVariable",
+    "decode_variable_value",
+    "encode_variable_value",
     "AnsibleInventory",
     "AnsibleInventoryVariable",
     "AnsibleVariableSet",
     "AnsibleGroup",
     "AnsibleGroupVariable",
     "AnsibleGroupRelationship",
+    "AnsibleGroupClosure",
     "AnsibleHost",
     "AnsibleHostVariable",
     "AnsibleInventoryPlugin",
@@ -1,11 +1,18 @@
+import copy
+import hashlib
 import json
-from typing import Any, Dict, List
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
-from .base import AbstractBase
+from ..variable_resolver import VariableResolver
+from .base import AbstractBase, exclude_counters_from_save
 from .users import CustomUser
 
 
@@ -42,8 +49,13 @@ class AnsibleInventory(AbstractBase):
         null=True,
         related_name="created_inventories",
     )
+    content_version = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        help_text="Bumped whenever anything contributing to the compiled inventory changes",
+    )
 
-    class Meta:
+    class Meta(AbstractBase.Meta):
         ordering = ["name"]
         verbose_name = "Ansible Inventory"
         verbose_name_plural = "Ansible Inventories"
@@ -51,13 +63,95 @@ class AnsibleInventory(AbstractBase):
     def __str__(self) -> str:
         return str(self.name)
 
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        # content_version is only written by bump_content_version
+        exclude_counters_from_save(self, args, kwargs, ["content_version"])
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def bump_content_version(cls, inventory_ids: Any) -> None:
+        """Invalidate cached compilations of the given inventories (ids or a subquery)"""
+        cls.objects.filter(pk__in=inventory_ids).update(
+            content_version=models.F("content_version") + 1
+        )
+
+    def base_variables(self) -> Dict[str, Any]:
+        """Inventory variables, then the enabled variable sets in load order"""
+        variables = dict(self.variables.values_list("key", "typed_value"))
+        associated_sets = (
+            self.associated_variable_sets.filter(enabled=True, variable_set__status="active")
+            .select_related("variable_set")
+            .order_by("load_priority", "variable_set__priority")
+        )
+        for association in associated_sets:
+            variables.update(association.variable_set.get_parsed_content())
+        return variables
 
-class AnsibleInventoryVariable(AbstractBase):
-    """Inventory-level variables"""
+    def variable_resolver(self, group_ids: Optional[Iterable[Any]] = None) -> VariableResolver:
+        """
+        Variable resolver over this inventory's groups, loaded with one query per table.
+        ``group_ids`` restricts it to a subgraph, which must include every ancestor of
+        the groups that will be resolved.
+        """
+        groups = AnsibleGroup.objects.filter(inventory=self)
+        if group_ids is not None:
+            groups = groups.filter(pk__in=group_ids)
+        names = dict(groups.values_list("id", "name"))
+
+        group_vars: Dict[Any, Dict[str, Any]] = {group_id: {} for group_id in names}
+        for group_id, key, value in AnsibleGroupVariable.objects.filter(
+            group_id__in=names.keys()
+        ).values_list("group_id", "key", "typed_value"):
+            group_vars[group_id][key] = value
+
+        parents: Dict[Any, List[Any]] = {}
+        for child_id, parent_id in AnsibleGroupRelationship.objects.filter(
+            child_group_id__in=names.keys()
+        ).values_list("child_group_id", "parent_group_id"):
+            parents.setdefault(child_id, []).append(parent_id)
+        return VariableResolver(self.base_variables(), group_vars, parents, names)
+
+
+TRUE_STRINGS = ("true", "1", "yes", "on", "y")
+FALSE_STRINGS = ("false", "0", "no", "off", "n", "")
+
+
+def decode_variable_value(value: str, value_type: str) -> Any:
+    """Convert a stored string value to its proper type, raising ValueError when invalid"""
+    if value_type == "integer":
+        return int(value)
+    elif value_type == "float":
+        return float(value)
+    elif value_type == "boolean":
+        lowered = str(value).strip().lower()
+        if lowered in TRUE_STRINGS:
+            return True
+        if lowered in FALSE_STRINGS:
+            return False
+        raise ValueError(f"{value!r} is not a boolean")
+    elif value_type in ("json", "list", "dict"):
+        decoded = json.loads(value)
+        if value_type == "list" and not isinstance(decoded, list):
+            raise ValueError("Value is not a JSON list")
+        if value_type == "dict" and not isinstance(decoded, dict):
+            raise ValueError("Value is not a JSON object")
+        return decoded
+    return value
+
+
+def encode_variable_value(value: Any, value_type: str) -> str:
+    """Text to store for ``value``; JSON types accept decoded values too"""
+    if value_type in ("json", "list", "dict") and not isinstance(value, str):
+        return json.dumps(value)
+    return str(value)
+
+
+class AbstractVariable(AbstractBase):
+    """
+    A typed key/value variable. ``value`` keeps the text as entered; ``typed_value``
+    holds the decoded value and is refreshed on every save, so readers never parse.
+    """
 
-    inventory = models.ForeignKey(
-        AnsibleInventory, on_delete=models.CASCADE, related_name="variables"
-    )
     key = models.CharField(max_length=255, help_text="Variable name")
     value = models.TextField(help_text="Variable value (can be JSON)")
     value_type = models.CharField(
@@ -73,34 +167,57 @@ class AnsibleInventoryVariable(AbstractBase):
         ],
         default="string",
     )
+    typed_value = models.JSONField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Value decoded according to value_type",
+    )
 
-    class Meta:
+    class Meta(AbstractBase.Meta):
+        abstract = True
+
+    def clean(self) -> None:
+        from django.core.exceptions import ValidationError
+
+        try:
+            decode_variable_value(self.value, self.value_type)
+        except ValueError as exc:
+            raise ValidationError({"value": f"Invalid {self.value_type} value: {exc}"})
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        from django.core.exceptions import ValidationError
+
+        try:
+            self.typed_value = decode_variable_value(self.value, self.value_type)
+        except ValueError as exc:
+            raise ValidationError({"value": f"Invalid {self.value_type} value: {exc}"})
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "typed_value" not in update_fields:
+            kwargs["update_fields"] = list(update_fields) + ["typed_value"]
+        super().save(*args, **kwargs)
+
+    def get_typed_value(self) -> Any:
+        """The decoded value as of the last save"""
+        if self._state.adding:
+            return decode_variable_value(self.value, self.value_type)
+        return self.typed_value
+
+
+class AnsibleInventoryVariable(AbstractVariable):
+    """Inventory-level variables"""
+
+    inventory = models.ForeignKey(
+        AnsibleInventory, on_delete=models.CASCADE, related_name="variables"
+    )
+
+    class Meta(AbstractVariable.Meta):
         unique_together = ["inventory", "key"]
         ordering = ["key"]
 
     def __str__(self) -> str:
         return f"{self.inventory.name}:{self.key}"
 
-    def get_typed_value(self) -> Any:
-        """Convert the stored string value back to its proper type"""
-        import json
-
-        if self.value_type == "string":
-            return self.value
-        elif self.value_type == "integer":
-            return int(self.value)
-        elif self.value_type == "float":
-            return float(self.value)
-        elif self.value_type == "boolean":
-            return str(self.value).lower() in ("true", "1", "yes", "on")
-        elif self.value_type in ("json", "list", "dict"):
-            try:
-                return json.loads(self.value)
-            except json.JSONDecodeError:
-                return self.value
-        else:
-            return self.value
-
 
 class AnsibleGroup(AbstractBase):
     """Enhanced Ansible group with inventory support"""
@@ -119,7 +236,7 @@ class AnsibleGroup(AbstractBase):
         default="active",
     )
 
-    class Meta:
+    class Meta(AbstractBase.Meta):
         unique_together = ["inventory", "name"]
         ordering = ["name"]
 
@@ -129,32 +246,8 @@ class AnsibleGroup(AbstractBase):
     @property
     def all_variables(self) -> dict:
         """Get all variables for this group, including inherited ones"""
-        variables = {}
-
-        # Get inventory-level variables first
-        for var in self.inventory.variables.all():
-            variables[var.key] = var.get_typed_value()
-
-        # Get associated variable sets (ordered by priority)
-        associated_sets = self.inventory.associated_variable_sets.filter(
-            enabled=True, variable_set__status="active"
-        ).order_by("load_priority", "variable_set__priority")
-
-        for association in associated_sets:
-            set_vars = association.variable_set.get_parsed_content()
-            variables.update(set_vars)
-
-        # Get direct group variables
-        for var in self.variables.all():
-            variables[var.key] = var.get_typed_value()
-
-        # Get inherited variables from parent groups
-        for parent_rel in self.parent_relationships.all():
-            parent_vars = parent_rel.parent_group.all_variables
-            # Child variables override parent variables
-            variables.update(parent_vars)
-
-        return variables
+        group_ids = [self.pk] + list(self.ancestor_links.values_list("ancestor_id", flat=True))
+        return self.inventory.variable_resolver(group_ids).group_variables(self.pk)
 
     @property
     def child_groups(self) -> list:
@@ -167,15 +260,24 @@ class AnsibleGroup(AbstractBase):
         return [rel.parent_group for rel in self.parent_relationships.all()]
 
     @property
-    def all_hosts(self) -> list:
-        """Get all hosts in this group and child groups"""
-        hosts = list(self.hosts.all())
+    def ancestor_groups(self) -> models.QuerySet:
+        """Get all transitive parent groups"""
+        return AnsibleGroup.objects.filter(descendant_links__descendant=self)
 
-        # Recursively get hosts from child groups
-        for child_group in self.child_groups:
-            hosts.extend(child_group.all_hosts)
+    @property
+    def descendant_groups(self) -> models.QuerySet:
+        """Get all transitive child groups"""
+        return AnsibleGroup.objects.filter(ancestor_links__ancestor=self)
 
-        return hosts
+    @property
+    def all_hosts(self) -> list:
+        """Get all hosts in this group and child groups"""
+        descendant_ids = self.descendant_links.values("descendant_id")
+        return list(
+            AnsibleHost.objects.filter(models.Q(groups=self) | models.Q(groups__in=descendant_ids))
+            .distinct()
+            .order_by("id")
+        )
 
     def get_variable(self, key: str, default: Any = None) -> Any:
         """Get a specific variable value"""
@@ -189,58 +291,26 @@ class AnsibleGroup(AbstractBase):
         self, key: str, value: Any, value_type: str = "string"
     ) -> "AnsibleGroupVariable":
         """Set a variable for this group"""
-        var, created = self.variables.get_or_create(key=key)
-        var.value = str(value)
-        var.value_type = value_type
-        var.save()
+        var, created = self.variables.update_or_create(
+            key=key,
+            defaults={
+                "value": encode_variable_value(value, value_type),
+                "value_type": value_type,
+            },
+        )
         return var
 
 
-class AnsibleGroupVariable(AbstractBase):
+class AnsibleGroupVariable(AbstractVariable):
     group = models.ForeignKey(AnsibleGroup, on_delete=models.CASCADE, related_name="variables")
-    key = models.CharField(max_length=255, help_text="Variable name")
-    value = models.TextField(help_text="Variable value (can be JSON)")
-    value_type = models.CharField(
-        max_length=32,
-        choices=[
-            ("string", "String"),
-            ("integer", "Integer"),
-            ("float", "Float"),
-            ("boolean", "Boolean"),
-            ("json", "JSON"),
-            ("list", "List"),
-            ("dict", "Dictionary"),
-        ],
-        default="string",
-    )
 
-    class Meta:
+    class Meta(AbstractVariable.Meta):
         unique_together = ["group", "key"]
         ordering = ["key"]
 
     def __str__(self) -> str:
         return f"{self.group.name}:{self.key}"
 
-    def get_typed_value(self) -> Any:
-        """Convert the stored string value back to its proper type"""
-        import json
-
-        if self.value_type == "string":
-            return self.value
-        elif self.value_type == "integer":
-            return int(self.value)
-        elif self.value_type == "float":
-            return float(self.value)
-        elif self.value_type == "boolean":
-            return str(self.value).lower() in ("true", "1", "yes", "on")
-        elif self.value_type in ("json", "list", "dict"):
-            try:
-                return json.loads(self.value)
-            except json.JSONDecodeError:
-                return self.value
-        else:
-            return self.value
-
 
 class AnsibleGroupRelationship(AbstractBase):
     """Enhanced group relationships with inventory support"""
@@ -252,7 +322,7 @@ class AnsibleGroupRelationship(AbstractBase):
         AnsibleGroup, on_delete=models.CASCADE, related_name="parent_relationships"
     )
 
-    class Meta:
+    class Meta(AbstractBase.Meta):
         unique_together = ["parent_group", "child_group"]
         verbose_name = "Ansible Group Relationship"
         verbose_name_plural = "Ansible Group Relationships"
@@ -269,6 +339,174 @@ class AnsibleGroupRelationship(AbstractBase):
         if self.parent_group.inventory != self.child_group.inventory:
             raise ValidationError("Parent and child groups must be in the same inventory")
 
+        if self.creates_cycle(self.stored_edge()):
+            raise ValidationError("Relationship would create a cycle in the group hierarchy")
+
+    def stored_edge(self) -> Optional[Tuple[Any, Any]]:
+        """The (parent, child) ids currently stored for this row, None when unsaved"""
+        if self._state.adding or self.pk is None:
+            return None
+        return (
+            type(self)
+            .objects.filter(pk=self.pk)
+            .values_list("parent_group_id", "child_group_id")
+            .first()
+        )
+
+    def creates_cycle(self, replacing: Optional[Tuple[Any, Any]] = None) -> bool:
+        """
+        Whether this edge would close a cycle, checked with one closure lookup.
+
+        ``replacing`` is the (parent, child) edge this one replaces on update. The
+        closure still counts the paths running through it, so they are subtracted:
+        the child reaches the parent without the old edge only if
+        paths(child, parent) > paths(child, old parent) * paths(old child, parent).
+        """
+        parent_id, child_id = self.parent_group_id, self.child_group_id
+        if parent_id == child_id:
+            return True
+        pairs = [(child_id, parent_id)]
+        if replacing is not None:
+            pairs += [(child_id, replacing[0]), (replacing[1], parent_id)]
+        condition = models.Q()
+        for ancestor_id, descendant_id in pairs:
+            condition |= models.Q(ancestor_id=ancestor_id, descendant_id=descendant_id)
+        paths = {
+            (ancestor_id, descendant_id): path_count
+            for ancestor_id, descendant_id, path_count in AnsibleGroupClosure.objects.filter(
+                condition
+            ).values_list("ancestor_id", "descendant_id", "path_count")
+        }
+
+        def count(ancestor_id: Any, descendant_id: Any) -> int:
+            if ancestor_id == descendant_id:
+                return 1
+            return paths.get((ancestor_id, descendant_id), 0)
+
+        remaining = count(child_id, parent_id)
+        if replacing is not None:
+            remaining -= count(child_id, replacing[0]) * count(replacing[1], parent_id)
+        return remaining > 0
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        from django.core.exceptions import ValidationError
+
+        # The closure table is maintained by signals and must stay acyclic
+        stored = self.stored_edge()
+        edge = (self.parent_group_id, self.child_group_id)
+        if stored != edge and self.creates_cycle(stored):
+            raise ValidationError("Relationship would create a cycle in the group hierarchy")
+        super().save(*args, **kwargs)
+
+
+class AnsibleGroupClosure(AbstractBase):
+    """
+    Transitive closure of the group hierarchy.
+
+    One row per (ancestor, descendant) pair reachable through AnsibleGroupRelationship
+    edges, excluding self pairs. ``path_count`` counts the distinct paths between the
+    pair so that removing one edge of a diamond keeps pairs still reachable another
+    way. Rows are maintained by signals on AnsibleGroupRelationship.
+    """
+
+    ancestor = models.ForeignKey(
+        AnsibleGroup, on_delete=models.CASCADE, related_name="descendant_links"
+    )
+    descendant = models.ForeignKey(
+        AnsibleGroup, on_delete=models.CASCADE, related_name="ancestor_links"
+    )
+    path_count = models.PositiveBigIntegerField(default=1)
+
+    class Meta(AbstractBase.Meta):
+        unique_together = ["ancestor", "descendant"]
+        verbose_name = "Ansible Group Closure"
+        verbose_name_plural = "Ansible Group Closures"
+
+    def __str__(self) -> str:
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.path_count})"
+
+    @classmethod
+    def apply_edge(cls, parent_id: Any, child_id: Any, sign: int = 1) -> None:
+        """Add (sign=1) or remove (sign=-1) the paths running through one edge"""
+        ancestors: Dict[Any, int] = {parent_id: 1}
+        ancestors.update(
+            cls.objects.filter(descendant_id=parent_id).values_list("ancestor_id", "path_count")
+        )
+        descendants: Dict[Any, int] = {child_id: 1}
+        descendants.update(
+            cls.objects.filter(ancestor_id=child_id).values_list("descendant_id", "path_count")
+        )
+
+        existing = {
+            (row.ancestor_id, row.descendant_id): row
+            for row in cls.objects.filter(
+                ancestor_id__in=ancestors.keys(), descendant_id__in=descendants.keys()
+            )
+        }
+        to_create, to_update, to_delete = [], [], []
+        for ancestor_id, ancestor_paths in ancestors.items():
+            for descendant_id, descendant_paths in descendants.items():
+                delta = sign * ancestor_paths * descendant_paths
+                row = existing.get((ancestor_id, descendant_id))
+                if row is None:
+                    if delta > 0:
+                        to_create.append(
+                            cls(
+                                ancestor_id=ancestor_id,
+                                descendant_id=descendant_id,
+                                path_count=delta,
+                            )
+                        )
+                    continue
+                row.path_count += delta
+                (to_update if row.path_count > 0 else to_delete).append(row)
+
+        if to_create:
+            cls.objects.bulk_create(to_create, batch_size=1000)
+        if to_update:
+            cls.objects.bulk_update(to_update, ["path_count"], batch_size=1000)
+        if to_delete:
+            cls.objects.filter(pk__in=[row.pk for row in to_delete]).delete()
+
+    @classmethod
+    def rebuild(cls, inventory_id: Any) -> None:
+        """
+        Recompute the closure of one inventory from its relationship rows; the
+        rebuild_group_closure command runs it to repair drifted closures.
+        """
+        children: Dict[Any, List[Any]] = {}
+        for parent_id, child_id in AnsibleGroupRelationship.objects.filter(
+            parent_group__inventory_id=inventory_id
+        ).values_list("parent_group_id", "child_group_id"):
+            children.setdefault(parent_id, []).append(child_id)
+
+        path_counts: Dict[Any, Dict[Any, int]] = {}
+
+        def count_paths(group_id: Any, visiting: set) -> Dict[Any, int]:
+            if group_id in path_counts:
+                return path_counts[group_id]
+            counts: Dict[Any, int] = {}
+            visiting.add(group_id)
+            for child_id in children.get(group_id, []):
+                if child_id in visiting:
+                    # Legacy cycles are ignored rather than recursed into
+                    continue
+                counts[child_id] = counts.get(child_id, 0) + 1
+                for descendant_id, paths in count_paths(child_id, visiting).items():
+                    counts[descendant_id] = counts.get(descendant_id, 0) + paths
+            visiting.discard(group_id)
+            path_counts[group_id] = counts
+            return counts
+
+        rows = [
+            cls(ancestor_id=ancestor_id, descendant_id=descendant_id, path_count=paths)
+            for ancestor_id in list(children)
+            for descendant_id, paths in count_paths(ancestor_id, set()).items()
+            if descendant_id != ancestor_id
+        ]
+        cls.objects.filter(ancestor__inventory_id=inventory_id).delete()
+        cls.objects.bulk_create(rows, batch_size=1000)
+
 
 class AnsibleHost(AbstractBase):
     """Enhanced host model with inventory support and aliases"""
@@ -326,7 +564,7 @@ class AnsibleHost(AbstractBase):
     # Additional metadata
     metadata = models.JSONField(default=dict, blank=True, help_text="Additional host metadata")
 
-    class Meta:
+    class Meta(AbstractBase.Meta):
         unique_together = ["inventory", "content_type", "object_id"]
         verbose_name = "Ansible Host"
         verbose_name_plural = "Ansible Hosts"
@@ -359,55 +597,20 @@ class AnsibleHost(AbstractBase):
         return names
 
 
-class AnsibleHostVariable(AbstractBase):
+class AnsibleHostVariable(AbstractVariable):
     """Structured host variables with type support"""
 
     host = models.ForeignKey(
         AnsibleHost, on_delete=models.CASCADE, related_name="structured_variables"
     )
-    key = models.CharField(max_length=255, help_text="Variable name")
-    value = models.TextField(help_text="Variable value (can be JSON)")
-    value_type = models.CharField(
-        max_length=32,
-        choices=[
-            ("string", "String"),
-            ("integer", "Integer"),
-            ("float", "Float"),
-            ("boolean", "Boolean"),
-            ("json", "JSON"),
-            ("list", "List"),
-            ("dict", "Dictionary"),
-        ],
-        default="string",
-    )
 
-    class Meta:
+    class Meta(AbstractVariable.Meta):
         unique_together = ["host", "key"]
         ordering = ["key"]
 
     def __str__(self) -> str:
         return f"{self.host.host_name}:{self.key}"
 
-    def get_typed_value(self) -> Any:
-        """Convert the stored string value back to its proper type"""
-        import json
-
-        if self.value_type == "string":
-            return self.value
-        elif self.value_type == "integer":
-            return int(self.value)
-        elif self.value_type == "float":
-            return float(self.value)
-        elif self.value_type == "boolean":
-            return str(self.value).lower() in ("true", "1", "yes", "on")
-        elif self.value_type in ("json", "list", "dict"):
-            try:
-                return json.loads(self.value)
-            except json.JSONDecodeError:
-                return self.value
-        else:
-            return self.value
-
 
 class AnsibleInventoryPlugin(AbstractBase):
     """Dynamic inventory plugins configuration"""
@@ -421,7 +624,7 @@ class AnsibleInventoryPlugin(AbstractBase):
     priority = models.PositiveIntegerField(default=100, help_text="Plugin priority")
     cache_timeout = models.PositiveIntegerField(default=3600, help_text="Cache timeout in seconds")
 
-    class Meta:
+    class Meta(AbstractBase.Meta):
         unique_together = ["inventory", "name"]
         ordering = ["priority", "name"]
 
@@ -447,13 +650,45 @@ class AnsibleInventoryTemplate(AbstractBase):
     template_content = models.TextField(help_text="Template content")
     variables = models.JSONField(default=dict, blank=True, help_text="Template variables")
 
-    class Meta:
+    class Meta(AbstractBase.Meta):
         ordering = ["name"]
 
     def __str__(self) -> str:
         return str(self.name)
 
 
+class ParsedContentCache:
+    """Thread-safe LRU of parsed variable set content, keyed by (set id, content hash)"""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Tuple[Any, str], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[Any, str]) -> Any:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Tuple[Any, str], value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+VARIABLE_SET_PARSE_CACHE = ParsedContentCache(
+    getattr(settings, "ANSIBLE_VARIABLE_SET_PARSE_CACHE_SIZE", 256)
+)
+
+
 class AnsibleVariableSet(AbstractBase):
     """Independent variable sets that can be associated with multiple inventories"""
 
@@ -493,8 +728,21 @@ class AnsibleVariableSet(AbstractBase):
         null=True,
         related_name="created_variable_sets",
     )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text="SHA-256 of content_type and content as of the last parse",
+    )
+    parsed_content = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        encoder=DjangoJSONEncoder,
+        help_text="Content parsed at the last save",
+    )
 
-    class Meta:
+    class Meta(AbstractBase.Meta):
         ordering = ["priority", "name"]
         verbose_name = "Ansible Variable Set"
         verbose_name_plural = "Ansible Variable Sets"
@@ -502,10 +750,36 @@ class AnsibleVariableSet(AbstractBase):
     def __str__(self) -> str:
         return str(self.name)
 
-    def get_parsed_content(self) -> dict:
-        """Parse variable content"""
-        import json
+    def compute_content_hash(self) -> str:
+        return hashlib.sha256(f"{self.content_type}\0{self.content}".encode()).hexdigest()
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        # Parse once per content change; readers use the persisted result
+        content_hash = self.compute_content_hash()
+        if self._state.adding or content_hash != self.content_hash:
+            self.parsed_content = self.parse_content()
+            self.content_hash = content_hash
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = set(update_fields) | {"parsed_content", "content_hash"}
+        super().save(*args, **kwargs)
+
+    def get_parsed_content(self) -> Any:
+        """Parsed variable content, from the in-process cache or the persisted column"""
+        content_hash = self.compute_content_hash()
+        key = (self.pk, content_hash)
+        parsed = VARIABLE_SET_PARSE_CACHE.get(key)
+        if parsed is None:
+            if not self._state.adding and content_hash == self.content_hash:
+                parsed = self.parsed_content
+            else:
+                parsed = self.parse_content()
+            VARIABLE_SET_PARSE_CACHE.set(key, parsed)
+        # Callers merge into their own dicts; never hand out the cached object
+        return copy.deepcopy(parsed)
 
+    def parse_content(self) -> Any:
+        """Parse variable content"""
         import yaml
 
         try:
@@ -570,7 +844,7 @@ class AnsibleInventoryVariableSetAssociation(AbstractBase):
         default=dict, blank=True, help_text="Loading configuration options"
     )
 
-    class Meta:
+    class Meta(AbstractBase.Meta):
         unique_together = ["inventory", "variable_set"]
         ordering = ["load_priority", "variable_set__priority"]
         verbose_name = "Inventory Variable Set Association"
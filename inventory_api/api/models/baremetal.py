@@ -1,6 +1,36 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Tuple, Type
+
 from django.db import models
+from django.db.models import F, Q, Sum
+
+from .base import AbstractBase, exclude_counters_from_save
+
+# Capacity fields of a baremetal and the group totals they add up to
+AVAILABLE_CAPACITY_FIELDS = [
+    "available_cpu",
+    "available_memory",
+    "available_storage",
+    "available_gpu",
+]
+TOTAL_CAPACITY_FIELDS = ["total_cpu", "total_memory", "total_storage", "total_gpu"]
+QUOTA_USAGE_COUNTERS = ["used_cpu", "used_memory", "used_storage", "used_gpu"]
+
 
-from .base import AbstractBase
+def apply_deltas(model: Type[models.Model], deltas: Mapping[Any, Mapping[str, int]]) -> None:
+    """
+    Add ``deltas`` (pk -> field -> change) to counter fields with F() updates, one
+    UPDATE per distinct delta, so rows receiving the same change share a statement.
+    """
+    pks_by_delta = defaultdict(list)
+    for pk, delta in deltas.items():
+        key = tuple(sorted((field, value) for field, value in delta.items() if value))
+        if pk is not None and key:
+            pks_by_delta[key].append(pk)
+    for key, pks in pks_by_delta.items():
+        model.objects.filter(pk__in=pks).update(
+            **{field: F(field) + value for field, value in key}
+        )
 
 
 class BaremetalGroup(AbstractBase):
@@ -22,6 +52,19 @@ class BaremetalGroup(AbstractBase):
         help_text="Group status",
     )
 
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        # total_*/available_* are only written through adjust_capacity and the
+        # reconcile, so a stale instance must never write its copy back
+        exclude_counters_from_save(
+            self, args, kwargs, TOTAL_CAPACITY_FIELDS + AVAILABLE_CAPACITY_FIELDS
+        )
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def adjust_capacity(cls, deltas: Mapping[Any, Mapping[str, int]]) -> None:
+        """Add ``deltas`` (group id -> total_*/available_* field -> change) atomically"""
+        apply_deltas(cls, deltas)
+
 
 class Manufacturer(AbstractBase):
     """Hardware manufacturer model"""
@@ -103,7 +146,49 @@ class Baremetal(AbstractBase):
         "PurchaseRequisition", on_delete=models.PROTECT, related_name="baremetals"
     )
     po = models.ForeignKey("PurchaseOrder", on_delete=models.PROTECT, related_name="baremetals")
-    external_system_id = models.CharField(max_length=100, blank=True)
+    external_system_id = models.CharField(max_length=100, blank=True, db_index=True)
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        # available_* are only written through adjust_available and the reconcile
+        # once the row exists, so a stale instance must never write its copy back
+        if self._state.adding:
+            self.derive_initial_capacity([self])
+        else:
+            exclude_counters_from_save(self, args, kwargs, AVAILABLE_CAPACITY_FIELDS)
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def derive_initial_capacity(baremetals: Iterable["Baremetal"]) -> None:
+        """
+        Set the available_* of new ``baremetals`` to their model's totals, as no
+        VM is placed on them yet; one query for all their models
+        """
+        baremetals = list(baremetals)
+        totals = {
+            pk: values
+            for pk, *values in BaremetalModel.objects.filter(
+                pk__in={baremetal.model_id for baremetal in baremetals}
+            ).values_list("pk", *TOTAL_CAPACITY_FIELDS)
+        }
+        for baremetal in baremetals:
+            for field, total in zip(AVAILABLE_CAPACITY_FIELDS, totals[baremetal.model_id]):
+                setattr(baremetal, field, total)
+
+    @classmethod
+    def adjust_available(cls, deltas: Mapping[Any, Mapping[str, int]]) -> None:
+        """
+        Add ``deltas`` (baremetal id -> available_* field -> change) to the hosts and
+        to the available_* of their groups, e.g. when VMs are placed or removed
+        """
+        deltas = {pk: delta for pk, delta in deltas.items() if pk is not None}
+        if not deltas:
+            return
+        apply_deltas(cls, deltas)
+        group_deltas: Dict[Any, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for pk, group_id in cls.objects.filter(pk__in=deltas).values_list("pk", "group_id"):
+            for field, value in deltas[pk].items():
+                group_deltas[group_id][field] += value
+        BaremetalGroup.adjust_capacity(group_deltas)
 
 
 class Tenant(AbstractBase):
@@ -127,6 +212,111 @@ class BaremetalGroupTenantQuota(AbstractBase):
     memory_quota = models.IntegerField(default=0, help_text="Memory quota for tenant")
     storage_quota = models.IntegerField(default=0, help_text="Storage quota for tenant")
     gpu_quota = models.IntegerField(default=0, help_text="GPU quota for tenant")
+    used_cpu = models.IntegerField(default=0, help_text="CPU used by the tenant's VMs")
+    used_memory = models.IntegerField(default=0, help_text="Memory used by the tenant's VMs")
+    used_storage = models.IntegerField(default=0, help_text="Storage used by the tenant's VMs")
+    used_gpu = models.IntegerField(default=0, help_text="GPUs used by the tenant's VMs")
 
-    class Meta:
+    class Meta(AbstractBase.Meta):
         unique_together = ["group", "tenant"]
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        # used_* are only written through adjust_usage and the reconcile
+        exclude_counters_from_save(self, args, kwargs, QUOTA_USAGE_COUNTERS)
+        super().save(*args, **kwargs)
+
+    def limits(self) -> Dict[str, int]:
+        """Limit of each used_* counter; a limit of 0 is not enforced"""
+        return {
+            "used_cpu": self.group.total_cpu * self.cpu_quota_percentage // 100,
+            "used_memory": self.memory_quota,
+            "used_storage": self.storage_quota,
+            "used_gpu": self.gpu_quota,
+        }
+
+    @classmethod
+    def for_pairs(cls, pairs: Iterable[Tuple[Any, Any]]) -> models.QuerySet:
+        """Quotas of the given (tenant id, group id) pairs"""
+        condition = Q(pk__in=[])
+        for tenant_id, group_id in pairs:
+            condition |= Q(tenant_id=tenant_id, group_id=group_id)
+        return cls.objects.filter(condition)
+
+    @classmethod
+    def adjust_usage(cls, deltas: Mapping[Tuple[Any, Any], Mapping[str, int]]) -> None:
+        """
+        Add ``deltas`` ((tenant id, group id) -> used_* field -> change) to the
+        quotas of those pairs; usage is only counted where a quota exists
+        """
+        deltas = {pair: delta for pair, delta in deltas.items() if any(delta.values())}
+        if deltas:
+            apply_deltas(
+                cls,
+                {
+                    pk: deltas[(tenant_id, group_id)]
+                    for pk, tenant_id, group_id in cls.for_pairs(deltas).values_list(
+                        "pk", "tenant_id", "group_id"
+                    )
+                },
+            )
+
+    @classmethod
+    def violations(cls, deltas: Mapping[Tuple[Any, Any], Mapping[str, int]]) -> List[str]:
+        """
+        Lock the quotas that ``deltas`` (as for ``adjust_usage``) would raise and
+        describe every limit it would exceed. Call it in the transaction that makes
+        the change, so concurrent requests cannot both pass against the same usage.
+        """
+        deltas = {
+            pair: delta for pair, delta in deltas.items() if any(v > 0 for v in delta.values())
+        }
+        if not deltas:
+            return []
+        quotas = (
+            cls.for_pairs(deltas)
+            .select_related("tenant", "group")
+            .select_for_update(of=("self",))
+            .order_by("pk")
+        )
+        errors = []
+        for quota in quotas:
+            delta = deltas[(quota.tenant_id, quota.group_id)]
+            for field, limit in quota.limits().items():
+                used, added = getattr(quota, field), delta.get(field, 0)
+                if limit and added > 0 and used + added > limit:
+                    errors.append(
+                        f"{field[len('used_'):]} quota of tenant {quota.tenant.name} in group "
+                        f"{quota.group.name} exceeded: {used} used + {added} > {limit}"
+                    )
+        return errors
+
+
+def reconcile_baremetal_group_capacity() -> int:
+    """
+    Recompute every group's total_* (the sum of its baremetals' model totals) and
+    available_* (the sum of its baremetals' available_*) from one GROUP BY query,
+    and write back only the groups that drifted. Returns the number of groups fixed.
+    """
+    aggregates = {
+        row.pop("group"): row
+        for row in Baremetal.objects.order_by()
+        .values("group")
+        .annotate(
+            **{field: Sum(f"model__{field}") for field in TOTAL_CAPACITY_FIELDS},
+            **{field: Sum(field) for field in AVAILABLE_CAPACITY_FIELDS},
+        )
+    }
+    fields = TOTAL_CAPACITY_FIELDS + AVAILABLE_CAPACITY_FIELDS
+    drifted: List[BaremetalGroup] = []
+    for group in BaremetalGroup.objects.only(*fields):
+        expected = aggregates.get(group.pk, {})
+        changed = False
+        for field in fields:
+            value = expected.get(field) or 0
+            if getattr(group, field) != value:
+                setattr(group, field, value)
+                changed = True
+        if changed:
+            drifted.append(group)
+    BaremetalGroup.objects.bulk_update(drifted, fields)
+    return len(drifted)
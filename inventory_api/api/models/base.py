@@ -1,5 +1,5 @@
 import uuid
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List
 
 from django.db import models
 
@@ -13,3 +13,28 @@ class AbstractBase(models.Model):
 
     class Meta:
         abstract = True
+        # Keyset pagination walks every collection in (created_at, id) order
+        indexes = [models.Index(fields=["created_at", "id"])]
+
+
+def exclude_counters_from_save(
+    instance: models.Model, args: tuple, kwargs: Dict[str, Any], counters: Iterable[str]
+) -> None:
+    """
+    Make a plain save() of an existing row write every column except ``counters``.
+
+    Counters are maintained with F() updates, so a stale instance must never write
+    its copy back. Saves that pick their columns or force an insert are left alone.
+    """
+    if (
+        instance._state.adding
+        or args
+        or kwargs.get("update_fields") is not None
+        or kwargs.get("force_insert")
+    ):
+        return
+    kwargs["update_fields"] = [
+        field.name
+        for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in counters
+    ]
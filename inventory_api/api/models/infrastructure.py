@@ -1,6 +1,15 @@
-from django.db import models
+from collections import defaultdict
+from typing import Any, Dict, Optional, Sequence
 
-from .base import AbstractBase
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Q, QuerySet, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .baremetal import Baremetal
+from .base import AbstractBase, exclude_counters_from_save
+
+# Rack columns maintained by Rack.adjust_occupancy and reconcile_rack_occupancy
+RACK_UNIT_COUNTERS = ["used_units", "available_units"]
 
 
 class Fab(AbstractBase):
@@ -8,7 +17,7 @@ class Fab(AbstractBase):
 
     name = models.CharField(max_length=32, unique=True, help_text="Fab identifier")
     external_system_id = models.CharField(
-        max_length=100, blank=True, help_text="Identifier from legacy system"
+        max_length=100, blank=True, db_index=True, help_text="Identifier from legacy system"
     )
 
 
@@ -17,7 +26,7 @@ class Phase(AbstractBase):
 
     name = models.CharField(max_length=32, unique=True, help_text="Phase identifier")
     external_system_id = models.CharField(
-        max_length=100, blank=True, help_text="Identifier from legacy system"
+        max_length=100, blank=True, db_index=True, help_text="Identifier from legacy system"
     )
     fab = models.ForeignKey(
         "Fab",
@@ -34,7 +43,7 @@ class DataCenter(AbstractBase):
 
     name = models.CharField(max_length=32, unique=True, help_text="Data center identifier")
     external_system_id = models.CharField(
-        max_length=100, blank=True, help_text="Identifier from legacy system"
+        max_length=100, blank=True, db_index=True, help_text="Identifier from legacy system"
     )
     phase = models.ForeignKey(
         Phase,
@@ -51,7 +60,7 @@ class Room(AbstractBase):
 
     name = models.CharField(max_length=32, unique=True, help_text="Room identifier")
     external_system_id = models.CharField(
-        max_length=100, blank=True, help_text="Identifier from legacy system"
+        max_length=100, blank=True, db_index=True, help_text="Identifier from legacy system"
     )
     datacenter = models.ForeignKey(
         DataCenter,
@@ -68,7 +77,7 @@ class Rack(AbstractBase):
 
     name = models.CharField(max_length=32, unique=True, help_text="Rack identifier")
     external_system_id = models.CharField(
-        max_length=100, blank=True, help_text="Identifier from legacy system"
+        max_length=100, blank=True, db_index=True, help_text="Identifier from legacy system"
     )
     room = models.ForeignKey(
         Room,
@@ -104,6 +113,55 @@ class Rack(AbstractBase):
         help_text="Rack status",
     )
 
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        # The unit counters are only written through adjust_occupancy and the
+        # reconcile, so a stale instance must never write its copy back
+        if self._state.adding:
+            self.available_units = max(self.height_units - self.used_units, 0)
+        else:
+            exclude_counters_from_save(self, args, kwargs, RACK_UNIT_COUNTERS)
+        update_fields = kwargs.get("update_fields")
+        resized = (
+            update_fields is not None
+            and "height_units" in update_fields
+            and "available_units" not in update_fields
+        )
+        if resized:
+            # Derived from the stored used_units in the same UPDATE
+            kwargs["update_fields"] = [*update_fields, "available_units"]
+            self.available_units = Greatest(Value(self.height_units) - F("used_units"), 0)
+        super().save(*args, **kwargs)
+        if resized:
+            self.refresh_from_db(fields=RACK_UNIT_COUNTERS)
+
+    def provision_units(self) -> int:
+        """Create this rack's missing units and reset its unit counters"""
+        return provision_rack_units([self])
+
+    @classmethod
+    def adjust_occupancy(cls, deltas: Dict[Any, int]) -> None:
+        """
+        Add ``deltas`` (rack id -> change in occupied units) to used_units and derive
+        available_units from it, with one F() UPDATE per distinct delta. The database
+        computes both from the stored row, so concurrent adjustments cannot be lost.
+        """
+        racks_by_delta = defaultdict(list)
+        for rack_id, delta in deltas.items():
+            if rack_id is not None and delta:
+                racks_by_delta[delta].append(rack_id)
+        for delta, rack_ids in racks_by_delta.items():
+            cls.objects.filter(pk__in=rack_ids).update(
+                used_units=Greatest(F("used_units") + delta, 0),
+                available_units=Greatest(F("height_units") - F("used_units") - delta, 0),
+            )
+
+    @classmethod
+    def refresh_available_units(cls, rack_ids: Sequence[Any]) -> None:
+        """Derive available_units from height_units after racks were resized in bulk"""
+        cls.objects.filter(pk__in=rack_ids).update(
+            available_units=Greatest(F("height_units") - F("used_units"), 0)
+        )
+
 
 class Unit(AbstractBase):
     """Individual rack unit position (e.g., U1..U42) within a rack."""
@@ -119,5 +177,64 @@ class Unit(AbstractBase):
         related_name="units",
         help_text="Rack that this unit belongs to",
     )
-    class Meta:
+
+    class Meta(AbstractBase.Meta):
         unique_together = ["rack", "name"]
+
+
+def occupied_units() -> Coalesce:
+    """
+    Correlated count of the units of the outer rack that hold a baremetal. A
+    baremetal holds a unit of its rack when its ``unit`` is set.
+    """
+    counts = (
+        Baremetal.objects.filter(rack=OuterRef("pk"), unit__isnull=False)
+        .order_by()
+        .values("rack")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+def reconcile_rack_occupancy(racks: Optional[QuerySet] = None) -> int:
+    """
+    Recount used_units/available_units of ``racks`` (default: every rack) in a
+    single set-based UPDATE, touching only racks whose counters drifted. Returns
+    the number of racks fixed.
+    """
+    queryset = Rack.objects.all() if racks is None else racks
+    used = occupied_units()
+    available = Greatest(F("height_units") - used, 0)
+    return queryset.filter(~Q(used_units=used) | ~Q(available_units=available)).update(
+        used_units=used, available_units=available
+    )
+
+
+def provision_rack_units(racks: Sequence[Rack]) -> int:
+    """
+    Create the missing U1..U<height_units> units of ``racks`` with one bulk_create
+    and reconcile their unit counters. Existing units are kept, so provisioning
+    twice is harmless. Returns the number of units created.
+    """
+    rack_ids = [rack.pk for rack in racks]
+    with transaction.atomic():
+        existing = set(Unit.objects.filter(rack_id__in=rack_ids).values_list("rack_id", "name"))
+        missing = [
+            Unit(rack=rack, name=f"U{number}", unit_number=number)
+            for rack in racks
+            for number in range(1, rack.height_units + 1)
+            if (rack.pk, f"U{number}") not in existing
+        ]
+        Unit.objects.bulk_create(missing, ignore_conflicts=True)
+
+        reconcile_rack_occupancy(Rack.objects.filter(pk__in=rack_ids))
+        counters = {
+            pk: (used, available)
+            for pk, used, available in Rack.objects.filter(pk__in=rack_ids).values_list(
+                "pk", "used_units", "available_units"
+            )
+        }
+        for rack in racks:
+            rack.used_units, rack.available_units = counters[rack.pk]
+    return len(missing)
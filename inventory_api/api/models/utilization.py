@@ -0,0 +1,58 @@
+from django.db import models
+
+from .base import AbstractBase
+
+# Values of every snapshot row, summed over a scope's baremetals or VMs
+UTILIZATION_METRICS = [
+    "total_cpu",
+    "used_cpu",
+    "total_memory",
+    "used_memory",
+    "total_storage",
+    "used_storage",
+    "total_gpu",
+    "used_gpu",
+]
+
+
+class UtilizationSnapshot(AbstractBase):
+    """
+    Capacity and usage of one BaremetalGroup, Rack or Tenant at a point in time.
+
+    ``raw`` rows are written by every run of the snapshot job; ``hourly`` and
+    ``daily`` rows hold the mean of the ``samples`` raw rows of their period,
+    which starts at ``bucket``. Tenants have no capacity of their own, so only
+    their used_* are set.
+    """
+
+    scope = models.CharField(
+        max_length=16,
+        choices=[("group", "Baremetal Group"), ("rack", "Rack"), ("tenant", "Tenant")],
+    )
+    object_id = models.UUIDField(help_text="ID of the group, rack or tenant")
+    resolution = models.CharField(
+        max_length=8, choices=[("raw", "Raw"), ("hourly", "Hourly"), ("daily", "Daily")]
+    )
+    bucket = models.DateTimeField(help_text="Sample time, or start of the hour/day")
+    samples = models.PositiveIntegerField(default=1, help_text="Raw samples averaged")
+    total_cpu = models.BigIntegerField(default=0)
+    used_cpu = models.BigIntegerField(default=0)
+    total_memory = models.BigIntegerField(default=0)
+    used_memory = models.BigIntegerField(default=0)
+    total_storage = models.BigIntegerField(default=0)
+    used_storage = models.BigIntegerField(default=0)
+    total_gpu = models.BigIntegerField(default=0)
+    used_gpu = models.BigIntegerField(default=0)
+
+    class Meta(AbstractBase.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "resolution", "object_id", "bucket"],
+                name="utilization_snapshot_series",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["created_at", "id"]),
+            # Rollups and pruning walk one resolution by time
+            models.Index(fields=["resolution", "bucket"]),
+        ]
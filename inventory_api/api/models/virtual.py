@@ -1,7 +1,31 @@
-from django.db import models
+from typing import Optional
 
+from django.db import models
+from django.db.models import QuerySet, Sum
+
+from .baremetal import (
+    AVAILABLE_CAPACITY_FIELDS,
+    TOTAL_CAPACITY_FIELDS,
+    Baremetal,
+    BaremetalGroupTenantQuota,
+)
 from .base import AbstractBase
 
+# Resources a VM of a specification reserves on its baremetal
+REQUIREMENT_FIELDS = {
+    "required_cpu": "available_cpu",
+    "required_memory": "available_memory",
+    "required_storage": "available_storage",
+}
+# Quota usage a placed VM of a specification adds to its tenant in its host's group
+QUOTA_USAGE_FIELDS = {
+    "required_cpu": "used_cpu",
+    "required_memory": "used_memory",
+    "required_storage": "used_storage",
+}
+# GPUs are requested per VM, not per specification: a placed VM reserves its own
+# ``gpu`` from its baremetal's available_gpu and adds it to its tenant's used_gpu
+
 
 class VirtualMachineSpecification(AbstractBase):
     """Virtual machine specification template"""
@@ -106,6 +130,7 @@ class VirtualMachine(AbstractBase):
         default="other",
     )
     status = models.CharField(max_length=50)
+    gpu = models.IntegerField(default=0, help_text="GPUs reserved on the baremetal")
 
 
 class BastionClusterAssociation(AbstractBase):
@@ -117,3 +142,84 @@ class BastionClusterAssociation(AbstractBase):
     k8s_cluster = models.ForeignKey(
         K8sCluster, on_delete=models.CASCADE, related_name="bastion_machines"
     )
+
+
+def reconcile_tenant_quota_usage(quotas: Optional[QuerySet] = None) -> int:
+    """
+    Recompute the used_* counters of ``quotas`` (all quotas by default) from one
+    GROUP BY query over the placed VMs per (tenant, group of their baremetal), and
+    write back only the quotas that drifted. Returns the number of quotas fixed.
+    """
+    placed = VirtualMachine.objects.filter(baremetal__isnull=False)
+    if quotas is None:
+        quotas = BaremetalGroupTenantQuota.objects.all()
+    else:
+        placed = placed.filter(
+            tenant__in=quotas.values("tenant"), baremetal__group__in=quotas.values("group")
+        )
+    usage = {
+        (row.pop("tenant"), row.pop("baremetal__group")): row
+        for row in placed.order_by()
+        .values("tenant", "baremetal__group")
+        .annotate(
+            **{
+                used: Sum(f"specification__{required}")
+                for required, used in QUOTA_USAGE_FIELDS.items()
+            },
+            used_gpu=Sum("gpu"),
+        )
+    }
+    fields = [*QUOTA_USAGE_FIELDS.values(), "used_gpu"]
+    drifted = []
+    for quota in quotas.only("tenant", "group", *fields):
+        expected = usage.get((quota.tenant_id, quota.group_id), {})
+        changed = False
+        for field in fields:
+            value = expected.get(field) or 0
+            if getattr(quota, field) != value:
+                setattr(quota, field, value)
+                changed = True
+        if changed:
+            drifted.append(quota)
+    BaremetalGroupTenantQuota.objects.bulk_update(drifted, fields)
+    return len(drifted)
+
+
+def reconcile_baremetal_capacity() -> int:
+    """
+    Recompute the available_* of every baremetal as its model's totals minus the
+    requirements of the VMs placed on it, from one GROUP BY query over the placed
+    VMs, and write back only the baremetals that drifted. Group counters are not
+    touched, so follow with reconcile_baremetal_group_capacity. Returns the number
+    of baremetals fixed.
+    """
+    reserved = {
+        row.pop("baremetal"): row
+        for row in VirtualMachine.objects.filter(baremetal__isnull=False)
+        .order_by()
+        .values("baremetal")
+        .annotate(
+            **{
+                available: Sum(f"specification__{required}")
+                for required, available in REQUIREMENT_FIELDS.items()
+            },
+            available_gpu=Sum("gpu"),
+        )
+    }
+    drifted = []
+    for baremetal in Baremetal.objects.select_related("model").only(
+        "model",
+        *AVAILABLE_CAPACITY_FIELDS,
+        *[f"model__{total}" for total in TOTAL_CAPACITY_FIELDS],
+    ):
+        expected = reserved.get(baremetal.pk, {})
+        changed = False
+        for available, total in zip(AVAILABLE_CAPACITY_FIELDS, TOTAL_CAPACITY_FIELDS):
+            value = getattr(baremetal.model, total) - (expected.get(available) or 0)
+            if getattr(baremetal, available) != value:
+                setattr(baremetal, available, value)
+                changed = True
+        if changed:
+            drifted.append(baremetal)
+    Baremetal.objects.bulk_update(drifted, AVAILABLE_CAPACITY_FIELDS)
+    return len(drifted)
@@ -0,0 +1,197 @@
+from base64 import b64decode, b64encode
+from typing import Any, Dict, List, Optional, Tuple
+from urllib import parse
+from uuid import UUID
+
+from django.db.models import F, Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Keyset position is read from an annotation so it survives only()/defer()
+_CREATED_AT = "_keyset_created_at"
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Keyset pagination over (created_at, id).
+
+    Each page is fetched with ``WHERE (created_at, id) > (last_created_at, last_id)``
+    backed by the composite index on AbstractBase models, so latency stays flat
+    however deep the page is, and no COUNT(*) query is issued.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view: Any = None
+    ) -> Optional[List[Any]]:
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        self.reverse = bool(cursor and cursor[0])
+
+        direction = "-" if self.reverse else ""
+        queryset = queryset.annotate(**{_CREATED_AT: F("created_at")}).order_by(
+            f"{direction}created_at", f"{direction}id"
+        )
+        if cursor:
+            _, created_at, pk = cursor
+            lookup = "lt" if self.reverse else "gt"
+            queryset = queryset.filter(
+                Q(**{f"created_at__{lookup}": created_at})
+                | Q(created_at=created_at, **{f"id__{lookup}": pk})
+            )
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        return self.page
+
+    def get_page_size(self, request: Request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request: Request) -> Optional[Tuple[bool, Any, UUID]]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            querystring = b64decode(encoded.encode("ascii")).decode("ascii")
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            reverse = tokens["r"][0] == "1"
+            created_at = parse_datetime(tokens["t"][0])
+            pk = UUID(tokens["i"][0])
+        except (TypeError, ValueError, KeyError, IndexError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, created_at, pk
+
+    def encode_cursor(self, reverse: bool, instance: Any) -> str:
+        tokens = {
+            "r": "1" if reverse else "0",
+            "t": getattr(instance, _CREATED_AT).isoformat(),
+            "i": str(instance.pk),
+        }
+        encoded = b64encode(parse.urlencode(tokens).encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(False, self.page[-1])
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(True, self.page[0])
+
+    def get_paginated_response(self, data: Any) -> Response:
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class DefaultPagination(BasePagination):
+    """
+    Page-number pagination, switching to keyset pagination on request.
+
+    Clients opt in with ``?pagination=cursor`` and then follow the ``next`` links,
+    which carry a ``cursor`` parameter. Models without a ``created_at`` column always
+    use page numbers.
+    """
+
+    mode_query_param = "pagination"
+
+    def __init__(self) -> None:
+        self.page_number = PageNumberPagination()
+        self.keyset = KeysetCursorPagination()
+        self.active: BasePagination = self.page_number
+
+    def use_keyset(self, queryset: QuerySet, request: Request) -> bool:
+        requested = (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or self.keyset.cursor_query_param in request.query_params
+        )
+        fields = {field.name for field in queryset.model._meta.concrete_fields}
+        return requested and "created_at" in fields
+
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view: Any = None
+    ) -> Optional[List[Any]]:
+        self.active = self.keyset if self.use_keyset(queryset, request) else self.page_number
+        return self.active.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data: Any) -> Response:
+        return self.active.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        return self.page_number.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view: Any) -> List[Dict[str, Any]]:
+        return self.page_number.get_schema_operation_parameters(view) + [
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to 'cursor' for keyset pagination without a total count.",
+                "schema": {"type": "string", "enum": ["cursor"]},
+            },
+            {
+                "name": self.keyset.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.keyset.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page in cursor mode.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+    @property
+    def display_page_controls(self) -> bool:
+        return bool(getattr(self.active, "display_page_controls", False))
+
+    def to_html(self) -> str:
+        return self.active.to_html()
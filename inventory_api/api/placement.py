@@ -0,0 +1,224 @@
+import heapq
+from array import array
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db.models import Count, QuerySet
+
+from . import models
+from .models.virtual import REQUIREMENT_FIELDS
+
+# Weight of one cluster VM already on the host/rack, against a headroom in [0, 1]
+HOST_SPREAD_WEIGHT = 2.0
+RACK_SPREAD_WEIGHT = 4.0
+# Penalty for placing a VM without GPU needs on a host with free GPUs
+GPU_HOST_PENALTY = 0.5
+
+SPREAD_MODES = {"spread_rack", "spread_resource", "balanced"}
+
+
+class PlacementEngine:
+    """
+    Ranks baremetals for a VM of a cluster according to ``K8sCluster.scheduling_mode``.
+
+    Active baremetals with room for ``requirements`` are loaded once, with one
+    query, into column arrays (one per capacity); scoring is a single pass over
+    those columns, so ranking 50k hosts does not build any model instances. The
+    number of the cluster's VMs per host and per rack is loaded with a second
+    query and drives the spreading modes:
+
+    - ``default`` packs VMs onto the hosts they fit best (least headroom left)
+    - ``spread_resource`` prefers the hosts with the most headroom left
+    - ``balanced`` prefers headroom while keeping CPU and memory usage even
+    - ``spread_rack`` prefers racks, then hosts, running the fewest cluster VMs
+
+    ``assign`` books a placement into the arrays, so a batch of VMs can be placed
+    one after the other against the same snapshot (see ``place_batch``).
+    """
+
+    def __init__(
+        self,
+        cluster: models.K8sCluster,
+        requirements: Dict[str, int],
+        gpu: int = 0,
+        candidates: Optional[QuerySet] = None,
+    ) -> None:
+        self.cluster = cluster
+        self.mode = cluster.scheduling_mode
+        if candidates is None:
+            candidates = models.Baremetal.objects.filter(status="active")
+        rows = candidates.filter(
+            available_cpu__gte=requirements["available_cpu"],
+            available_memory__gte=requirements["available_memory"],
+            available_storage__gte=requirements["available_storage"],
+            available_gpu__gte=gpu,
+        ).values_list(
+            "pk",
+            "name",
+            "rack_id",
+            "available_cpu",
+            "available_memory",
+            "available_storage",
+            "available_gpu",
+            "model__total_cpu",
+            "model__total_memory",
+            "model__total_storage",
+        )
+        self.ids: List[Any] = []
+        self.names: List[str] = []
+        self.racks: List[Any] = []
+        self.rack_members: Dict[Any, List[int]] = defaultdict(list)
+        self.cpu, self.memory, self.storage, self.gpu = (array("q") for _ in range(4))
+        self.total_cpu, self.total_memory, self.total_storage = (array("q") for _ in range(3))
+        for row in rows.iterator(chunk_size=5000):
+            self.ids.append(row[0])
+            self.names.append(row[1])
+            self.racks.append(row[2])
+            self.rack_members[row[2]].append(len(self.ids) - 1)
+            self.cpu.append(row[3])
+            self.memory.append(row[4])
+            self.storage.append(row[5])
+            self.gpu.append(row[6])
+            # A host bigger than its model's nominal capacity counts as full capacity
+            self.total_cpu.append(max(row[7], row[3], 1))
+            self.total_memory.append(max(row[8], row[4], 1))
+            self.total_storage.append(max(row[9], row[5], 1))
+
+        self.host_load: Counter = Counter()
+        self.rack_load: Counter = Counter()
+        placed = (
+            models.VirtualMachine.objects.filter(k8s_cluster=cluster, baremetal__isnull=False)
+            .order_by()
+            .values_list("baremetal_id", "baremetal__rack_id")
+            .annotate(count=Count("pk"))
+        )
+        for baremetal_id, rack_id, count in placed:
+            self.host_load[baremetal_id] += count
+            self.rack_load[rack_id] += count
+        self._scores: Dict[Tuple[int, int, int, int], List[Optional[float]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def score(self, index: int, shape: Tuple[int, int, int, int]) -> Optional[float]:
+        """Score of candidate ``index`` for a VM of ``shape``, None if it does not fit"""
+        cpu, memory, storage, gpu = shape
+        host_cpu, host_memory, host_storage, host_gpu = (
+            self.cpu[index],
+            self.memory[index],
+            self.storage[index],
+            self.gpu[index],
+        )
+        if host_cpu < cpu or host_memory < memory or host_storage < storage or host_gpu < gpu:
+            return None
+        cpu_left = (host_cpu - cpu) / self.total_cpu[index]
+        memory_left = (host_memory - memory) / self.total_memory[index]
+        headroom = (
+            cpu_left + memory_left + (host_storage - storage) / self.total_storage[index]
+        ) / 3
+        if self.mode == "default":
+            score = -headroom
+        elif self.mode == "balanced":
+            score = headroom - abs(cpu_left - memory_left)
+        else:
+            score = headroom
+        if self.mode in SPREAD_MODES:
+            score -= HOST_SPREAD_WEIGHT * self.host_load[self.ids[index]]
+        if self.mode == "spread_rack":
+            score -= RACK_SPREAD_WEIGHT * self.rack_load[self.racks[index]]
+        if gpu == 0 and host_gpu > 0:
+            score -= GPU_HOST_PENALTY
+        return score
+
+    def scores(self, requirements: Dict[str, int], gpu: int = 0) -> List[Optional[float]]:
+        """
+        Score of every candidate for one VM, None where it no longer fits. Scores
+        are kept per VM shape and rescored only where ``assign`` changed something.
+        """
+        shape = vm_shape(requirements, gpu)
+        if shape not in self._scores:
+            self._scores[shape] = [self.score(index, shape) for index in range(len(self.ids))]
+        return self._scores[shape]
+
+    def rank(
+        self, requirements: Dict[str, int], gpu: int = 0, limit: int = 5
+    ) -> List[Tuple[int, float]]:
+        """(index, score) of the ``limit`` best candidates for one VM, best first"""
+        scores = self.scores(requirements, gpu)
+        feasible = [(index, score) for index, score in enumerate(scores) if score is not None]
+        return heapq.nlargest(limit, feasible, key=lambda item: item[1])
+
+    def assign(self, index: int, requirements: Dict[str, int], gpu: int = 0) -> None:
+        """Book one VM onto candidate ``index`` for the following placements"""
+        self.cpu[index] -= requirements["available_cpu"]
+        self.memory[index] -= requirements["available_memory"]
+        self.storage[index] -= requirements["available_storage"]
+        self.gpu[index] -= gpu
+        self.host_load[self.ids[index]] += 1
+        self.rack_load[self.racks[index]] += 1
+        # Only spread_rack scores depend on the other hosts of the rack
+        changed = self.rack_members[self.racks[index]] if self.mode == "spread_rack" else [index]
+        for shape, scores in self._scores.items():
+            for member in changed:
+                scores[member] = self.score(member, shape)
+
+    def describe(self, index: int, score: Optional[float] = None) -> Dict[str, Any]:
+        return {
+            "baremetal": self.ids[index],
+            "name": self.names[index],
+            "rack": self.racks[index],
+            "score": None if score is None else round(score, 4),
+            "available_cpu": self.cpu[index],
+            "available_memory": self.memory[index],
+            "available_storage": self.storage[index],
+            "available_gpu": self.gpu[index],
+        }
+
+
+def place_batch(
+    cluster: models.K8sCluster,
+    vms: List[Tuple[Dict[str, int], int]],
+    candidates: Optional[QuerySet] = None,
+) -> Tuple[PlacementEngine, List[Optional[int]]]:
+    """
+    Place ``vms`` ((requirements, gpu) pairs, at least one) of ``cluster``
+    together, largest first, each one on the best candidate left after the previous placements.
+
+    Returns the engine and the candidate index chosen for each VM, in the order of
+    ``vms``; None marks a VM that does not fit anywhere. The candidates are read
+    with a single query, so locking ``candidates`` locks the whole snapshot.
+    """
+    floor = {
+        available: min(requirements[available] for requirements, _ in vms)
+        for available in REQUIREMENT_FIELDS.values()
+    }
+    engine = PlacementEngine(cluster, floor, min(gpu for _, gpu in vms), candidates)
+    chosen: List[Optional[int]] = [None] * len(vms)
+    # GPU VMs first, as they can only go to the few GPU hosts
+    order = sorted(range(len(vms)), key=lambda i: (vms[i][1], vm_shape(*vms[i])), reverse=True)
+    for i in order:
+        requirements, gpu = vms[i]
+        ranked = engine.rank(requirements, gpu, limit=1)
+        if ranked:
+            chosen[i] = ranked[0][0]
+            engine.assign(chosen[i], requirements, gpu)
+    return engine, chosen
+
+
+def vm_shape(requirements: Dict[str, int], gpu: int = 0) -> Tuple[int, int, int, int]:
+    return (
+        requirements["available_cpu"],
+        requirements["available_memory"],
+        requirements["available_storage"],
+        gpu,
+    )
+
+
+def specification_requirements(
+    specification: models.VirtualMachineSpecification,
+) -> Dict[str, int]:
+    """Baremetal available_* consumed by a VM of ``specification``"""
+    return {
+        available: getattr(specification, required)
+        for required, available in REQUIREMENT_FIELDS.items()
+    }
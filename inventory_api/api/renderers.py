@@ -0,0 +1,76 @@
+from typing import Any, Mapping, Optional
+
+import yaml
+from rest_framework.renderers import BaseRenderer
+
+from .inventory_export import render_ini
+from .streaming import NDJSON_MEDIA_TYPE, encode_json
+
+
+class _SafeDumper(getattr(yaml, "CSafeDumper", yaml.SafeDumper)):  # type: ignore[misc]
+    """Safe dumper that also accepts str subclasses such as DRF's ErrorDetail"""
+
+
+_SafeDumper.add_multi_representer(str, lambda dumper, data: dumper.represent_str(str(data)))
+
+
+def dump_yaml(data: Any) -> str:
+    return yaml.dump(data, Dumper=_SafeDumper, sort_keys=False, default_flow_style=False)
+
+
+class YAMLRenderer(BaseRenderer):
+    media_type = "application/yaml"
+    format = "yaml"
+    charset = "utf-8"
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[Mapping[str, Any]] = None,
+    ) -> bytes:
+        if data is None:
+            return b""
+        return dump_yaml(data).encode(self.charset)
+
+
+class AnsibleINIRenderer(BaseRenderer):
+    """Renders a static inventory layout ({"all": {...}}) as an Ansible INI file"""
+
+    media_type = "text/plain"
+    format = "ini"
+    charset = "utf-8"
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[Mapping[str, Any]] = None,
+    ) -> bytes:
+        if data is None:
+            return b""
+        if not isinstance(data, dict) or "all" not in data:
+            # Error responses are not inventories
+            return dump_yaml(data).encode(self.charset)
+        return render_ini(data).encode(self.charset)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline-delimited JSON. Streaming exports write their own body; this renders the
+    non-streamed responses (errors) of the same endpoints as a single line
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: Optional[str] = None,
+        renderer_context: Optional[Mapping[str, Any]] = None,
+    ) -> bytes:
+        if data is None:
+            return b""
+        return (encode_json(data) + "\n").encode(self.charset)
@@ -0,0 +1,712 @@
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models import Count, Model, Sum
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import Signal, receiver
+
+from .models import (
+    AnsibleGroup,
+    AnsibleGroupClosure,
+    AnsibleGroupRelationship,
+    AnsibleGroupVariable,
+    AnsibleHost,
+    AnsibleHostVariable,
+    AnsibleInventory,
+    AnsibleInventoryVariable,
+    AnsibleInventoryVariableSetAssociation,
+    AnsibleVariableSet,
+    Baremetal,
+    BaremetalGroup,
+    BaremetalGroupTenantQuota,
+    BaremetalModel,
+    Rack,
+    Tenant,
+    Unit,
+    VirtualMachine,
+    VirtualMachineSpecification,
+)
+from .models.baremetal import AVAILABLE_CAPACITY_FIELDS, TOTAL_CAPACITY_FIELDS
+from .models.virtual import (
+    QUOTA_USAGE_FIELDS,
+    REQUIREMENT_FIELDS,
+    reconcile_tenant_quota_usage,
+)
+
+# bulk_create()/bulk_update() bypass save() and post_save, so bulk writes send these
+# instead, with ``instances`` (and for updates ``fields`` and ``previous``, which maps
+# each pk to the values its updated fields had before, by attname)
+bulk_created = Signal()
+bulk_updated = Signal()
+
+
+def stored_values(instance: Model, fields: Iterable[str]) -> Dict[str, Any]:
+    """Values of the concrete ``fields`` of ``instance`` by attname, for ``previous``"""
+    values = {}
+    for name in fields:
+        try:
+            field = instance._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        if field.concrete:
+            values[field.attname] = getattr(instance, field.attname)
+    return values
+
+
+# ============================================================================
+# GROUP HIERARCHY CLOSURE MAINTENANCE
+# ============================================================================
+
+
+@receiver(pre_save, sender=AnsibleGroupRelationship)
+def stash_previous_edge(sender: Any, instance: AnsibleGroupRelationship, **kwargs: Any) -> None:
+    """Remember the stored edge so an update can move its closure rows"""
+    instance._previous_edge = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_edge = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list("parent_group_id", "child_group_id")
+            .first()
+        )
+
+
+@receiver(post_save, sender=AnsibleGroupRelationship)
+def add_edge_to_closure(
+    sender: Any, instance: AnsibleGroupRelationship, created: bool, **kwargs: Any
+) -> None:
+    edge = (instance.parent_group_id, instance.child_group_id)
+    previous = getattr(instance, "_previous_edge", None)
+    if not created and previous == edge:
+        return
+    with transaction.atomic():
+        if previous is not None:
+            AnsibleGroupClosure.apply_edge(*previous, sign=-1)
+        AnsibleGroupClosure.apply_edge(*edge)
+
+
+@receiver(post_delete, sender=AnsibleGroupRelationship)
+def remove_edge_from_closure(
+    sender: Any, instance: AnsibleGroupRelationship, **kwargs: Any
+) -> None:
+    AnsibleGroupClosure.apply_edge(instance.parent_group_id, instance.child_group_id, sign=-1)
+
+
+# ============================================================================
+# COMPILED INVENTORY INVALIDATION
+# ============================================================================
+
+# Maps every model that contributes to a compiled inventory to the ids of the
+# inventories it affects
+INVENTORY_DEPENDENCIES: Dict[Type[Model], Callable[[Any], Any]] = {
+    AnsibleInventory: lambda instance: [instance.pk],
+    AnsibleInventoryVariable: lambda instance: [instance.inventory_id],
+    AnsibleInventoryVariableSetAssociation: lambda instance: [instance.inventory_id],
+    AnsibleVariableSet: lambda instance: AnsibleInventoryVariableSetAssociation.objects.filter(
+        variable_set_id=instance.pk
+    ).values("inventory_id"),
+    AnsibleGroup: lambda instance: [instance.inventory_id],
+    AnsibleGroupVariable: lambda instance: AnsibleGroup.objects.filter(
+        pk=instance.group_id
+    ).values("inventory_id"),
+    AnsibleGroupRelationship: lambda instance: AnsibleGroup.objects.filter(
+        pk=instance.parent_group_id
+    ).values("inventory_id"),
+    AnsibleHost: lambda instance: [instance.inventory_id],
+    AnsibleHostVariable: lambda instance: AnsibleHost.objects.filter(pk=instance.host_id).values(
+        "inventory_id"
+    ),
+}
+
+# INVENTORY_DEPENDENCIES for the instances of a bulk write
+BULK_INVENTORY_DEPENDENCIES: Dict[Type[Model], Callable[[List[Any]], Any]] = {
+    AnsibleInventoryVariable: lambda instances: {i.inventory_id for i in instances},
+    AnsibleGroupVariable: lambda instances: AnsibleGroup.objects.filter(
+        pk__in={i.group_id for i in instances}
+    ).values("inventory_id"),
+    AnsibleHost: lambda instances: {i.inventory_id for i in instances},
+    AnsibleHost.groups.through: lambda instances: AnsibleHost.objects.filter(
+        pk__in={i.ansiblehost_id for i in instances}
+    ).values("inventory_id"),
+    AnsibleHostVariable: lambda instances: AnsibleHost.objects.filter(
+        pk__in={i.host_id for i in instances}
+    ).values("inventory_id"),
+}
+
+# Host names are read from the objects AnsibleHost points to
+HOST_MODELS: List[Type[Model]] = [Baremetal, VirtualMachine]
+
+
+def bump_inventory_content_version(sender: Any, instance: Any, **kwargs: Any) -> None:
+    if isinstance(kwargs.get("origin"), AnsibleInventory) and sender is not AnsibleInventory:
+        # Rows cascading from a deleted inventory have nothing left to invalidate
+        return
+    AnsibleInventory.bump_content_version(INVENTORY_DEPENDENCIES[sender](instance))
+
+
+def bump_inventory_content_version_in_bulk(
+    sender: Any, instances: List[Any], **kwargs: Any
+) -> None:
+    AnsibleInventory.bump_content_version(BULK_INVENTORY_DEPENDENCIES[sender](instances))
+
+
+def bump_inventories_of_host_object(sender: Any, instance: Any, **kwargs: Any) -> None:
+    AnsibleInventory.bump_content_version(
+        AnsibleHost.objects.filter(
+            content_type=ContentType.objects.get_for_model(sender), object_id=instance.pk
+        ).values("inventory_id")
+    )
+
+
+def bump_inventories_of_host_objects(sender: Any, instances: List[Any], **kwargs: Any) -> None:
+    AnsibleInventory.bump_content_version(
+        AnsibleHost.objects.filter(
+            content_type=ContentType.objects.get_for_model(sender),
+            object_id__in=[instance.pk for instance in instances],
+        ).values("inventory_id")
+    )
+
+
+@receiver(m2m_changed, sender=AnsibleHost.groups.through)
+def bump_inventory_on_membership_change(
+    sender: Any, instance: Any, action: str, **kwargs: Any
+) -> None:
+    if action in ("post_add", "post_remove", "post_clear"):
+        AnsibleInventory.bump_content_version([instance.inventory_id])
+
+
+for model in INVENTORY_DEPENDENCIES:
+    for signal in (post_save, post_delete):
+        signal.connect(
+            bump_inventory_content_version,
+            sender=model,
+            dispatch_uid=f"bump_inventory_content_version_{signal}_{model.__name__}",
+        )
+
+for model in BULK_INVENTORY_DEPENDENCIES:
+    for signal in (bulk_created, bulk_updated):
+        signal.connect(
+            bump_inventory_content_version_in_bulk,
+            sender=model,
+            dispatch_uid=f"bump_inventory_content_version_in_bulk_{signal}_{model.__name__}",
+        )
+
+for model in HOST_MODELS:
+    for signal in (post_save, post_delete):
+        signal.connect(
+            bump_inventories_of_host_object,
+            sender=model,
+            dispatch_uid=f"bump_inventories_of_host_object_{signal}_{model.__name__}",
+        )
+    bulk_updated.connect(
+        bump_inventories_of_host_objects,
+        sender=model,
+        dispatch_uid=f"bump_inventories_of_host_objects_{model.__name__}",
+    )
+
+
+# ============================================================================
+# STORED VALUES OF COUNTED FIELDS
+# ============================================================================
+
+# Fields whose changes move rack occupancy, capacity and quota usage counters
+TRACKED_FIELDS: Dict[Type[Model], List[str]] = {
+    Baremetal: ["rack", "unit", "group", "model", *AVAILABLE_CAPACITY_FIELDS],
+    VirtualMachine: ["tenant", "baremetal", "specification", "gpu"],
+    VirtualMachineSpecification: list(REQUIREMENT_FIELDS),
+    BaremetalGroupTenantQuota: ["tenant", "group"],
+}
+
+
+def stash_stored_values(sender: Any, instance: Any, **kwargs: Any) -> None:
+    """Remember the stored values of tracked fields so post_save can compute deltas"""
+    fields = TRACKED_FIELDS[sender]
+    instance._stored_values = {}
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and not set(fields) & set(update_fields):
+        instance._stored_values = stored_values(instance, fields)
+    elif instance.pk and not instance._state.adding:
+        attnames = [sender._meta.get_field(name).attname for name in fields]
+        instance._stored_values = (
+            sender.objects.filter(pk=instance.pk).values(*attnames).first() or {}
+        )
+
+
+def previous_getter(instance: Any, stored: Dict[str, Any]) -> Callable[[str], Any]:
+    """Reads ``stored`` values by attname, falling back to the instance's own"""
+    return lambda attname: stored.get(attname, getattr(instance, attname))
+
+
+def saved_getter(instance: Any, update_fields: Optional[Iterable[str]]) -> Callable[[str], Any]:
+    """
+    Reads the values a save left in the database by attname: the instance's own
+    for ``update_fields`` (every field when None) and the stored ones for fields
+    the save left out, whatever unsaved edits the instance holds
+    """
+    if update_fields is None:
+        return instance.serializable_value
+    written = {instance._meta.get_field(name).attname for name in update_fields}
+    return lambda attname: (
+        getattr(instance, attname)
+        if attname in written
+        else instance._stored_values.get(attname, getattr(instance, attname))
+    )
+
+
+for model in TRACKED_FIELDS:
+    pre_save.connect(
+        stash_stored_values, sender=model, dispatch_uid=f"stash_stored_values_{model.__name__}"
+    )
+
+
+# ============================================================================
+# RACK OCCUPANCY COUNTERS
+# ============================================================================
+
+
+def occupied_rack(value: Callable[[str], Any]) -> Any:
+    """Rack whose used_units counts a baremetal, if any (see ``occupied_units``)"""
+    return value("rack_id") if value("unit_id") is not None else None
+
+
+def rack_occupancy_deltas(
+    before: Iterable[Callable[[str], Any]], after: Iterable[Callable[[str], Any]]
+) -> Counter:
+    deltas: Counter = Counter()
+    for value in before:
+        deltas[occupied_rack(value)] -= 1
+    for value in after:
+        deltas[occupied_rack(value)] += 1
+    return deltas
+
+
+@receiver(post_save, sender=Baremetal)
+def update_occupancy_on_save(
+    sender: Any, instance: Baremetal, created: bool, **kwargs: Any
+) -> None:
+    before = [] if created else [previous_getter(instance, instance._stored_values)]
+    after = saved_getter(instance, kwargs.get("update_fields"))
+    Rack.adjust_occupancy(rack_occupancy_deltas(before, [after]))
+
+
+@receiver(post_delete, sender=Baremetal)
+def update_occupancy_on_delete(sender: Any, instance: Baremetal, **kwargs: Any) -> None:
+    if isinstance(kwargs.get("origin"), Rack):
+        # The rack is gone, and its units with it
+        return
+    Rack.adjust_occupancy(rack_occupancy_deltas([instance.serializable_value], []))
+
+
+@receiver(pre_delete, sender=Unit)
+def release_deleted_unit(sender: Any, instance: Unit, **kwargs: Any) -> None:
+    """Deleting a unit sets Baremetal.unit to NULL without any save signal"""
+    if isinstance(kwargs.get("origin"), Rack):
+        return
+    released = Baremetal.objects.filter(unit=instance, rack__isnull=False).values_list(
+        "rack_id", flat=True
+    )
+    Rack.adjust_occupancy({rack_id: -count for rack_id, count in Counter(released).items()})
+
+
+@receiver(bulk_created, sender=Baremetal)
+def update_occupancy_on_bulk_create(
+    sender: Any, instances: List[Baremetal], **kwargs: Any
+) -> None:
+    Rack.adjust_occupancy(
+        rack_occupancy_deltas([], [instance.serializable_value for instance in instances])
+    )
+
+
+@receiver(bulk_updated, sender=Baremetal)
+def update_occupancy_on_bulk_update(
+    sender: Any, instances: List[Baremetal], previous: Dict[Any, Dict[str, Any]], **kwargs: Any
+) -> None:
+    Rack.adjust_occupancy(
+        rack_occupancy_deltas(
+            [previous_getter(instance, previous.get(instance.pk, {})) for instance in instances],
+            [instance.serializable_value for instance in instances],
+        )
+    )
+
+
+@receiver(bulk_updated, sender=Rack)
+def update_available_units_on_bulk_resize(
+    sender: Any, instances: List[Rack], fields: List[str], **kwargs: Any
+) -> None:
+    """Rack.save() derives available_units on resize, bulk_update() does not"""
+    if "height_units" in fields:
+        Rack.refresh_available_units([instance.pk for instance in instances])
+
+
+# ============================================================================
+# BAREMETAL GROUP CAPACITY
+# ============================================================================
+
+
+def group_capacity_deltas(
+    before: Iterable[Callable[[str], Any]], after: Iterable[Callable[[str], Any]]
+) -> Dict[Any, Dict[str, int]]:
+    """
+    Changes to group total_*/available_* when baremetals go from ``before`` to
+    ``after``. Model totals are only read for hosts that changed group or model.
+    """
+    deltas: Dict[Any, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    hosts: Counter = Counter()
+    for sign, values in ((-1, before), (1, after)):
+        for value in values:
+            group_id = value("group_id")
+            hosts[(group_id, value("model_id"))] += sign
+            for field in AVAILABLE_CAPACITY_FIELDS:
+                deltas[group_id][field] += sign * value(field)
+    moved = {key: count for key, count in hosts.items() if count}
+    if moved:
+        model_totals = {
+            pk: totals
+            for pk, *totals in BaremetalModel.objects.filter(
+                pk__in={model_id for _, model_id in moved}
+            ).values_list("pk", *TOTAL_CAPACITY_FIELDS)
+        }
+        for (group_id, model_id), count in moved.items():
+            for field, total in zip(TOTAL_CAPACITY_FIELDS, model_totals.get(model_id, ())):
+                deltas[group_id][field] += count * total
+    return deltas
+
+
+def host_reservation_deltas(
+    before: Iterable[Callable[[str], Any]], after: Iterable[Callable[[str], Any]]
+) -> Dict[Any, Dict[str, int]]:
+    """Changes to baremetal available_* when VMs go from ``before`` to ``after``"""
+    placements: Counter = Counter()
+    gpus: Counter = Counter()
+    for sign, values in ((1, before), (-1, after)):
+        for value in values:
+            if value("baremetal_id") is not None:
+                placements[(value("baremetal_id"), value("specification_id"))] += sign
+                gpus[value("baremetal_id")] += sign * value("gpu")
+    placements = Counter({key: count for key, count in placements.items() if count})
+    deltas: Dict[Any, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for baremetal_id, count in gpus.items():
+        if count:
+            deltas[baremetal_id]["available_gpu"] += count
+    if placements:
+        requirements = {
+            pk: required
+            for pk, *required in VirtualMachineSpecification.objects.filter(
+                pk__in={spec_id for _, spec_id in placements}
+            ).values_list("pk", *REQUIREMENT_FIELDS)
+        }
+        for (baremetal_id, spec_id), count in placements.items():
+            for field, required in zip(REQUIREMENT_FIELDS.values(), requirements[spec_id]):
+                deltas[baremetal_id][field] += count * required
+    return deltas
+
+
+@receiver(post_save, sender=Baremetal)
+def update_group_capacity_on_save(
+    sender: Any, instance: Baremetal, created: bool, **kwargs: Any
+) -> None:
+    before = [] if created else [previous_getter(instance, instance._stored_values)]
+    after = saved_getter(instance, kwargs.get("update_fields"))
+    BaremetalGroup.adjust_capacity(group_capacity_deltas(before, [after]))
+
+
+@receiver(post_delete, sender=Baremetal)
+def update_group_capacity_on_delete(sender: Any, instance: Baremetal, **kwargs: Any) -> None:
+    if isinstance(kwargs.get("origin"), BaremetalGroup):
+        return
+    BaremetalGroup.adjust_capacity(group_capacity_deltas([instance.serializable_value], []))
+
+
+@receiver(bulk_created, sender=Baremetal)
+def update_group_capacity_on_bulk_create(
+    sender: Any, instances: List[Baremetal], **kwargs: Any
+) -> None:
+    BaremetalGroup.adjust_capacity(
+        group_capacity_deltas([], [instance.serializable_value for instance in instances])
+    )
+
+
+@receiver(bulk_updated, sender=Baremetal)
+def update_group_capacity_on_bulk_update(
+    sender: Any, instances: List[Baremetal], previous: Dict[Any, Dict[str, Any]], **kwargs: Any
+) -> None:
+    BaremetalGroup.adjust_capacity(
+        group_capacity_deltas(
+            [previous_getter(instance, previous.get(instance.pk, {})) for instance in instances],
+            [instance.serializable_value for instance in instances],
+        )
+    )
+
+
+@receiver(post_save, sender=VirtualMachine)
+def update_host_capacity_on_save(
+    sender: Any, instance: VirtualMachine, created: bool, **kwargs: Any
+) -> None:
+    before = [] if created else [previous_getter(instance, instance._stored_values)]
+    after = saved_getter(instance, kwargs.get("update_fields"))
+    Baremetal.adjust_available(host_reservation_deltas(before, [after]))
+
+
+@receiver(post_delete, sender=VirtualMachine)
+def update_host_capacity_on_delete(sender: Any, instance: VirtualMachine, **kwargs: Any) -> None:
+    if isinstance(kwargs.get("origin"), (Baremetal, BaremetalGroup)):
+        # The host is gone, and its whole capacity with it
+        return
+    Baremetal.adjust_available(host_reservation_deltas([instance.serializable_value], []))
+
+
+@receiver(bulk_created, sender=VirtualMachine)
+def update_host_capacity_on_bulk_create(
+    sender: Any, instances: List[VirtualMachine], **kwargs: Any
+) -> None:
+    Baremetal.adjust_available(
+        host_reservation_deltas([], [instance.serializable_value for instance in instances])
+    )
+
+
+@receiver(bulk_updated, sender=VirtualMachine)
+def update_host_capacity_on_bulk_update(
+    sender: Any,
+    instances: List[VirtualMachine],
+    previous: Dict[Any, Dict[str, Any]],
+    **kwargs: Any,
+) -> None:
+    Baremetal.adjust_available(
+        host_reservation_deltas(
+            [previous_getter(instance, previous.get(instance.pk, {})) for instance in instances],
+            [instance.serializable_value for instance in instances],
+        )
+    )
+
+
+@receiver(post_save, sender=VirtualMachineSpecification)
+def update_host_capacity_on_resize(
+    sender: Any, instance: VirtualMachineSpecification, created: bool, **kwargs: Any
+) -> None:
+    """Resizing a specification resizes every placed VM that uses it"""
+    if created:
+        return
+    previous = previous_getter(instance, instance._stored_values)
+    after = saved_getter(instance, kwargs.get("update_fields"))
+    growth = {
+        available: after(required) - previous(required)
+        for required, available in REQUIREMENT_FIELDS.items()
+    }
+    if not any(growth.values()):
+        return
+    placed = (
+        VirtualMachine.objects.filter(specification=instance, baremetal__isnull=False)
+        .order_by()
+        .values("baremetal")
+        .annotate(count=Count("pk"))
+        .values_list("baremetal", "count")
+    )
+    Baremetal.adjust_available(
+        {
+            baremetal_id: {field: -count * value for field, value in growth.items()}
+            for baremetal_id, count in placed
+        }
+    )
+
+
+# ============================================================================
+# TENANT QUOTA USAGE COUNTERS
+# ============================================================================
+
+
+def quota_usage_deltas(
+    before: Iterable[Callable[[str], Any]],
+    after: Iterable[Callable[[str], Any]],
+    groups: Optional[Dict[Any, Any]] = None,
+) -> Dict[Tuple[Any, Any], Dict[str, int]]:
+    """
+    Changes to quota used_* per (tenant, group) when VMs go from ``before`` to
+    ``after``; a VM counts against the group of its baremetal, which is read from
+    the database unless given in ``groups`` (baremetal id -> group id)
+    """
+    placements: Counter = Counter()
+    gpus: Counter = Counter()
+    for sign, values in ((-1, before), (1, after)):
+        for value in values:
+            if value("baremetal_id") is not None:
+                key = (value("tenant_id"), value("baremetal_id"), value("specification_id"))
+                placements[key] += sign
+                gpus[key[:2]] += sign * value("gpu")
+    placements = Counter({key: count for key, count in placements.items() if count})
+    gpus = Counter({key: count for key, count in gpus.items() if count})
+    deltas: Dict[Tuple[Any, Any], Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    if placements or gpus:
+        groups = dict(groups or {})
+        missing = {key[1] for key in [*placements, *gpus]} - set(groups)
+        if missing:
+            groups.update(Baremetal.objects.filter(pk__in=missing).values_list("pk", "group_id"))
+        for (tenant_id, baremetal_id), count in gpus.items():
+            deltas[(tenant_id, groups[baremetal_id])]["used_gpu"] += count
+        requirements = {
+            pk: required
+            for pk, *required in VirtualMachineSpecification.objects.filter(
+                pk__in={key[2] for key in placements}
+            ).values_list("pk", *QUOTA_USAGE_FIELDS)
+        }
+        for (tenant_id, baremetal_id, spec_id), count in placements.items():
+            for field, required in zip(QUOTA_USAGE_FIELDS.values(), requirements[spec_id]):
+                deltas[(tenant_id, groups[baremetal_id])][field] += count * required
+    return deltas
+
+
+@receiver(post_save, sender=VirtualMachine)
+def update_quota_usage_on_save(
+    sender: Any, instance: VirtualMachine, created: bool, **kwargs: Any
+) -> None:
+    before = [] if created else [previous_getter(instance, instance._stored_values)]
+    after = saved_getter(instance, kwargs.get("update_fields"))
+    BaremetalGroupTenantQuota.adjust_usage(quota_usage_deltas(before, [after]))
+
+
+@receiver(post_delete, sender=VirtualMachine)
+def update_quota_usage_on_delete(sender: Any, instance: VirtualMachine, **kwargs: Any) -> None:
+    origin = kwargs.get("origin")
+    if isinstance(origin, (Tenant, BaremetalGroup)):
+        # The quotas are deleted too
+        return
+    # A host deleted with its VMs may already be gone from the database
+    groups = {origin.pk: origin.group_id} if isinstance(origin, Baremetal) else None
+    BaremetalGroupTenantQuota.adjust_usage(
+        quota_usage_deltas([instance.serializable_value], [], groups)
+    )
+
+
+@receiver(bulk_created, sender=VirtualMachine)
+def update_quota_usage_on_bulk_create(
+    sender: Any, instances: List[VirtualMachine], **kwargs: Any
+) -> None:
+    BaremetalGroupTenantQuota.adjust_usage(
+        quota_usage_deltas([], [instance.serializable_value for instance in instances])
+    )
+
+
+@receiver(bulk_updated, sender=VirtualMachine)
+def update_quota_usage_on_bulk_update(
+    sender: Any,
+    instances: List[VirtualMachine],
+    previous: Dict[Any, Dict[str, Any]],
+    **kwargs: Any,
+) -> None:
+    BaremetalGroupTenantQuota.adjust_usage(
+        quota_usage_deltas(
+            [previous_getter(instance, previous.get(instance.pk, {})) for instance in instances],
+            [instance.serializable_value for instance in instances],
+        )
+    )
+
+
+def moved_host_usage_deltas(
+    moves: Dict[Any, Tuple[Any, Any]],
+) -> Dict[Tuple[Any, Any], Dict[str, int]]:
+    """
+    Changes to quota used_* per (tenant, group) when baremetals change groups, from
+    ``moves`` (baremetal id -> (old group id, new group id)): the usage of the VMs
+    placed on each host leaves its old group and joins its new one
+    """
+    deltas: Dict[Tuple[Any, Any], Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    moves = {pk: groups for pk, groups in moves.items() if groups[0] != groups[1]}
+    if not moves:
+        return deltas
+    placed = (
+        VirtualMachine.objects.filter(baremetal__in=moves)
+        .order_by()
+        .values("baremetal", "tenant")
+        .annotate(
+            **{
+                used: Sum(f"specification__{required}")
+                for required, used in QUOTA_USAGE_FIELDS.items()
+            },
+            used_gpu=Sum("gpu"),
+        )
+    )
+    for row in placed:
+        old_group, new_group = moves[row.pop("baremetal")]
+        tenant_id = row.pop("tenant")
+        for field, value in row.items():
+            deltas[(tenant_id, old_group)][field] -= value or 0
+            deltas[(tenant_id, new_group)][field] += value or 0
+    return deltas
+
+
+@receiver(post_save, sender=Baremetal)
+def update_quota_usage_on_host_move(
+    sender: Any, instance: Baremetal, created: bool, **kwargs: Any
+) -> None:
+    if created:
+        return
+    previous = previous_getter(instance, instance._stored_values)
+    after = saved_getter(instance, kwargs.get("update_fields"))
+    BaremetalGroupTenantQuota.adjust_usage(
+        moved_host_usage_deltas({instance.pk: (previous("group_id"), after("group_id"))})
+    )
+
+
+@receiver(bulk_updated, sender=Baremetal)
+def update_quota_usage_on_bulk_host_move(
+    sender: Any, instances: List[Baremetal], previous: Dict[Any, Dict[str, Any]], **kwargs: Any
+) -> None:
+    BaremetalGroupTenantQuota.adjust_usage(
+        moved_host_usage_deltas(
+            {
+                instance.pk: (
+                    previous_getter(instance, previous.get(instance.pk, {}))("group_id"),
+                    instance.group_id,
+                )
+                for instance in instances
+            }
+        )
+    )
+
+
+@receiver(post_save, sender=VirtualMachineSpecification)
+def update_quota_usage_on_resize(
+    sender: Any, instance: VirtualMachineSpecification, created: bool, **kwargs: Any
+) -> None:
+    if created:
+        return
+    previous = previous_getter(instance, instance._stored_values)
+    after = saved_getter(instance, kwargs.get("update_fields"))
+    growth = {
+        used: after(required) - previous(required) for required, used in QUOTA_USAGE_FIELDS.items()
+    }
+    if not any(growth.values()):
+        return
+    placed = (
+        VirtualMachine.objects.filter(specification=instance, baremetal__isnull=False)
+        .order_by()
+        .values("tenant", "baremetal__group")
+        .annotate(count=Count("pk"))
+        .values_list("tenant", "baremetal__group", "count")
+    )
+    BaremetalGroupTenantQuota.adjust_usage(
+        {
+            (tenant_id, group_id): {field: count * value for field, value in growth.items()}
+            for tenant_id, group_id, count in placed
+        }
+    )
+
+
+@receiver(post_save, sender=BaremetalGroupTenantQuota)
+def count_usage_of_quota(
+    sender: Any, instance: BaremetalGroupTenantQuota, created: bool, **kwargs: Any
+) -> None:
+    """A new quota, or one moved to another tenant or group, starts from the current usage"""
+    previous = previous_getter(instance, instance._stored_values)
+    if created or (previous("tenant_id"), previous("group_id")) != (
+        instance.tenant_id,
+        instance.group_id,
+    ):
+        reconcile_tenant_quota_usage(BaremetalGroupTenantQuota.objects.filter(pk=instance.pk))
@@ -0,0 +1,57 @@
+import json
+from typing import Any, Iterable, Iterator
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+# Rows are encoded one at a time and flushed in batches to keep writes large
+# while memory stays bounded by a single batch
+STREAM_BATCH_SIZE = 500
+
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def encode_json(data: Any) -> str:
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":"))
+
+
+def _batched(chunks: Iterable[str]) -> Iterator[str]:
+    buffer = []
+    for chunk in chunks:
+        buffer.append(chunk)
+        if len(buffer) >= STREAM_BATCH_SIZE:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def iter_json_array(rows: Iterable[Any]) -> Iterator[str]:
+    """Encode rows as a JSON array, one element at a time"""
+
+    def chunks() -> Iterator[str]:
+        yield "["
+        for index, row in enumerate(rows):
+            yield ("," if index else "") + encode_json(row)
+        yield "]"
+
+    return _batched(chunks())
+
+
+def iter_ndjson(rows: Iterable[Any]) -> Iterator[str]:
+    """Encode rows as newline-delimited JSON"""
+    return _batched(encode_json(row) + "\n" for row in rows)
+
+
+def streaming_export_response(
+    rows: Iterable[Any], fmt: str, filename: str
+) -> StreamingHttpResponse:
+    """Stream rows as a JSON array, or as NDJSON when ``fmt`` is ``ndjson``"""
+    if fmt == "ndjson":
+        content, content_type, extension = iter_ndjson(rows), NDJSON_MEDIA_TYPE, "ndjson"
+    else:
+        content, content_type, extension = iter_json_array(rows), JSON_MEDIA_TYPE, "json"
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{extension}"'
+    return response
@@ -1,7 +1,10 @@
+import json
+import uuid
 from typing import Tuple
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
 from rest_framework.test import APIClient, APITestCase
 
 
@@ -33,6 +36,15 @@ def auth_client(api_client: APIClient, admin_user) -> APIClient:
 
 
 from ..models import (
+    AnsibleGroup,
+    AnsibleGroupRelationship,
+    AnsibleGroupVariable,
+    AnsibleHost,
+    AnsibleHostVariable,
+    AnsibleInventory,
+    AnsibleInventoryVariable,
+    AnsibleInventoryVariableSetAssociation,
+    AnsibleVariableSet,
     Baremetal,
     BaremetalGroup,
     BaremetalModel,
@@ -46,7 +58,9 @@ from ..models import (
     Room,
     Supplier,
     Tenant,
+    Unit,
     VirtualMachineSpecification,
+    reconcile_baremetal_group_capacity,
 )
 
 User = get_user_model()
@@ -145,3 +159,146 @@ class APITestSetup(APITestCase):
             required_memory=4,
             required_storage=100,
         )
+
+
+# ============================================================================
+# SHARED FACTORIES
+# ============================================================================
+
+
+def create_baremetals(count: int, offset: int = 0) -> list:
+    """``count`` racked baremetals of one model in a fresh fab/rack/group hierarchy"""
+    fab = Fab.objects.create(name=f"eager-fab-{offset}")
+    phase = Phase.objects.create(name=f"eager-phase-{offset}", fab=fab)
+    dc = DataCenter.objects.create(name=f"eager-dc-{offset}", phase=phase)
+    room = Room.objects.create(name=f"eager-room-{offset}", datacenter=dc)
+    rack = Rack.objects.create(
+        name=f"eager-rack-{offset}", bgp_number=f"BGP-E{offset}", as_number=65000, room=room
+    )
+    group = BaremetalGroup.objects.create(
+        name=f"eager-group-{offset}",
+        total_cpu=100,
+        total_memory=100,
+        total_storage=100,
+        available_cpu=100,
+        available_memory=100,
+        available_storage=100,
+        status="active",
+    )
+    manufacturer = Manufacturer.objects.create(name=f"eager-mfr-{offset}")
+    supplier = Supplier.objects.create(name=f"eager-supplier-{offset}")
+    model = BaremetalModel.objects.create(
+        name=f"eager-model-{offset}",
+        manufacturer=manufacturer,
+        total_cpu=32,
+        total_memory=256,
+        total_storage=1000,
+    )
+    model.suppliers.add(supplier)
+    pr = PurchaseRequisition.objects.create(pr_number=f"PR-E{offset}", requested_by="ops")
+    po = PurchaseOrder.objects.create(
+        po_number=f"PO-E{offset}", purchase_requisition=pr, supplier=supplier
+    )
+
+    baremetals = []
+    for i in range(count):
+        unit = Unit.objects.create(name=f"U{i + 1}", unit_number=i + 1, rack=rack)
+        baremetals.append(
+            Baremetal.objects.create(
+                name=f"eager-bm-{offset}-{i}",
+                serial_number=f"SN-E{offset}-{i}",
+                model=model,
+                fabrication=fab,
+                phase=phase,
+                data_center=dc,
+                rack=rack,
+                unit=unit,
+                status="active",
+                available_cpu=32,
+                available_memory=256,
+                available_storage=1000,
+                group=group,
+                pr=pr,
+                po=po,
+            )
+        )
+    return baremetals
+
+
+def baremetal_payload(template: Baremetal, count: int, prefix: str = "bulk") -> list:
+    """Create payloads for ``count`` baremetals related like ``template``"""
+    return [
+        {
+            "name": f"{prefix}-{i}",
+            "serial_number": f"SN-{prefix}-{i}",
+            "model": str(template.model_id),
+            "fabrication": str(template.fabrication_id),
+            "phase": str(template.phase_id),
+            "data_center": str(template.data_center_id),
+            "rack": str(template.rack_id),
+            "status": "active",
+            "available_cpu": 32,
+            "available_memory": 256,
+            "available_storage": 1000,
+            "group": str(template.group_id),
+            "pr": str(template.pr_id),
+            "po": str(template.po_id),
+        }
+        for i in range(count)
+    ]
+
+
+def ndjson(rows: list) -> str:
+    """``rows`` as newline-delimited JSON"""
+    return "".join(json.dumps(row) + "\n" for row in rows)
+
+
+def create_export_inventory(host_count: int) -> AnsibleInventory:
+    """An inventory with variables, a group hierarchy and ``host_count`` active hosts"""
+    inventory = AnsibleInventory.objects.create(name=f"export-{host_count}")
+    AnsibleInventoryVariable.objects.create(inventory=inventory, key="env", value="prod")
+    variable_set = AnsibleVariableSet.objects.create(
+        name=f"export-set-{host_count}", content="ntp: pool.ntp.org", content_type="yaml"
+    )
+    AnsibleInventoryVariableSetAssociation.objects.create(
+        inventory=inventory, variable_set=variable_set
+    )
+    web = AnsibleGroup.objects.create(inventory=inventory, name="web")
+    nginx = AnsibleGroup.objects.create(inventory=inventory, name="nginx")
+    AnsibleGroupRelationship.objects.create(parent_group=web, child_group=nginx)
+    AnsibleGroupVariable.objects.create(
+        group=web, key="http_port", value="8080", value_type="integer"
+    )
+
+    tenant_type = ContentType.objects.get_for_model(Tenant)
+    for i in range(host_count):
+        tenant = Tenant.objects.create(name=f"export-{host_count}-host-{i}", status="active")
+        host = AnsibleHost.objects.create(
+            inventory=inventory,
+            content_type=tenant_type,
+            object_id=tenant.id,
+            ansible_host=f"10.0.0.{i + 1}",
+        )
+        host.groups.add(nginx)
+        AnsibleHostVariable.objects.create(host=host, key="rack", value=f"r{i}")
+    AnsibleHost.objects.create(
+        inventory=inventory, content_type=tenant_type, object_id=uuid.uuid4(), status="inactive"
+    )
+    return inventory
+
+
+@pytest.fixture
+def placement():
+    """Two baremetals of one group, a tenant and a small VM specification"""
+    baremetals = create_baremetals(2)
+    group = baremetals[0].group
+    reconcile_baremetal_group_capacity()
+    tenant = Tenant.objects.create(name="capacity-tenant", status="active")
+    spec = VirtualMachineSpecification.objects.create(
+        name="capacity-spec",
+        generation="v1",
+        required_cpu=4,
+        required_memory=16,
+        required_storage=100,
+    )
+    return baremetals, group, tenant, spec
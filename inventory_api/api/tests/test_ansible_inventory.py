@@ -1,5 +1,14 @@
 import pytest
 from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import (
+    AnsibleGroup,
+    AnsibleInventory,
+    AnsibleInventoryVariableSetAssociation,
+    AnsibleVariableSet,
+)
 
 # ============================================================================
 # ANSIBLE INVENTORY TESTS
@@ -1835,3 +1844,39 @@ max_connections={{ max_connections }}
     assert "192.168.1.11" in rendered
     assert "http_port=80" in rendered
     assert "max_connections=100" in rendered
+
+
+@pytest.mark.django_db
+def test_ansible_inventory_list_counts_are_annotated(auth_client):
+    """Test that inventory list counts come from one query regardless of size"""
+    variable_set = AnsibleVariableSet.objects.create(name="count-set", content="a: 1")
+
+    def create_inventory(index):
+        inventory = AnsibleInventory.objects.create(name=f"count-inventory-{index}")
+        for group_index in range(index + 1):
+            AnsibleGroup.objects.create(inventory=inventory, name=f"group-{group_index}")
+        AnsibleInventoryVariableSetAssociation.objects.create(
+            inventory=inventory, variable_set=variable_set
+        )
+        return inventory
+
+    create_inventory(0)
+    with CaptureQueriesContext(connection) as small:
+        r = auth_client.get("/api/v1/ansible-inventories")
+    assert r.status_code == 200
+
+    for index in range(1, 5):
+        create_inventory(index)
+    with CaptureQueriesContext(connection) as large:
+        r = auth_client.get("/api/v1/ansible-inventories")
+    assert r.status_code == 200
+    assert len(small.captured_queries) == len(large.captured_queries)
+
+    counts = {item["name"]: item for item in r.data["results"]}
+    assert counts["count-inventory-3"]["groups_count"] == 4
+    assert counts["count-inventory-3"]["hosts_count"] == 0
+    assert counts["count-inventory-3"]["associated_variable_sets_count"] == 1
+
+    r = auth_client.get(f"/api/v1/ansible-variable-sets/{variable_set.id}")
+    assert r.status_code == 200
+    assert r.data["associated_inventories_count"] == 5
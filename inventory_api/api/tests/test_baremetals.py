@@ -698,7 +698,7 @@ def test_baremetal_model_create(auth_client):
     assert r.data["total_cpu"] == 48
     model_id = r.data["id"]
     # Fetch with read serializer to validate nested suppliers
-    r_detail = auth_client.get(f"/api/v1/baremetal-models/{model_id}")
+    r_detail = auth_client.get(f"/api/v1/baremetal-models/{model_id}?expand=suppliers")
     assert r_detail.status_code == 200
     resp_supplier_names = [s["name"] for s in r_detail.data.get("suppliers", [])]
     assert "Supplier-A" in resp_supplier_names and "Supplier-B" in resp_supplier_names
@@ -764,7 +764,7 @@ def test_baremetal_model_update_put(auth_client):
     assert r.data["name"] == "PowerEdge R740xd"
     assert r.data["total_cpu"] == 128
     # Fetch with read serializer to validate nested suppliers
-    r_detail = auth_client.get(f"/api/v1/baremetal-models/{model_id}")
+    r_detail = auth_client.get(f"/api/v1/baremetal-models/{model_id}?expand=suppliers")
     assert r_detail.status_code == 200
     resp_supplier_names = [s["name"] for s in r_detail.data.get("suppliers", [])]
     assert "S-One" in resp_supplier_names and "S-Two" in resp_supplier_names
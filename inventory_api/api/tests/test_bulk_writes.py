@@ -0,0 +1,138 @@
+import uuid
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Baremetal, Tenant, VirtualMachine, VirtualMachineSpecification
+from .base import auth_client, baremetal_payload, create_baremetals
+
+# ============================================================================
+# BULK WRITE TESTS
+# ============================================================================
+
+
+@pytest.mark.django_db
+def test_bulk_create_baremetals(auth_client):
+    template = create_baremetals(1)[0]
+    r = auth_client.post("/api/v1/baremetals/bulk", baremetal_payload(template, 3), format="json")
+    assert r.status_code == 201
+    assert [item["name"] for item in r.data] == ["bulk-0", "bulk-1", "bulk-2"]
+    assert Baremetal.objects.filter(name__startswith="bulk-").count() == 3
+
+
+@pytest.mark.django_db
+def test_bulk_create_query_count_is_independent_of_size(auth_client):
+    template = create_baremetals(1)[0]
+    counts = []
+    for prefix, count in (("small", 2), ("large", 20)):
+        with CaptureQueriesContext(connection) as ctx:
+            r = auth_client.post(
+                "/api/v1/baremetals", baremetal_payload(template, count, prefix), format="json"
+            )
+        assert r.status_code == 201
+        counts.append(len(ctx.captured_queries))
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.django_db
+def test_bulk_create_reports_errors_per_item(auth_client):
+    template = create_baremetals(1)[0]
+    payload = baremetal_payload(template, 4)
+    payload[1]["model"] = str(uuid.uuid4())
+    payload[2]["serial_number"] = template.serial_number
+    payload[3]["serial_number"] = payload[0]["serial_number"]
+
+    r = auth_client.post("/api/v1/baremetals/bulk", payload, format="json")
+    assert r.status_code == 400
+    errors = {error["index"]: error["errors"] for error in r.data["errors"]}
+    assert set(errors) == {1, 2, 3}
+    assert "model" in errors[1]
+    assert "serial_number" in errors[2]
+    assert "serial_number" in errors[3]
+    # Nothing is written when any item is invalid
+    assert not Baremetal.objects.filter(name__startswith="bulk-").exists()
+
+
+@pytest.mark.django_db
+def test_bulk_update_baremetals(auth_client):
+    baremetals = create_baremetals(3)
+    payload = [{"id": str(bm.id), "status": "retired"} for bm in baremetals[:2]]
+    payload.append({"id": str(baremetals[2].id), "serial_number": baremetals[2].serial_number})
+
+    r = auth_client.patch("/api/v1/baremetals/bulk", payload, format="json")
+    assert r.status_code == 200
+    assert [item["status"] for item in r.data] == ["retired", "retired", "active"]
+    assert Baremetal.objects.filter(status="retired").count() == 2
+
+
+@pytest.mark.django_db
+def test_bulk_update_reports_missing_and_invalid_items(auth_client):
+    baremetals = create_baremetals(2)
+    payload = [
+        {"id": str(uuid.uuid4()), "status": "retired"},
+        {"id": str(baremetals[0].id), "serial_number": baremetals[1].serial_number},
+        {"id": str(baremetals[1].id), "status": "unknown"},
+    ]
+    r = auth_client.patch("/api/v1/baremetals/bulk", payload, format="json")
+    assert r.status_code == 400
+    errors = {error["index"]: error["errors"] for error in r.data["errors"]}
+    assert errors[0] == {"id": ["Not found."]}
+    assert "serial_number" in errors[1]
+    assert "status" in errors[2]
+
+
+@pytest.mark.django_db
+def test_bulk_delete_virtual_machines(auth_client):
+    baremetal = create_baremetals(1)[0]
+    tenant = Tenant.objects.create(name="bulk-tenant", status="active")
+    spec = VirtualMachineSpecification.objects.create(
+        name="bulk-spec", generation="v1", required_cpu=1, required_memory=1, required_storage=1
+    )
+    vms = [
+        VirtualMachine.objects.create(
+            name=f"bulk-vm-{i}", tenant=tenant, baremetal=baremetal, specification=spec
+        )
+        for i in range(3)
+    ]
+
+    r = auth_client.delete(
+        "/api/v1/virtual-machines/bulk", [str(vms[0].id), str(uuid.uuid4())], format="json"
+    )
+    assert r.status_code == 400
+    assert VirtualMachine.objects.count() == 3
+
+    r = auth_client.delete(
+        "/api/v1/virtual-machines/bulk", [{"id": str(vm.id)} for vm in vms[:2]], format="json"
+    )
+    assert r.status_code == 200
+    assert list(VirtualMachine.objects.values_list("name", flat=True)) == ["bulk-vm-2"]
+
+
+@pytest.mark.django_db
+def test_bulk_create_virtual_machines(auth_client):
+    baremetal = create_baremetals(1)[0]
+    tenant = Tenant.objects.create(name="bulk-tenant", status="active")
+    spec = VirtualMachineSpecification.objects.create(
+        name="bulk-spec", generation="v1", required_cpu=1, required_memory=1, required_storage=1
+    )
+    payload = [
+        {
+            "name": f"bulk-vm-{i}",
+            "tenant": str(tenant.id),
+            "baremetal": str(baremetal.id),
+            "specification": str(spec.id),
+            "status": "running",
+        }
+        for i in range(2)
+    ]
+    r = auth_client.post("/api/v1/virtual-machines/bulk", payload, format="json")
+    assert r.status_code == 201
+    assert r.data[0]["tenant"]["name"] == "bulk-tenant"
+    assert VirtualMachine.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_bulk_rejects_non_list_payloads(auth_client):
+    assert auth_client.post("/api/v1/baremetals/bulk", {}, format="json").status_code == 400
+    assert auth_client.patch("/api/v1/baremetals/bulk", [], format="json").status_code == 400
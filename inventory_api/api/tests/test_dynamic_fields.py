@@ -0,0 +1,78 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Tenant, VirtualMachine, VirtualMachineSpecification
+from .base import auth_client, create_baremetals
+
+# ============================================================================
+# SPARSE FIELDSET / EXPANSION TESTS
+# ============================================================================
+
+
+@pytest.fixture
+def vm(db):
+    baremetal = create_baremetals(1)[0]
+    tenant = Tenant.objects.create(name="fields-tenant", status="active")
+    spec = VirtualMachineSpecification.objects.create(
+        name="fields-spec",
+        generation="v1",
+        required_cpu=1,
+        required_memory=1,
+        required_storage=1,
+    )
+    return VirtualMachine.objects.create(
+        name="fields-vm", tenant=tenant, baremetal=baremetal, specification=spec
+    )
+
+
+@pytest.mark.django_db
+def test_default_response_collapses_relations(auth_client, vm):
+    r = auth_client.get(f"/api/v1/virtual-machines/{vm.id}")
+    assert r.status_code == 200
+    assert str(r.data["baremetal"]) == str(vm.baremetal_id)
+    assert str(r.data["tenant"]) == str(vm.tenant_id)
+
+
+@pytest.mark.django_db
+def test_expand_renders_only_listed_level(auth_client, vm):
+    r = auth_client.get(f"/api/v1/virtual-machines/{vm.id}?expand=baremetal")
+    assert r.status_code == 200
+    assert str(r.data["tenant"]) == str(vm.tenant_id)
+    assert r.data["baremetal"]["name"] == vm.baremetal.name
+    assert str(r.data["baremetal"]["rack"]) == str(vm.baremetal.rack_id)
+    assert str(r.data["baremetal"]["po"]) == str(vm.baremetal.po_id)
+
+
+@pytest.mark.django_db
+def test_fields_param_limits_rendered_fields(auth_client, vm):
+    r = auth_client.get("/api/v1/virtual-machines?fields=id,name")
+    assert r.status_code == 200
+    assert set(r.data["results"][0]) == {"id", "name"}
+
+
+@pytest.mark.django_db
+def test_empty_expand_returns_ids_only(auth_client, vm):
+    r = auth_client.get(f"/api/v1/virtual-machines/{vm.id}?expand=")
+    assert r.status_code == 200
+    assert str(r.data["baremetal"]) == str(vm.baremetal_id)
+    assert str(r.data["tenant"]) == str(vm.tenant_id)
+
+
+@pytest.mark.django_db
+def test_expand_dotted_path(auth_client, vm):
+    r = auth_client.get(f"/api/v1/virtual-machines/{vm.id}?expand=baremetal.rack")
+    assert r.status_code == 200
+    assert str(r.data["tenant"]) == str(vm.tenant_id)
+    assert r.data["baremetal"]["rack"]["name"] == vm.baremetal.rack.name
+    assert str(r.data["baremetal"]["rack"]["room"]) == str(vm.baremetal.rack.room_id)
+
+
+@pytest.mark.django_db
+def test_fields_param_narrows_selected_columns(auth_client, vm):
+    with CaptureQueriesContext(connection) as ctx:
+        r = auth_client.get("/api/v1/virtual-machines?fields=id,name")
+    assert r.status_code == 200
+    select_sql = [q["sql"] for q in ctx.captured_queries if "LIMIT" in q["sql"]][-1]
+    assert '"api_virtualmachine"."status"' not in select_sql
+    assert "JOIN" not in select_sql
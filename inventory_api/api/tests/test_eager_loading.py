@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Tenant, VirtualMachine, VirtualMachineSpecification
+from ..v1 import serializers
+from ..v1.mixins import get_eager_loading_paths
+from .base import auth_client, create_baremetals
+
+# ============================================================================
+# EAGER LOADING TESTS
+# ============================================================================
+
+
+def _count_queries(client, url: str) -> int:
+    with CaptureQueriesContext(connection) as ctx:
+        r = client.get(url)
+    assert r.status_code == 200
+    return len(ctx.captured_queries)
+
+
+def test_eager_loading_paths_follow_nested_serializers():
+    select, prefetch = get_eager_loading_paths(serializers.BaremetalSerializer)
+    assert "rack__room__datacenter__phase__fab" in select
+    assert "po__supplier" in select
+    assert "model__manufacturer" in select
+    assert prefetch == ["model__suppliers"]
+
+
+def test_eager_loading_paths_prefetch_generic_and_many_relations():
+    select, prefetch = get_eager_loading_paths(serializers.AnsibleHostSerializer)
+    assert select == []
+    assert "groups" in prefetch
+    assert "groups__variables" in prefetch
+    assert "host" in prefetch
+
+
+@pytest.mark.django_db
+def test_baremetal_list_query_count_is_constant(auth_client):
+    create_baremetals(1, offset=0)
+    small = _count_queries(auth_client, "/api/v1/baremetals")
+
+    create_baremetals(8, offset=1)
+    large = _count_queries(auth_client, "/api/v1/baremetals")
+
+    assert small == large
+
+
+@pytest.mark.django_db
+def test_virtual_machine_list_query_count_is_constant(auth_client):
+    tenant = Tenant.objects.create(name="eager-tenant", status="active")
+    spec = VirtualMachineSpecification.objects.create(
+        name="eager-spec",
+        generation="v1",
+        required_cpu=1,
+        required_memory=1,
+        required_storage=1,
+    )
+    baremetals = create_baremetals(6)
+
+    VirtualMachine.objects.create(
+        name="eager-vm-0", tenant=tenant, baremetal=baremetals[0], specification=spec
+    )
+    small = _count_queries(auth_client, "/api/v1/virtual-machines")
+
+    for i, baremetal in enumerate(baremetals[1:], start=1):
+        VirtualMachine.objects.create(
+            name=f"eager-vm-{i}", tenant=tenant, baremetal=baremetal, specification=spec
+        )
+    large = _count_queries(auth_client, "/api/v1/virtual-machines")
+
+    assert small == large
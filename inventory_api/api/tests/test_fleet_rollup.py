@@ -0,0 +1,74 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..fleet_rollup import fleet_rollup, rollup_sql
+from ..models import Baremetal, Rack
+from .base import auth_client, create_baremetals
+
+# ============================================================================
+# FLEET ROLLUP TESTS
+# ============================================================================
+
+
+@pytest.fixture
+def fleet():
+    first = create_baremetals(2, offset=0)
+    second = create_baremetals(3, offset=1)
+    extra = Rack.objects.create(
+        name="eager-rack-extra", bgp_number="BGP-X", as_number=65001, room=first[0].rack.room
+    )
+    Baremetal.objects.filter(pk=first[1].pk).update(rack=extra, unit=None)
+    Baremetal.objects.filter(pk=second[0].pk).update(status="retired")
+    Baremetal.objects.filter(pk=second[1].pk).update(available_cpu=10)
+    Baremetal.objects.filter(pk=second[2].pk).update(rack=None, unit=None)
+    return first, second, extra
+
+
+@pytest.mark.django_db
+def test_rollup_reports_every_level_in_one_query(fleet):
+    first, second, extra = fleet
+    with CaptureQueriesContext(connection) as ctx:
+        report = fleet_rollup()
+    assert len(ctx.captured_queries) == 1
+
+    assert report["baremetals"] == 5
+    assert report["status"] == {"active": 4, "inactive": 0, "pending": 0, "retired": 1}
+    assert report["available_cpu"] == 4 * 32 + 10
+
+    fabs = report["fabs"]
+    assert [fab["name"] for fab in fabs] == ["eager-fab-0", "eager-fab-1", None]
+    assert [fab["baremetals"] for fab in fabs] == [2, 2, 1]
+    assert fabs[0]["id"] == first[0].fabrication_id
+    assert fabs[1]["status"]["retired"] == 1
+    assert fabs[1]["available_cpu"] == 42
+
+    room = fabs[0]["phases"][0]["data_centers"][0]["rooms"][0]
+    assert room["name"] == "eager-room-0"
+    assert room["baremetals"] == 2
+    racks = {rack["id"]: rack for rack in room["racks"]}
+    assert set(racks) == {first[0].rack_id, extra.id}
+    assert racks[extra.id]["baremetals"] == 1
+    assert racks[extra.id]["available_memory"] == 256
+    assert "racks" not in racks[extra.id]
+
+    # Baremetals without a rack sit on a path of null entries
+    unassigned = fabs[2]["phases"][0]["data_centers"][0]["rooms"][0]["racks"][0]
+    assert (unassigned["id"], unassigned["baremetals"]) == (None, 1)
+
+
+@pytest.mark.django_db
+def test_rollup_of_an_empty_fleet(auth_client):
+    r = auth_client.get("/api/v1/fleet-rollup")
+    assert r.status_code == 200
+    assert r.data["baremetals"] == 0
+    assert r.data["available_cpu"] == 0
+    assert r.data["fabs"] == []
+
+
+def test_postgresql_uses_group_by_rollup():
+    sql, params = rollup_sql("postgresql")
+    assert "GROUP BY ROLLUP" in sql
+    assert "GROUPING(" in sql
+    assert "UNION ALL" not in sql
+    assert params == ["active", "inactive", "pending", "retired"]
@@ -0,0 +1,248 @@
+import importlib
+import io
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+
+from ..models import (
+    Baremetal,
+    BaremetalGroup,
+    VirtualMachine,
+    reconcile_baremetal_capacity,
+    reconcile_baremetal_group_capacity,
+)
+from ..models.baremetal import AVAILABLE_CAPACITY_FIELDS, TOTAL_CAPACITY_FIELDS
+from .base import auth_client, baremetal_payload, create_baremetals, placement
+
+# ============================================================================
+# BAREMETAL GROUP CAPACITY TESTS
+# ============================================================================
+
+
+def _stored(group: BaremetalGroup) -> dict:
+    group.refresh_from_db()
+    return {
+        field: getattr(group, field) for field in TOTAL_CAPACITY_FIELDS + AVAILABLE_CAPACITY_FIELDS
+    }
+
+
+def _derived(group: BaremetalGroup) -> dict:
+    sums = Baremetal.objects.filter(group=group).aggregate(
+        **{field: Sum(f"model__{field}") for field in TOTAL_CAPACITY_FIELDS},
+        **{field: Sum(field) for field in AVAILABLE_CAPACITY_FIELDS},
+    )
+    return {field: value or 0 for field, value in sums.items()}
+
+
+@pytest.mark.django_db
+def test_reconcile_derives_group_capacity_in_one_aggregate():
+    baremetals = create_baremetals(2)
+    group = baremetals[0].group
+    BaremetalGroup.objects.filter(pk=group.pk).update(total_cpu=1, available_gpu=9)
+
+    assert reconcile_baremetal_group_capacity() == 1
+    assert _stored(group) == _derived(group)
+    assert (group.total_cpu, group.available_cpu) == (64, 64)
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert reconcile_baremetal_group_capacity() == 0
+    assert sum("GROUP BY" in query["sql"] for query in ctx.captured_queries) == 1
+
+    out = io.StringIO()
+    call_command("reconcile_group_capacity", stdout=out)
+    assert "0 baremetal groups" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_vm_lifecycle_moves_host_and_group_capacity(placement):
+    baremetals, group, tenant, spec = placement
+    vm = VirtualMachine.objects.create(
+        name="vm-1", tenant=tenant, baremetal=baremetals[0], specification=spec, status="running"
+    )
+    baremetals[0].refresh_from_db()
+    assert (baremetals[0].available_cpu, baremetals[0].available_memory) == (28, 240)
+    assert _stored(group)["available_cpu"] == 60
+    assert _stored(group) == _derived(group)
+
+    vm.baremetal = baremetals[1]
+    vm.save()
+    spec.required_cpu = 8
+    spec.save()
+    assert Baremetal.objects.get(pk=baremetals[1].pk).available_cpu == 24
+    assert Baremetal.objects.get(pk=baremetals[0].pk).available_cpu == 32
+    assert _stored(group) == _derived(group)
+
+    vm.delete()
+    assert _stored(group)["available_cpu"] == 64
+    assert _stored(group) == _derived(group)
+
+
+@pytest.mark.django_db
+def test_baremetal_lifecycle_moves_group_capacity(placement):
+    baremetals, group, tenant, spec = placement
+    other = BaremetalGroup.objects.create(
+        name="other-group",
+        total_cpu=0,
+        total_memory=0,
+        total_storage=0,
+        available_cpu=0,
+        available_memory=0,
+        available_storage=0,
+        status="active",
+    )
+    baremetals[0].group = other
+    baremetals[0].available_cpu = 10
+    baremetals[0].save(update_fields=["group", "available_cpu"])
+    assert _stored(group) == _derived(group)
+    assert _stored(other) == _derived(other)
+    assert (other.total_cpu, other.available_cpu) == (32, 10)
+
+    VirtualMachine.objects.create(
+        name="vm-2", tenant=tenant, baremetal=baremetals[0], specification=spec, status="running"
+    )
+    Baremetal.objects.get(pk=baremetals[0].pk).delete()
+    assert _stored(other) == _derived(other) == {field: 0 for field in _derived(other)}
+
+
+@pytest.mark.django_db
+def test_bulk_vm_writes_move_capacity(auth_client, placement):
+    baremetals, group, tenant, spec = placement
+    payload = [
+        {
+            "name": f"bulk-vm-{i}",
+            "tenant": str(tenant.id),
+            "baremetal": str(baremetals[i % 2].id),
+            "specification": str(spec.id),
+            "status": "running",
+        }
+        for i in range(4)
+    ]
+    r = auth_client.post("/api/v1/virtual-machines/bulk", payload, format="json")
+    assert r.status_code == 201
+    assert _stored(group)["available_cpu"] == 64 - 4 * 4
+    assert _stored(group) == _derived(group)
+
+    r = auth_client.delete(
+        "/api/v1/virtual-machines/bulk", [vm["id"] for vm in r.data], format="json"
+    )
+    assert r.status_code == 200
+    assert _stored(group)["available_cpu"] == 64
+
+
+@pytest.mark.django_db
+def test_stale_baremetal_save_keeps_reservations(auth_client, placement):
+    baremetals, group, tenant, spec = placement
+    stale = Baremetal.objects.get(pk=baremetals[0].pk)
+    VirtualMachine.objects.create(
+        name="vm-3", tenant=tenant, baremetal=baremetals[0], specification=spec, status="running"
+    )
+
+    stale.name = "renamed"
+    stale.save()
+    assert Baremetal.objects.get(pk=stale.pk).available_cpu == 28
+    assert _stored(group) == _derived(group)
+
+    # Edits left out of update_fields stay pending on the instance
+    stale.available_cpu = 1
+    stale.save(update_fields=["name", "group"])
+    assert stale.available_cpu == 1
+    assert Baremetal.objects.get(pk=stale.pk).available_cpu == 28
+    assert _stored(group) == _derived(group)
+
+    r = auth_client.patch(
+        f"/api/v1/baremetals/{stale.pk}",
+        {"available_cpu": 32, "status": "inactive"},
+        format="json",
+    )
+    assert r.status_code == 200
+    assert r.data["available_cpu"] == 28
+    assert _stored(group) == _derived(group)
+
+
+@pytest.mark.django_db
+def test_reconcile_subtracts_vms_placed_before_tracking(placement):
+    baremetals, group, tenant, spec = placement
+    VirtualMachine.objects.create(
+        name="vm-4", tenant=tenant, baremetal=baremetals[0], specification=spec, status="running"
+    )
+    # Hosts of VMs placed before reservations were counted still report their totals
+    Baremetal.objects.filter(pk=baremetals[0].pk).update(available_cpu=32, available_memory=256)
+    reconcile_baremetal_group_capacity()
+
+    out = io.StringIO()
+    call_command("reconcile_group_capacity", stdout=out)
+    assert "1 baremetals" in out.getvalue()
+    assert "1 baremetal groups" in out.getvalue()
+    assert Baremetal.objects.get(pk=baremetals[0].pk).available_cpu == 28
+    assert _stored(group)["available_cpu"] == 60
+    assert _stored(group) == _derived(group)
+    assert reconcile_baremetal_capacity() == 0
+
+    VirtualMachine.objects.get(name="vm-4").delete()
+    assert Baremetal.objects.get(pk=baremetals[0].pk).available_cpu == 32
+    assert _stored(group)["available_cpu"] == 64
+
+
+@pytest.mark.django_db
+def test_data_migration_subtracts_existing_vms(placement):
+    migration = importlib.import_module(
+        "inventory_api.api.migrations.0011_baremetal_capacity_backfill"
+    )
+    baremetals, group, tenant, spec = placement
+    VirtualMachine.objects.create(
+        name="vm-5", tenant=tenant, baremetal=baremetals[1], specification=spec, status="running"
+    )
+    Baremetal.objects.update(available_cpu=32, available_memory=256)
+    BaremetalGroup.objects.filter(pk=group.pk).update(total_cpu=0, available_cpu=0)
+
+    migration.subtract_placed_vms(apps, None)
+    assert Baremetal.objects.get(pk=baremetals[1].pk).available_memory == 240
+    assert Baremetal.objects.get(pk=baremetals[0].pk).available_memory == 256
+    assert (_stored(group)["total_cpu"], _stored(group)["available_cpu"]) == (64, 60)
+    assert _stored(group) == _derived(group)
+
+
+@pytest.mark.django_db
+def test_group_counters_are_not_written_by_clients_or_stale_saves(auth_client, placement):
+    baremetals, group, tenant, spec = placement
+    stale = BaremetalGroup.objects.get(pk=group.pk)
+    VirtualMachine.objects.create(
+        name="vm-6", tenant=tenant, baremetal=baremetals[0], specification=spec, status="running"
+    )
+    stale.description = "edited"
+    stale.save()
+    assert _stored(group)["available_cpu"] == 60
+    assert _stored(group) == _derived(group)
+
+    r = auth_client.patch(
+        f"/api/v1/baremetal-groups/{group.pk}",
+        {"total_cpu": 1, "available_cpu": 1, "status": "inactive"},
+        format="json",
+    )
+    assert r.status_code == 200
+    assert (r.data["total_cpu"], r.data["available_cpu"]) == (64, 60)
+
+    payload = {"name": "new-group", "total_cpu": 100, "available_cpu": 50, "status": "active"}
+    r = auth_client.post("/api/v1/baremetal-groups", payload, format="json")
+    assert r.status_code == 201
+    assert (r.data["total_cpu"], r.data["available_cpu"]) == (0, 0)
+
+
+@pytest.mark.django_db
+def test_new_baremetals_start_at_their_model_totals(auth_client, placement):
+    baremetals, group, tenant, spec = placement
+    payload = baremetal_payload(baremetals[0], 2, prefix="derived")
+    for item in payload:
+        item.update(available_cpu=1, available_memory=1)
+    r = auth_client.post("/api/v1/baremetals", payload[0], format="json")
+    assert r.status_code == 201
+    assert (r.data["available_cpu"], r.data["available_memory"]) == (32, 256)
+
+    r = auth_client.post("/api/v1/baremetals/bulk", payload[1:], format="json")
+    assert r.status_code == 201
+    assert (r.data[0]["available_cpu"], r.data[0]["available_memory"]) == (32, 256)
+    assert _stored(group) == _derived(group)
@@ -0,0 +1,167 @@
+import uuid
+from io import StringIO
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+
+from ..models import (
+    AnsibleGroup,
+    AnsibleGroupClosure,
+    AnsibleGroupRelationship,
+    AnsibleGroupVariable,
+    AnsibleHost,
+    AnsibleInventory,
+    Tenant,
+)
+from .base import auth_client
+
+# ============================================================================
+# GROUP HIERARCHY CLOSURE TESTS
+# ============================================================================
+
+
+@pytest.fixture
+def diamond(db):
+    """all -> (web, db) -> leaf"""
+    inventory = AnsibleInventory.objects.create(name="closure-inventory")
+    groups = {
+        name: AnsibleGroup.objects.create(inventory=inventory, name=name)
+        for name in ("all", "web", "db", "leaf")
+    }
+    for parent, child in (("all", "web"), ("all", "db"), ("web", "leaf"), ("db", "leaf")):
+        AnsibleGroupRelationship.objects.create(
+            parent_group=groups[parent], child_group=groups[child]
+        )
+    return groups
+
+
+def _closure(groups: dict) -> dict:
+    names = {group.pk: name for name, group in groups.items()}
+    return {
+        (names[row.ancestor_id], names[row.descendant_id]): row.path_count
+        for row in AnsibleGroupClosure.objects.filter(ancestor_id__in=names)
+    }
+
+
+@pytest.mark.django_db
+def test_closure_counts_paths_through_diamond(diamond):
+    assert _closure(diamond) == {
+        ("all", "web"): 1,
+        ("all", "db"): 1,
+        ("all", "leaf"): 2,
+        ("web", "leaf"): 1,
+        ("db", "leaf"): 1,
+    }
+    assert set(diamond["leaf"].ancestor_groups) == {diamond["all"], diamond["web"], diamond["db"]}
+    assert set(diamond["all"].descendant_groups) == {
+        diamond["web"],
+        diamond["db"],
+        diamond["leaf"],
+    }
+
+
+@pytest.mark.django_db
+def test_closure_keeps_pairs_reachable_after_edge_delete(diamond):
+    AnsibleGroupRelationship.objects.get(
+        parent_group=diamond["web"], child_group=diamond["leaf"]
+    ).delete()
+    closure = _closure(diamond)
+    assert closure[("all", "leaf")] == 1
+    assert ("web", "leaf") not in closure
+
+
+@pytest.mark.django_db
+def test_closure_follows_edge_update(diamond):
+    rel = AnsibleGroupRelationship.objects.get(
+        parent_group=diamond["db"], child_group=diamond["leaf"]
+    )
+    rel.parent_group = diamond["all"]
+    rel.save()
+    closure = _closure(diamond)
+    assert ("db", "leaf") not in closure
+    assert closure[("all", "leaf")] == 2
+
+
+@pytest.mark.django_db
+def test_closure_rebuild_matches_incremental(diamond):
+    expected = _closure(diamond)
+    AnsibleGroupClosure.objects.all().delete()
+    AnsibleGroupClosure.rebuild(diamond["all"].inventory_id)
+    assert _closure(diamond) == expected
+
+
+@pytest.mark.django_db
+def test_cycle_rejected_by_model(diamond):
+    with pytest.raises(ValidationError):
+        AnsibleGroupRelationship.objects.create(
+            parent_group=diamond["leaf"], child_group=diamond["all"]
+        )
+
+
+@pytest.mark.django_db
+def test_cycle_rejected_by_api(auth_client, diamond):
+    payload = {"parent_group": str(diamond["leaf"].id), "child_group": str(diamond["web"].id)}
+    r = auth_client.post("/api/v1/ansible-group-relationships", payload, format="json")
+    assert r.status_code == 400
+    assert not AnsibleGroupClosure.objects.filter(
+        ancestor=diamond["leaf"], descendant=diamond["web"]
+    ).exists()
+
+
+@pytest.mark.django_db
+def test_all_hosts_includes_descendants_once(diamond, django_assert_max_num_queries):
+    tenant_type = ContentType.objects.get_for_model(Tenant)
+    host = AnsibleHost.objects.create(
+        inventory=diamond["all"].inventory, content_type=tenant_type, object_id=uuid.uuid4()
+    )
+    host.groups.add(diamond["leaf"], diamond["web"])
+    with django_assert_max_num_queries(1):
+        hosts = diamond["all"].all_hosts
+    assert hosts == [host]
+
+
+@pytest.mark.django_db
+def test_all_variables_inherits_from_ancestors(diamond):
+    AnsibleGroupVariable.objects.create(group=diamond["all"], key="region", value="eu")
+    AnsibleGroupVariable.objects.create(group=diamond["leaf"], key="role", value="leaf")
+    variables = diamond["leaf"].all_variables
+    assert variables["region"] == "eu"
+    assert variables["role"] == "leaf"
+
+
+@pytest.mark.django_db
+def test_rebuild_command_repairs_closure(diamond):
+    expected = _closure(diamond)
+    AnsibleGroupClosure.objects.filter(ancestor=diamond["all"]).delete()
+    out = StringIO()
+    call_command("rebuild_group_closure", str(diamond["all"].inventory_id), stdout=out)
+    assert _closure(diamond) == expected
+    assert "1 inventories" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_flipping_an_edge_is_not_a_cycle(auth_client, diamond):
+    edge = AnsibleGroupRelationship.objects.get(
+        parent_group=diamond["web"], child_group=diamond["leaf"]
+    )
+    payload = {"parent_group": str(diamond["leaf"].id), "child_group": str(diamond["web"].id)}
+    r = auth_client.patch(f"/api/v1/ansible-group-relationships/{edge.id}", payload, format="json")
+    assert r.status_code == 200
+    closure = _closure(diamond)
+    assert closure[("leaf", "web")] == 1
+    assert ("web", "leaf") not in closure
+
+
+@pytest.mark.django_db
+def test_cycle_rejected_on_model_update(diamond):
+    edge = AnsibleGroupRelationship.objects.get(
+        parent_group=diamond["all"], child_group=diamond["web"]
+    )
+    edge.parent_group = diamond["leaf"]
+    with pytest.raises(ValidationError):
+        edge.save()
+    edge.parent_group = diamond["db"]
+    edge.save()
+    assert _closure(diamond)[("db", "web")] == 1
@@ -0,0 +1,196 @@
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..hierarchy_import import HierarchyImporter, iter_csv_rows, iter_ndjson_rows
+from ..models import Baremetal, DataCenter, Fab, Phase, Rack, Room, VirtualMachine
+from .base import auth_client, create_baremetals, ndjson, placement
+
+# ============================================================================
+# HIERARCHY IMPORT TESTS
+# ============================================================================
+
+HIERARCHY_CSV = """type,external_system_id,name,fab,phase,datacenter,room,bgp_number,as_number
+fab,F1,fab-1,,,,,,
+phase,P1,phase-1,F1,,,,,
+datacenter,D1,dc-1,,P1,,,,
+room,R1,room-1,,,D1,,,
+rack,K1,rack-1,,,,R1,bgp-1,65001
+rack,K2,rack-2,,,,R1,bgp-2,65002
+"""
+
+
+@pytest.mark.django_db
+def test_import_resolves_parents_by_external_id():
+    report = HierarchyImporter().run(iter_csv_rows(io.StringIO(HIERARCHY_CSV)))
+    assert report["created"] == 6
+    assert report["errors"] == []
+    rack = Rack.objects.select_related("room__datacenter__phase__fab").get(external_system_id="K2")
+    assert rack.as_number == 65002
+    assert rack.units.count() == rack.available_units == 42
+    assert rack.room.datacenter.phase.fab.name == "fab-1"
+
+
+@pytest.mark.django_db
+def test_import_is_an_upsert():
+    HierarchyImporter().run(iter_csv_rows(io.StringIO(HIERARCHY_CSV)))
+    rows = [{"external_system_id": "K1", "as_number": 65100, "status": "maintenance"}]
+    report = HierarchyImporter(row_type="rack").run(iter_ndjson_rows(io.StringIO(ndjson(rows))))
+    assert (report["created"], report["updated"]) == (0, 1)
+    rack = Rack.objects.get(external_system_id="K1")
+    assert (rack.name, rack.as_number, rack.status) == ("rack-1", 65100, "maintenance")
+    assert Rack.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_import_query_count_is_independent_of_chunk_size():
+    def rows(prefix: str, count: int) -> list:
+        return [
+            {"type": "fab", "external_system_id": f"{prefix}{i}", "name": f"{prefix}{i}"}
+            for i in range(count)
+        ]
+
+    counts = []
+    for prefix, count in (("a", 5), ("b", 50)):
+        with CaptureQueriesContext(connection) as ctx:
+            HierarchyImporter().run(iter_ndjson_rows(io.StringIO(ndjson(rows(prefix, count)))))
+        counts.append(len(ctx.captured_queries))
+    assert counts[0] == counts[1]
+    assert Fab.objects.count() == 55
+
+
+@pytest.mark.django_db
+def test_import_chunks_see_parents_from_earlier_chunks():
+    rows = [{"type": "fab", "external_system_id": "F1", "name": "fab-1"}] + [
+        {"type": "phase", "external_system_id": f"P{i}", "name": f"phase-{i}", "fab": "F1"}
+        for i in range(5)
+    ]
+    report = HierarchyImporter(chunk_size=2).run(iter_ndjson_rows(io.StringIO(ndjson(rows))))
+    assert report["created"] == 6
+    assert Phase.objects.filter(fab__external_system_id="F1").count() == 5
+
+
+@pytest.mark.django_db
+def test_import_skips_invalid_rows_with_line_numbers():
+    HierarchyImporter().run(iter_csv_rows(io.StringIO(HIERARCHY_CSV)))
+    text = (
+        ndjson(
+            [
+                {"type": "room", "external_system_id": "R2", "name": "room-2", "datacenter": "D9"},
+                {"type": "rack", "external_system_id": "K3", "name": "rack-3", "as_number": "x"},
+                {
+                    "type": "rack",
+                    "external_system_id": "K4",
+                    "name": "rack-1",
+                    "bgp_number": "b4",
+                    "as_number": 1,
+                },
+                {"type": "rack", "name": "rack-5"},
+                {"type": "rack", "external_system_id": "K6", "name": "rack-6"},
+                {"type": "unit", "external_system_id": "U1"},
+                {"type": "datacenter", "external_system_id": "D2", "name": "dc-2"},
+            ]
+        )
+        + "not json\n"
+    )
+    report = HierarchyImporter().run(iter_ndjson_rows(io.StringIO(text)))
+    assert report["created"] == 1
+    assert [error["line"] for error in sorted(report["errors"], key=lambda e: e["line"])] == [
+        1,
+        2,
+        3,
+        4,
+        5,
+        6,
+        8,
+    ]
+    assert DataCenter.objects.filter(external_system_id="D2").exists()
+    assert not Room.objects.filter(external_system_id="R2").exists()
+
+
+@pytest.mark.django_db
+def test_import_baremetals_resolve_natural_keys():
+    template = create_baremetals(1)[0]
+    template.rack.external_system_id = "K-legacy"
+    template.rack.save()
+    row = {
+        "external_system_id": "B1",
+        "name": "legacy-bm",
+        "serial_number": "SN-legacy",
+        "status": "active",
+        "available_cpu": 8,
+        "available_memory": 64,
+        "available_storage": 500,
+        "rack": "K-legacy",
+        "model": template.model.name,
+        "group": template.group.name,
+        "pr": template.pr.pr_number,
+        "po": template.po.po_number,
+    }
+    report = HierarchyImporter(row_type="baremetal").run(
+        iter_ndjson_rows(io.StringIO(ndjson([row])))
+    )
+    assert report["errors"] == []
+    baremetal = Baremetal.objects.get(external_system_id="B1")
+    assert (baremetal.rack_id, baremetal.po_id) == (template.rack_id, template.po_id)
+
+
+@pytest.mark.django_db
+def test_import_derives_baremetal_capacity_instead_of_reading_it(placement):
+    baremetals, group, tenant, spec = placement
+    template = baremetals[0]
+    row = {
+        "external_system_id": "B2",
+        "name": "derived-bm",
+        "serial_number": "SN-derived",
+        "status": "active",
+        "available_cpu": 8,
+        "model": template.model.name,
+        "group": template.group.name,
+        "pr": template.pr.pr_number,
+        "po": template.po.po_number,
+    }
+
+    def run():
+        return HierarchyImporter(row_type="baremetal").run(
+            iter_ndjson_rows(io.StringIO(ndjson([row])))
+        )
+
+    assert run()["errors"] == []
+    baremetal = Baremetal.objects.get(external_system_id="B2")
+    assert baremetal.available_cpu == 32
+
+    VirtualMachine.objects.create(
+        name="imported-vm", tenant=tenant, baremetal=baremetal, specification=spec, status="up"
+    )
+    row["status"] = "inactive"
+    assert run()["updated"] == 1
+    baremetal.refresh_from_db()
+    assert (baremetal.status, baremetal.available_cpu) == ("inactive", 28)
+
+
+@pytest.mark.django_db
+def test_import_endpoint(auth_client):
+    upload = SimpleUploadedFile("hierarchy.csv", HIERARCHY_CSV.encode(), "text/csv")
+    r = auth_client.post("/api/v1/hierarchy-import", {"file": upload}, format="multipart")
+    assert r.status_code == 200
+    assert r.data["by_type"]["rack"] == {"created": 2, "updated": 0}
+
+    upload = SimpleUploadedFile("hierarchy.txt", b"type\n", "text/plain")
+    r = auth_client.post("/api/v1/hierarchy-import", {"file": upload}, format="multipart")
+    assert r.status_code == 400
+    assert "format" in r.data
+
+
+@pytest.mark.django_db
+def test_import_command(tmp_path):
+    path = tmp_path / "hierarchy.csv"
+    path.write_text(HIERARCHY_CSV)
+    out = io.StringIO()
+    call_command("import_hierarchy", str(path), "--chunk-size", "2", stdout=out)
+    assert "6 created" in out.getvalue()
+    assert Rack.objects.filter(room__external_system_id="R1").count() == 2
@@ -0,0 +1,206 @@
+import uuid
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import (
+    AnsibleGroup,
+    AnsibleHost,
+    AnsibleInventory,
+    Tenant,
+    VirtualMachine,
+    VirtualMachineSpecification,
+)
+from ..signals import bulk_created
+from .base import auth_client
+
+# ============================================================================
+# BULK HOST ENROLLMENT TESTS
+# ============================================================================
+
+URL = "/api/v1/ansible-hosts/enroll"
+
+
+@pytest.fixture
+def inventory(db):
+    inventory = AnsibleInventory.objects.create(name="enroll-inventory")
+    AnsibleGroup.objects.create(inventory=inventory, name="k8s")
+    AnsibleGroup.objects.create(inventory=inventory, name="workers")
+    return inventory
+
+
+def _hosts(count: int, prefix: str = "enroll") -> list:
+    tenant = Tenant.objects.create(name=f"{prefix}-tenant", status="active")
+    spec = VirtualMachineSpecification.objects.create(
+        name=f"{prefix}-spec",
+        generation="v1",
+        required_cpu=1,
+        required_memory=1,
+        required_storage=1,
+    )
+    vm_type = ContentType.objects.get_for_model(VirtualMachine).id
+    return [
+        {
+            "content_type": vm_type,
+            "object_id": str(
+                VirtualMachine.objects.create(
+                    name=f"{prefix}-{i}", tenant=tenant, specification=spec, status="running"
+                ).id
+            ),
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db
+def test_enroll_creates_hosts_and_memberships(auth_client, inventory):
+    k8s = AnsibleGroup.objects.get(name="k8s")
+    workers = AnsibleGroup.objects.get(name="workers")
+    hosts = _hosts(3)
+    hosts[0].update({"groups": [str(workers.id)], "ansible_user": "admin"})
+
+    payload = {
+        "inventory": str(inventory.id),
+        "groups": [str(k8s.id)],
+        "defaults": {"ansible_user": "ubuntu", "ansible_port": 2222},
+        "hosts": hosts,
+    }
+    r = auth_client.post(URL, payload, format="json")
+    assert r.status_code == 201
+    assert len(r.data["created"]) == 3
+    assert r.data["memberships_added"] == 4
+
+    first = AnsibleHost.objects.get(object_id=hosts[0]["object_id"])
+    assert first.ansible_user == "admin"
+    assert first.ansible_port == 2222
+    assert set(first.groups.values_list("name", flat=True)) == {"k8s", "workers"}
+    assert AnsibleHost.objects.get(object_id=hosts[1]["object_id"]).ansible_user == "ubuntu"
+    assert k8s.hosts.count() == 3
+
+
+@pytest.mark.django_db
+def test_enroll_skips_duplicates(auth_client, inventory):
+    k8s = AnsibleGroup.objects.get(name="k8s")
+    workers = AnsibleGroup.objects.get(name="workers")
+    hosts = _hosts(2)
+    payload = {"inventory": str(inventory.id), "groups": [str(k8s.id)], "hosts": hosts}
+    first = auth_client.post(URL, payload, format="json")
+    assert first.status_code == 201
+
+    # Repeat with an extra group and a duplicate entry in the payload
+    payload.update(groups=[str(k8s.id), str(workers.id)], hosts=hosts + hosts[:1])
+    r = auth_client.post(URL, payload, format="json")
+    assert r.status_code == 201
+    assert r.data["created"] == []
+    assert sorted(r.data["existing"]) == sorted(first.data["created"])
+    assert r.data["memberships_added"] == 2
+    assert AnsibleHost.objects.filter(inventory=inventory).count() == 2
+    assert workers.hosts.count() == 2
+
+
+@pytest.mark.django_db
+def test_enroll_validates_groups_and_objects(auth_client, inventory):
+    other = AnsibleGroup.objects.create(
+        inventory=AnsibleInventory.objects.create(name="other-inventory"), name="other"
+    )
+    hosts = _hosts(1)
+    payload = {"inventory": str(inventory.id), "groups": [str(other.id)], "hosts": hosts}
+    r = auth_client.post(URL, payload, format="json")
+    assert r.status_code == 400
+    assert "groups" in r.data
+
+    hosts.append({"content_type": hosts[0]["content_type"], "object_id": str(uuid.uuid4())})
+    r = auth_client.post(URL, {"inventory": str(inventory.id), "hosts": hosts}, format="json")
+    assert r.status_code == 400
+    assert set(r.data["hosts"]) == {1}
+    assert not AnsibleHost.objects.exists()
+
+
+@pytest.mark.django_db
+def test_enroll_query_count_is_independent_of_size(auth_client, inventory):
+    k8s = AnsibleGroup.objects.get(name="k8s")
+    counts = []
+    for prefix, count in (("small", 2), ("large", 25)):
+        payload = {
+            "inventory": str(inventory.id),
+            "groups": [str(k8s.id)],
+            "hosts": _hosts(count, prefix),
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            r = auth_client.post(URL, payload, format="json")
+        assert r.status_code == 201
+        counts.append(len(ctx.captured_queries))
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.django_db
+def test_enroll_invalidates_compiled_inventory(auth_client, inventory):
+    version = inventory.content_version
+    payload = {"inventory": str(inventory.id), "hosts": _hosts(1)}
+    assert auth_client.post(URL, payload, format="json").status_code == 201
+    inventory.refresh_from_db()
+    assert inventory.content_version > version
+
+
+@pytest.mark.django_db
+def test_enroll_rejects_content_types_that_are_not_hosts(auth_client, inventory):
+    hosts = _hosts(1)
+    tenant = Tenant.objects.create(name="not-a-host", status="active")
+    hosts.append(
+        {"content_type": ContentType.objects.get_for_model(Tenant).id, "object_id": str(tenant.id)}
+    )
+    # Permissions have integer primary keys, which a UUID lookup cannot query
+    hosts.append(
+        {
+            "content_type": ContentType.objects.get_for_model(Permission).id,
+            "object_id": str(uuid.uuid4()),
+        }
+    )
+    r = auth_client.post(URL, {"inventory": str(inventory.id), "hosts": hosts}, format="json")
+    assert r.status_code == 400
+    assert r.data["hosts"] == {
+        1: {"content_type": ["Unknown content type."]},
+        2: {"content_type": ["Unknown content type."]},
+    }
+    assert not AnsibleHost.objects.exists()
+
+
+@pytest.mark.django_db
+def test_enroll_reports_hosts_lost_to_a_concurrent_enrollment_as_existing(auth_client, inventory):
+    hosts = _hosts(2)
+    bulk_create = AnsibleHost.objects.bulk_create
+    concurrent = []
+
+    def enroll_concurrently(objs, **kwargs):
+        objs = list(objs)
+        concurrent.append(
+            AnsibleHost.objects.create(
+                inventory=inventory,
+                content_type_id=objs[0].content_type_id,
+                object_id=objs[0].object_id,
+            )
+        )
+        return bulk_create(objs, **kwargs)
+
+    signalled = []
+
+    def record(sender, instances, **kwargs):
+        signalled.extend(host.pk for host in instances)
+
+    bulk_created.connect(record, sender=AnsibleHost, dispatch_uid="test_enroll_record")
+    try:
+        with mock.patch.object(AnsibleHost.objects, "bulk_create", enroll_concurrently):
+            r = auth_client.post(
+                URL, {"inventory": str(inventory.id), "hosts": hosts}, format="json"
+            )
+    finally:
+        bulk_created.disconnect(sender=AnsibleHost, dispatch_uid="test_enroll_record")
+    assert r.status_code == 201
+    assert r.data["existing"] == [str(concurrent[0].pk)]
+    assert len(r.data["created"]) == 1
+    assert [str(pk) for pk in signalled] == r.data["created"]
+    assert AnsibleHost.objects.filter(inventory=inventory).count() == 2
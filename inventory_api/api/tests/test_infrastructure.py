@@ -130,7 +130,7 @@ def test_phase_retrieve(auth_client):
     create_r = auth_client.post("/api/v1/phases", payload, format="json")
     phase_id = create_r.data["id"]
 
-    r = auth_client.get(f"/api/v1/phases/{phase_id}")
+    r = auth_client.get(f"/api/v1/phases/{phase_id}?expand=fab")
     assert r.status_code == 200
     assert r.data["name"] == "phase-retrieve"
     assert str(r.data["fab"]["id"]) == str(fab["id"])  # GET returns nested object
@@ -153,7 +153,7 @@ def test_phase_update_put(auth_client):
     assert str(r.data["fab"]) == str(fab["id"])  # PUT returns UUID
 
     # Verify in database
-    r = auth_client.get(f"/api/v1/phases/{phase_id}")
+    r = auth_client.get(f"/api/v1/phases/{phase_id}?expand=fab")
     assert r.status_code == 200
     assert r.data["name"] == "phase-put-updated"
     assert str(r.data["fab"]["id"]) == str(fab["id"])  # GET returns nested object
@@ -177,7 +177,7 @@ def test_phase_update_patch(auth_client):
     assert str(r.data["fab"]) == str(fab["id"])  # PUT returns UUID
 
     # Verify in database
-    r = auth_client.get(f"/api/v1/phases/{phase_id}")
+    r = auth_client.get(f"/api/v1/phases/{phase_id}?expand=fab")
     assert r.status_code == 200
     assert r.data["name"] == "phase-patch-updated"
     assert str(r.data["fab"]["id"]) == str(fab["id"])  # GET returns nested object
@@ -342,7 +342,7 @@ def test_room_retrieve(auth_client):
     create_r = auth_client.post("/api/v1/rooms", payload, format="json")
     room_id = create_r.data["id"]
 
-    r = auth_client.get(f"/api/v1/rooms/{room_id}")
+    r = auth_client.get(f"/api/v1/rooms/{room_id}?expand=datacenter")
     assert r.status_code == 200
     assert r.data["name"] == "room-retrieve"
     assert str(r.data["datacenter"]["id"]) == str(dc["id"])
@@ -471,7 +471,7 @@ def test_rack_retrieve(auth_client):
     create_r = auth_client.post("/api/v1/racks", payload, format="json")
     rack_id = create_r.data["id"]
 
-    r = auth_client.get(f"/api/v1/racks/{rack_id}")
+    r = auth_client.get(f"/api/v1/racks/{rack_id}?expand=room")
     assert r.status_code == 200
     assert r.data["name"] == "rack-retrieve"
     assert r.data["as_number"] == 65002
@@ -608,11 +608,11 @@ def test_infrastructure_hierarchy_chain(auth_client):
     assert str(unit["rack"]) == str(rack["id"])
 
     # Test retrieval to ensure relationships are persisted
-    phase_check = auth_client.get(f"/api/v1/phases/{phase['id']}").data
-    dc_check = auth_client.get(f"/api/v1/data-centers/{dc['id']}").data
-    room_check = auth_client.get(f"/api/v1/rooms/{room['id']}").data
-    rack_check = auth_client.get(f"/api/v1/racks/{rack['id']}").data
-    unit_check = auth_client.get(f"/api/v1/units/{unit['id']}").data
+    phase_check = auth_client.get(f"/api/v1/phases/{phase['id']}?expand=fab").data
+    dc_check = auth_client.get(f"/api/v1/data-centers/{dc['id']}?expand=phase").data
+    room_check = auth_client.get(f"/api/v1/rooms/{room['id']}?expand=datacenter").data
+    rack_check = auth_client.get(f"/api/v1/racks/{rack['id']}?expand=room").data
+    unit_check = auth_client.get(f"/api/v1/units/{unit['id']}?expand=rack").data
 
     assert str(phase_check["fab"]["id"]) == str(fab["id"])
     assert str(dc_check["phase"]["id"]) == str(phase["id"])
@@ -689,7 +689,7 @@ def test_unit_create(auth_client):
     assert "id" in r.data
 
     # Test retrieve to verify nested data
-    unit_detail = auth_client.get(f"/api/v1/units/{r.data['id']}").data
+    unit_detail = auth_client.get(f"/api/v1/units/{r.data['id']}?expand=rack").data
     assert unit_detail["name"] == "U1"
     assert unit_detail["unit_number"] == 1
     assert str(unit_detail["rack"]["id"]) == str(rack_id)  # Retrieve returns full object
@@ -736,7 +736,7 @@ def test_unit_retrieve(auth_client):
     unit_id = create_r.data["id"]
 
     # Retrieve the unit
-    r = auth_client.get(f"/api/v1/units/{unit_id}")
+    r = auth_client.get(f"/api/v1/units/{unit_id}?expand=rack")
     assert r.status_code == 200
     assert r.data["name"] == "U2"
     assert r.data["unit_number"] == 2
@@ -783,7 +783,7 @@ def test_unit_update_put(auth_client):
     assert str(r.data["rack"]) == str(rack2_id)  # PUT returns UUID
 
     # Verify in database
-    r = auth_client.get(f"/api/v1/units/{unit_id}")
+    r = auth_client.get(f"/api/v1/units/{unit_id}?expand=rack")
     assert r.status_code == 200
     assert r.data["name"] == "U3-updated"
     assert str(r.data["rack"]["id"]) == str(rack2_id)  # GET returns nested object
@@ -816,7 +816,7 @@ def test_unit_update_patch(auth_client):
     assert str(r.data["rack"]) == str(rack_id)  # PATCH returns UUID
 
     # Verify in database
-    r = auth_client.get(f"/api/v1/units/{unit_id}")
+    r = auth_client.get(f"/api/v1/units/{unit_id}?expand=rack")
     assert r.status_code == 200
     assert r.data["name"] == "U4-patched"
     assert str(r.data["rack"]["id"]) == str(rack_id)  # GET returns nested object
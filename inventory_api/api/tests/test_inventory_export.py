@@ -0,0 +1,350 @@
+import configparser
+import uuid
+
+import pytest
+import yaml
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..inventory_export import CompiledInventory
+from ..models import (
+    AnsibleGroup,
+    AnsibleGroupVariable,
+    AnsibleHost,
+    AnsibleHostVariable,
+    AnsibleInventory,
+    AnsibleInventoryVariable,
+    AnsibleVariableSet,
+    Tenant,
+)
+from .base import auth_client, create_baremetals, create_export_inventory
+
+# ============================================================================
+# INVENTORY EXPORT TESTS
+# ============================================================================
+
+
+@pytest.mark.django_db
+def test_export_json(auth_client):
+    inventory = create_export_inventory(2)
+    r = auth_client.get(f"/api/v1/ansible-inventories/{inventory.id}/export")
+    assert r.status_code == 200
+    root = r.json()["all"]
+    assert root["vars"] == {"env": "prod", "ntp": "pool.ntp.org"}
+    assert root["children"]["web"] == {"vars": {"http_port": 8080}, "children": {"nginx": {}}}
+    assert root["children"]["nginx"]["hosts"] == {"export-2-host-0": {}, "export-2-host-1": {}}
+    assert root["hosts"]["export-2-host-1"] == {
+        "ansible_host": "10.0.0.2",
+        "ansible_port": 22,
+        "ansible_user": "root",
+        "rack": "r1",
+    }
+
+
+@pytest.mark.django_db
+def test_export_yaml(auth_client):
+    inventory = create_export_inventory(1)
+    r = auth_client.get(f"/api/v1/ansible-inventories/{inventory.id}/export?format=yaml")
+    assert r.status_code == 200
+    assert r["Content-Type"].startswith("application/yaml")
+    data = yaml.safe_load(r.content)
+    assert data["all"]["children"]["nginx"]["hosts"] == {"export-1-host-0": {}}
+
+
+@pytest.mark.django_db
+def test_export_ini(auth_client):
+    inventory = create_export_inventory(1)
+    r = auth_client.get(f"/api/v1/ansible-inventories/{inventory.id}/export?format=ini")
+    assert r.status_code == 200
+    parser = configparser.ConfigParser(allow_no_value=True, delimiters=("=",))
+    parser.read_string(r.content.decode())
+    assert parser["all:vars"]["env"] == "prod"
+    assert parser["web:vars"]["http_port"] == "8080"
+    assert "nginx" in parser["web:children"]
+    assert "export-1-host-0" in parser["nginx"]
+    assert (
+        "export-1-host-0 ansible_host=10.0.0.1 ansible_port=22 ansible_user=root rack=r0"
+        in r.content.decode().splitlines()
+    )
+
+
+@pytest.mark.django_db
+def test_export_query_count_is_independent_of_size(auth_client):
+    small = create_export_inventory(1)
+    large = create_export_inventory(15)
+
+    with CaptureQueriesContext(connection) as small_ctx:
+        auth_client.get(f"/api/v1/ansible-inventories/{small.id}/export")
+    with CaptureQueriesContext(connection) as large_ctx:
+        r = auth_client.get(f"/api/v1/ansible-inventories/{large.id}/export")
+    assert len(r.json()["all"]["hosts"]) == 15
+    assert len(large_ctx.captured_queries) == len(small_ctx.captured_queries)
+
+
+# ============================================================================
+# DYNAMIC INVENTORY TESTS
+# ============================================================================
+
+
+@pytest.mark.django_db
+def test_dynamic_inventory_list(auth_client):
+    inventory = create_export_inventory(2)
+    tenant = Tenant.objects.create(name="export-ungrouped", status="active")
+    AnsibleHost.objects.create(
+        inventory=inventory,
+        content_type=ContentType.objects.get_for_model(Tenant),
+        object_id=tenant.id,
+    )
+
+    r = auth_client.get(f"/api/v1/ansible-inventories/{inventory.id}/dynamic_inventory")
+    assert r.status_code == 200
+    data = r.json()
+    assert data["all"]["children"] == ["ungrouped", "web"]
+    assert data["ungrouped"] == {"hosts": ["export-ungrouped"]}
+    assert data["web"] == {"hosts": [], "vars": {"http_port": 8080}, "children": ["nginx"]}
+    assert data["nginx"]["hosts"] == ["export-2-host-0", "export-2-host-1"]
+    assert data["_meta"]["hostvars"]["export-2-host-0"]["rack"] == "r0"
+    assert data["_meta"]["hostvars"]["export-ungrouped"]["ansible_user"] == "root"
+
+
+@pytest.mark.django_db
+def test_dynamic_inventory_host(auth_client):
+    inventory = create_export_inventory(1)
+    url = f"/api/v1/ansible-inventories/{inventory.id}/dynamic_inventory"
+    r = auth_client.get(f"{url}?host=export-1-host-0")
+    assert r.status_code == 200
+    assert r.json()["ansible_host"] == "10.0.0.1"
+    assert auth_client.get(f"{url}?host=missing").json() == {}
+
+
+# ============================================================================
+# COMPILED INVENTORY CACHE TESTS
+# ============================================================================
+
+
+@pytest.mark.django_db
+def test_export_etag_not_modified(auth_client):
+    inventory = create_export_inventory(1)
+    url = f"/api/v1/ansible-inventories/{inventory.id}/export"
+    first = auth_client.get(url)
+    assert first.status_code == 200
+    etag = first["ETag"]
+
+    r = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r["ETag"] == etag
+
+    # Each representation has its own tag
+    assert auth_client.get(f"{url}?format=yaml")["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_export_served_from_cache(auth_client):
+    inventory = create_export_inventory(3)
+    url = f"/api/v1/ansible-inventories/{inventory.id}/dynamic_inventory"
+    with CaptureQueriesContext(connection) as cold:
+        first = auth_client.get(url)
+    with CaptureQueriesContext(connection) as warm:
+        second = auth_client.get(url)
+    assert second.json() == first.json()
+    assert len(warm.captured_queries) < len(cold.captured_queries)
+
+
+@pytest.mark.django_db
+def test_changes_invalidate_compiled_inventory(auth_client):
+    inventory = create_export_inventory(1)
+    url = f"/api/v1/ansible-inventories/{inventory.id}/export"
+    etag = auth_client.get(url)["ETag"]
+
+    variable = AnsibleGroupVariable.objects.get(group__inventory=inventory, key="http_port")
+    variable.value = "9090"
+    variable.save()
+    r = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert r.status_code == 200
+    assert r.json()["all"]["children"]["web"]["vars"]["http_port"] == 9090
+
+    etag = r["ETag"]
+    host = AnsibleHost.objects.get(inventory=inventory, status="active")
+    host.groups.add(AnsibleGroup.objects.get(inventory=inventory, name="web"))
+    r = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert r.status_code == 200
+    assert r.json()["all"]["children"]["web"]["hosts"] == {"export-1-host-0": {}}
+
+    etag = r["ETag"]
+    AnsibleVariableSet.objects.filter(name="export-set-1").get().delete()
+    r = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert r.status_code == 200
+    assert "ntp" not in r.json()["all"]["vars"]
+
+
+@pytest.mark.django_db
+def test_stale_inventory_instance_keeps_content_version(auth_client):
+    inventory = create_export_inventory(1)
+    version = AnsibleInventory.objects.get(pk=inventory.pk).content_version
+    AnsibleInventoryVariable.objects.create(inventory=inventory, key="extra", value="1")
+    inventory.description = "changed"
+    inventory.save()
+    assert AnsibleInventory.objects.get(pk=inventory.pk).content_version > version + 1
+
+
+@pytest.mark.django_db
+def test_force_insert_recreates_deleted_inventory():
+    inventory = create_export_inventory(1)
+    AnsibleInventory.objects.filter(pk=inventory.pk).delete()
+    inventory.save(force_insert=True)
+    assert AnsibleInventory.objects.filter(pk=inventory.pk).exists()
+
+
+@pytest.mark.django_db
+def test_cached_state_of_another_format_is_ignored(auth_client):
+    inventory = create_export_inventory(1)
+    inventory.refresh_from_db()
+    # Layout written before host_ids was cached
+    cache.set(f"ansible-inventory:{inventory.pk}:{inventory.content_version}", {"hostvars": {}})
+    compiled = CompiledInventory.get(inventory)
+    assert list(compiled.host_ids.values()) == ["export-1-host-0"]
+
+
+@pytest.mark.django_db
+def test_renaming_host_object_invalidates_compiled_inventory(auth_client):
+    inventory = AnsibleInventory.objects.create(name="export-rename")
+    baremetal = create_baremetals(1)[0]
+    AnsibleHost.objects.create(
+        inventory=inventory,
+        content_type=ContentType.objects.get_for_model(baremetal),
+        object_id=baremetal.id,
+    )
+    url = f"/api/v1/ansible-inventories/{inventory.id}/export"
+    etag = auth_client.get(url)["ETag"]
+
+    baremetal.name = "renamed-baremetal"
+    baremetal.save()
+    r = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert r.status_code == 200
+    assert list(r.json()["all"]["hosts"]) == ["renamed-baremetal"]
+
+
+# ============================================================================
+# BATCH MERGED VARIABLES TESTS
+# ============================================================================
+
+
+@pytest.mark.django_db
+def test_merged_host_variables_all_hosts(auth_client):
+    inventory = create_export_inventory(2)
+    nginx = AnsibleGroup.objects.get(inventory=inventory, name="nginx")
+    AnsibleGroupVariable.objects.create(
+        group=nginx, key="http_port", value="80", value_type="integer"
+    )
+    canary = Tenant.objects.get(name="export-2-host-0")
+    AnsibleHostVariable.objects.create(
+        host=AnsibleHost.objects.get(object_id=canary.id), key="env", value="canary"
+    )
+
+    r = auth_client.post(
+        f"/api/v1/ansible-inventories/{inventory.id}/merged_host_variables",
+        {"all_hosts": True},
+        format="json",
+    )
+    assert r.status_code == 200
+    assert r.data["count"] == 2
+    hosts = {host["name"]: host["variables"] for host in r.data["hosts"].values()}
+    # The child group's value wins over its parent's; host vars win over everything
+    assert hosts["export-2-host-1"] == {
+        "env": "prod",
+        "ntp": "pool.ntp.org",
+        "http_port": 80,
+        "ansible_host": "10.0.0.2",
+        "ansible_port": 22,
+        "ansible_user": "root",
+        "rack": "r1",
+    }
+    assert hosts["export-2-host-0"]["env"] == "canary"
+
+
+@pytest.mark.django_db
+def test_merged_host_variables_by_id(auth_client):
+    inventory = create_export_inventory(3)
+    host = AnsibleHost.objects.filter(inventory=inventory, status="active").first()
+    unknown = str(uuid.uuid4())
+
+    r = auth_client.post(
+        f"/api/v1/ansible-inventories/{inventory.id}/merged_host_variables",
+        {"host_ids": [str(host.id), unknown]},
+        format="json",
+    )
+    assert r.status_code == 200
+    assert list(r.data["hosts"]) == [str(host.id)]
+    assert r.data["hosts"][str(host.id)]["variables"]["http_port"] == 8080
+    assert r.data["missing"] == [unknown]
+
+
+@pytest.mark.django_db
+def test_merged_host_variables_requires_hosts(auth_client):
+    inventory = create_export_inventory(1)
+    url = f"/api/v1/ansible-inventories/{inventory.id}/merged_host_variables"
+    assert auth_client.post(url, {}, format="json").status_code == 400
+    payload = {"host_ids": [], "all_hosts": True}
+    assert auth_client.post(url, payload, format="json").status_code == 400
+
+
+@pytest.mark.django_db
+def test_merged_host_variables_query_count_is_independent_of_size(auth_client):
+    small = create_export_inventory(1)
+    large = create_export_inventory(15)
+
+    counts = []
+    for inventory in (small, large):
+        with CaptureQueriesContext(connection) as ctx:
+            r = auth_client.post(
+                f"/api/v1/ansible-inventories/{inventory.id}/merged_host_variables",
+                {"all_hosts": True},
+                format="json",
+            )
+        counts.append(len(ctx.captured_queries))
+    assert r.data["count"] == 15
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.django_db
+def test_export_keeps_hosts_with_the_same_name(auth_client):
+    inventory = create_export_inventory(1)
+    nginx = AnsibleGroup.objects.get(inventory=inventory, name="nginx")
+    tenant_type = ContentType.objects.get_for_model(Tenant)
+    twin = Tenant.objects.create(name="export-1-host-0", status="active")
+    host = AnsibleHost.objects.create(
+        inventory=inventory, content_type=tenant_type, object_id=twin.id
+    )
+    host.groups.add(nginx)
+
+    r = auth_client.get(f"/api/v1/ansible-inventories/{inventory.id}/export")
+    assert r.status_code == 200
+    root = r.json()["all"]
+    assert len(root["hosts"]) == 2
+    assert f"export-1-host-0-{host.id}" in root["children"]["nginx"]["hosts"]
+    assert root["hosts"][f"export-1-host-0-{host.id}"]["ansible_host"] == "export-1-host-0"
+    assert {hostvars["ansible_host"] for hostvars in root["hosts"].values()} == {
+        "10.0.0.1",
+        "export-1-host-0",
+    }
+
+
+@pytest.mark.django_db
+def test_export_renders_ungrouped_hosts(auth_client):
+    inventory = create_export_inventory(1)
+    tenant = Tenant.objects.create(name="export-ungrouped", status="active")
+    AnsibleHost.objects.create(
+        inventory=inventory,
+        content_type=ContentType.objects.get_for_model(Tenant),
+        object_id=tenant.id,
+    )
+    url = f"/api/v1/ansible-inventories/{inventory.id}/export"
+    root = auth_client.get(url).json()["all"]
+    assert root["children"]["ungrouped"] == {"hosts": {"export-ungrouped": {}}}
+
+    parser = configparser.ConfigParser(allow_no_value=True, delimiters=("=",))
+    parser.read_string(auth_client.get(f"{url}?format=ini").content.decode())
+    assert "export-ungrouped" in parser["ungrouped"]
@@ -0,0 +1,90 @@
+from base64 import b64encode
+from urllib import parse
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Tenant
+from .base import auth_client
+
+# ============================================================================
+# KEYSET PAGINATION TESTS
+# ============================================================================
+
+
+@pytest.fixture
+def tenants(db):
+    return [Tenant.objects.create(name=f"page-tenant-{i}", status="active") for i in range(7)]
+
+
+def _collect(client, url: str) -> list:
+    names = []
+    while url:
+        r = client.get(url)
+        assert r.status_code == 200
+        assert "count" not in r.data
+        names.extend(item["name"] for item in r.data["results"])
+        url = r.data["next"]
+    return names
+
+
+@pytest.mark.django_db
+def test_page_number_pagination_is_default(auth_client, tenants):
+    r = auth_client.get("/api/v1/tenants")
+    assert r.status_code == 200
+    assert r.data["count"] == 7
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_walks_all_rows_in_created_order(auth_client, tenants):
+    names = _collect(auth_client, "/api/v1/tenants?pagination=cursor&page_size=3")
+    assert names == [t.name for t in tenants]
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_breaks_created_at_ties_on_id(auth_client, tenants):
+    Tenant.objects.update(created_at=tenants[0].created_at)
+    names = _collect(auth_client, "/api/v1/tenants?pagination=cursor&page_size=2")
+    expected = [t.name for t in sorted(tenants, key=lambda t: str(t.id))]
+    assert names == expected
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_previous_link(auth_client, tenants):
+    first = auth_client.get("/api/v1/tenants?pagination=cursor&page_size=3")
+    assert first.data["previous"] is None
+    second = auth_client.get(first.data["next"])
+    back = auth_client.get(second.data["previous"])
+    assert [t["name"] for t in back.data["results"]] == [t["name"] for t in first.data["results"]]
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_skips_count_query(auth_client, tenants):
+    with CaptureQueriesContext(connection) as ctx:
+        r = auth_client.get("/api/v1/tenants?pagination=cursor")
+    assert r.status_code == 200
+    assert not any("COUNT(" in q["sql"] for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_with_sparse_fields(auth_client, tenants):
+    r = auth_client.get("/api/v1/tenants?pagination=cursor&page_size=3&fields=id")
+    assert r.status_code == 200
+    r = auth_client.get(r.data["next"])
+    assert r.status_code == 200
+    assert len(r.data["results"]) == 3
+
+
+@pytest.mark.django_db
+def test_invalid_cursor(auth_client, tenants):
+    r = auth_client.get("/api/v1/tenants?cursor=not-a-cursor")
+    assert r.status_code == 404
+
+
+@pytest.mark.django_db
+def test_cursor_with_invalid_id(auth_client, tenants):
+    tokens = {"r": "0", "t": tenants[0].created_at.isoformat(), "i": "not-a-uuid"}
+    cursor = b64encode(parse.urlencode(tokens).encode("ascii")).decode("ascii")
+    r = auth_client.get("/api/v1/tenants", {"cursor": cursor})
+    assert r.status_code == 404
@@ -0,0 +1,236 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import (
+    Baremetal,
+    BaremetalGroup,
+    BaremetalGroupTenantQuota,
+    K8sCluster,
+    Tenant,
+    VirtualMachine,
+    VirtualMachineSpecification,
+)
+from .base import auth_client, create_baremetals
+
+# ============================================================================
+# VM PLACEMENT TESTS
+# ============================================================================
+
+
+@pytest.fixture
+def fleet():
+    """Two racks of two baremetals each, a tenant and a small VM specification"""
+    baremetals = create_baremetals(2, offset=0) + create_baremetals(2, offset=1)
+    tenant = Tenant.objects.create(name="placement-tenant", status="active")
+    spec = VirtualMachineSpecification.objects.create(
+        name="placement-spec",
+        generation="v1",
+        required_cpu=4,
+        required_memory=16,
+        required_storage=100,
+    )
+    return baremetals, tenant, spec
+
+
+def _cluster(tenant: Tenant, mode: str) -> K8sCluster:
+    return K8sCluster.objects.create(
+        name=f"cluster-{mode}", version="1.30", tenant=tenant, scheduling_mode=mode, status="up"
+    )
+
+
+def _place(client, cluster: K8sCluster, spec: VirtualMachineSpecification, **extra) -> dict:
+    r = client.post(
+        f"/api/v1/k8s-clusters/{cluster.id}/placement",
+        {"specification": str(spec.id), **extra},
+        format="json",
+    )
+    assert r.status_code == 200
+    return r.data
+
+
+@pytest.mark.django_db
+def test_spread_rack_prefers_racks_without_cluster_vms(auth_client, fleet):
+    baremetals, tenant, spec = fleet
+    cluster = _cluster(tenant, "spread_rack")
+    VirtualMachine.objects.create(
+        name="cp-0",
+        tenant=tenant,
+        baremetal=baremetals[0],
+        specification=spec,
+        k8s_cluster=cluster,
+        status="running",
+    )
+    data = _place(auth_client, cluster, spec, limit=4)
+    assert data["scheduling_mode"] == "spread_rack"
+    assert data["candidates"] == 4
+    ranked = [placement["baremetal"] for placement in data["placements"]]
+    assert {ranked[0], ranked[1]} == {baremetals[2].id, baremetals[3].id}
+    assert ranked[-1] == baremetals[0].id
+
+
+@pytest.mark.django_db
+def test_default_packs_and_spread_resource_spreads(auth_client, fleet):
+    baremetals, tenant, spec = fleet
+    Baremetal.objects.filter(pk=baremetals[1].pk).update(available_cpu=8)
+
+    packed = _place(auth_client, _cluster(tenant, "default"), spec)
+    assert packed["placements"][0]["baremetal"] == baremetals[1].id
+
+    spread = _place(auth_client, _cluster(tenant, "spread_resource"), spec)
+    assert spread["placements"][-1]["baremetal"] == baremetals[1].id
+
+
+@pytest.mark.django_db
+def test_placement_filters_infeasible_hosts_and_fits_gpus(auth_client, fleet):
+    baremetals, tenant, spec = fleet
+    cluster = _cluster(tenant, "balanced")
+    Baremetal.objects.filter(pk=baremetals[0].pk).update(available_gpu=2)
+    Baremetal.objects.filter(pk=baremetals[3].pk).update(status="retired")
+
+    data = _place(auth_client, cluster, spec, limit=10)
+    assert data["candidates"] == 3
+    assert data["placements"][-1]["baremetal"] == baremetals[0].id
+
+    data = _place(auth_client, cluster, spec, gpu=1)
+    assert [placement["baremetal"] for placement in data["placements"]] == [baremetals[0].id]
+
+    spec.required_cpu = 64
+    spec.save()
+    assert _place(auth_client, cluster, spec)["placements"] == []
+
+
+@pytest.mark.django_db
+def test_placement_query_count_is_independent_of_fleet_size(auth_client, fleet):
+    baremetals, tenant, spec = fleet
+    cluster = _cluster(tenant, "spread_rack")
+    counts = []
+    for offset in (2, 3):
+        create_baremetals(4, offset=offset)
+        with CaptureQueriesContext(connection) as ctx:
+            _place(auth_client, cluster, spec)
+        counts.append(len(ctx.captured_queries))
+    assert counts[0] == counts[1]
+
+
+def _place_batch(client, cluster: K8sCluster, vms: list, **extra):
+    return client.post(
+        f"/api/v1/k8s-clusters/{cluster.id}/place_batch", {"vms": vms, **extra}, format="json"
+    )
+
+
+@pytest.mark.django_db
+def test_place_batch_spreads_and_reserves_capacity(auth_client, fleet):
+    baremetals, tenant, spec = fleet
+    cluster = _cluster(tenant, "spread_rack")
+    group_cpu = BaremetalGroup.objects.get(pk=baremetals[0].group_id).available_cpu
+    vms = [
+        {"name": f"cp-{i}", "specification": str(spec.id), "type": "control-plane"}
+        for i in range(4)
+    ]
+    r = _place_batch(auth_client, cluster, vms)
+    assert r.status_code == 201
+    assert r.data["scheduling_mode"] == "spread_rack"
+    hosts = [placement["baremetal"] for placement in r.data["placements"]]
+    assert sorted(hosts, key=str) == sorted((bm.id for bm in baremetals), key=str)
+    assert {placement["rack"] for placement in r.data["placements"][:2]} == {
+        baremetals[0].rack_id,
+        baremetals[2].rack_id,
+    }
+
+    created = VirtualMachine.objects.filter(k8s_cluster=cluster)
+    assert created.count() == 4
+    assert set(created.values_list("status", "type")) == {("provisioning", "control-plane")}
+    for baremetal in Baremetal.objects.filter(pk__in=hosts):
+        assert (baremetal.available_cpu, baremetal.available_memory) == (28, 240)
+    # Each rack's group lost the two VMs placed on its hosts
+    assert BaremetalGroup.objects.get(pk=baremetals[0].group_id).available_cpu == group_cpu - 8
+
+
+@pytest.mark.django_db
+def test_place_batch_is_all_or_nothing(auth_client, fleet):
+    baremetals, tenant, spec = fleet
+    cluster = _cluster(tenant, "default")
+    spec.required_cpu = 20
+    spec.save()
+    vms = [{"name": f"worker-{i}", "specification": str(spec.id)} for i in range(5)]
+
+    r = _place_batch(auth_client, cluster, vms)
+    assert r.status_code == 400
+    assert len(r.data["vms"]) == 1
+    assert not VirtualMachine.objects.filter(k8s_cluster=cluster).exists()
+    assert set(Baremetal.objects.values_list("available_cpu", flat=True)) == {32}
+
+    r = _place_batch(auth_client, cluster, vms[:4])
+    assert r.status_code == 201
+    assert set(Baremetal.objects.values_list("available_cpu", flat=True)) == {12}
+
+
+@pytest.mark.django_db
+def test_place_batch_rejects_unknown_specifications(auth_client, fleet):
+    baremetals, tenant, spec = fleet
+    cluster = _cluster(tenant, "balanced")
+    vms = [
+        {"name": "worker-0", "specification": str(spec.id)},
+        {"name": "worker-1", "specification": str(tenant.id)},
+    ]
+    r = _place_batch(auth_client, cluster, vms)
+    assert r.status_code == 400
+    assert list(r.data["vms"]) == [1]
+
+
+@pytest.mark.django_db
+def test_place_batch_query_count_is_independent_of_batch_size(auth_client, fleet):
+    baremetals, tenant, spec = fleet
+    cluster = _cluster(tenant, "spread_rack")
+    counts = []
+    for size in (4, 8):
+        vms = [{"name": f"worker-{size}-{i}", "specification": str(spec.id)} for i in range(size)]
+        with CaptureQueriesContext(connection) as ctx:
+            assert _place_batch(auth_client, cluster, vms).status_code == 201
+        counts.append(len(ctx.captured_queries))
+    assert counts[0] == counts[1]
+
+
+@pytest.mark.django_db
+def test_sequential_gpu_batches_do_not_overcommit_the_gpu_host(auth_client, fleet):
+    baremetals, tenant, spec = fleet
+    cluster = _cluster(tenant, "default")
+    Baremetal.objects.filter(pk=baremetals[0].pk).update(available_gpu=2)
+    vms = [{"name": f"gpu-{i}", "specification": str(spec.id), "gpu": 1} for i in range(3)]
+
+    r = _place_batch(auth_client, cluster, vms[:2])
+    assert r.status_code == 201
+    assert {placement["baremetal"] for placement in r.data["placements"]} == {baremetals[0].id}
+    assert list(VirtualMachine.objects.values_list("gpu", flat=True)) == [1, 1]
+    assert Baremetal.objects.get(pk=baremetals[0].pk).available_gpu == 0
+
+    r = _place_batch(auth_client, cluster, vms[2:])
+    assert r.status_code == 400
+    assert VirtualMachine.objects.filter(k8s_cluster=cluster).count() == 2
+
+    VirtualMachine.objects.get(name="gpu-0").delete()
+    assert Baremetal.objects.get(pk=baremetals[0].pk).available_gpu == 1
+    r = _place_batch(auth_client, cluster, vms[2:])
+    assert r.status_code == 201
+    assert Baremetal.objects.get(pk=baremetals[0].pk).available_gpu == 0
+
+
+@pytest.mark.django_db
+def test_place_batch_counts_gpus_against_the_quota(auth_client, fleet):
+    baremetals, tenant, spec = fleet
+    cluster = _cluster(tenant, "default")
+    Baremetal.objects.filter(pk=baremetals[0].pk).update(available_gpu=8)
+    quota = BaremetalGroupTenantQuota.objects.create(
+        group_id=baremetals[0].group_id, tenant=tenant, gpu_quota=3
+    )
+    vms = [{"name": f"gpu-{i}", "specification": str(spec.id), "gpu": 2} for i in range(2)]
+
+    assert _place_batch(auth_client, cluster, vms[:1]).status_code == 201
+    quota.refresh_from_db()
+    assert quota.used_gpu == 2
+
+    r = _place_batch(auth_client, cluster, vms[1:])
+    assert r.status_code == 400
+    assert "gpu quota" in str(r.data["quota"])
+    assert Baremetal.objects.get(pk=baremetals[0].pk).available_gpu == 6
@@ -219,7 +219,7 @@ def test_purchase_order_retrieve(auth_client):
     create_r = auth_client.post("/api/v1/purchase-orders", payload, format="json")
     po_id = create_r.data["id"]
 
-    r = auth_client.get(f"/api/v1/purchase-orders/{po_id}")
+    r = auth_client.get(f"/api/v1/purchase-orders/{po_id}?expand=purchase_requisition,supplier")
     assert r.status_code == 200
     assert r.data["po_number"] == "PO-RETRIEVE-001"
     assert r.data["purchase_requisition"]["id"] == pr["id"]  # GET returns nested object
@@ -0,0 +1,139 @@
+import importlib
+import io
+
+import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..hierarchy_import import HierarchyImporter, iter_ndjson_rows
+from ..models import Rack, Unit, reconcile_rack_occupancy
+from .base import auth_client, baremetal_payload, create_baremetals, ndjson
+
+# ============================================================================
+# RACK OCCUPANCY COUNTER TESTS
+# ============================================================================
+
+
+def _counters(rack: Rack) -> tuple:
+    rack.refresh_from_db()
+    return rack.used_units, rack.available_units
+
+
+@pytest.mark.django_db
+def test_counters_follow_single_writes():
+    baremetals = create_baremetals(3)
+    rack = baremetals[0].rack
+    assert _counters(rack) == (3, 39)
+
+    baremetals[0].unit = None
+    baremetals[0].save()
+    assert _counters(rack) == (2, 40)
+
+    other = Rack.objects.create(name="other-rack", bgp_number="BGP-O", as_number=65001)
+    baremetals[1].rack = other
+    baremetals[1].unit = Unit.objects.create(name="U1", unit_number=1, rack=other)
+    baremetals[1].save()
+    assert _counters(rack) == (1, 41)
+    assert _counters(other) == (1, 41)
+
+    baremetals[2].save(update_fields=["name"])
+    baremetals[2].delete()
+    assert _counters(rack) == (0, 42)
+
+    baremetals[1].unit.delete()
+    assert _counters(other) == (0, 42)
+
+
+@pytest.mark.django_db
+def test_counters_follow_bulk_writes(auth_client):
+    template = create_baremetals(1)[0]
+    rack = template.rack
+    units = [Unit.objects.create(name=f"U{i}", unit_number=i, rack=rack) for i in range(2, 5)]
+    payload = baremetal_payload(template, 3)
+    for item, unit in zip(payload, units):
+        item["unit"] = str(unit.id)
+    r = auth_client.post("/api/v1/baremetals/bulk", payload, format="json")
+    assert r.status_code == 201
+    assert _counters(rack) == (4, 38)
+
+    r = auth_client.patch(
+        "/api/v1/baremetals/bulk",
+        [{"id": item["id"], "unit": None} for item in r.data[:2]],
+        format="json",
+    )
+    assert r.status_code == 200
+    assert _counters(rack) == (2, 40)
+
+    r = auth_client.delete("/api/v1/baremetals/bulk", [str(template.id)], format="json")
+    assert r.status_code == 200
+    assert _counters(rack) == (1, 41)
+
+
+@pytest.mark.django_db
+def test_reconcile_fixes_drift_in_one_query():
+    baremetals = create_baremetals(2)
+    rack = baremetals[0].rack
+    empty = Rack.objects.create(name="empty-rack", bgp_number="BGP-X", as_number=65002)
+    Rack.objects.filter(pk=rack.pk).update(used_units=7, available_units=1)
+    Rack.objects.filter(pk=empty.pk).update(used_units=1)
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert reconcile_rack_occupancy() == 2
+    assert len(ctx.captured_queries) == 1
+    assert _counters(rack) == (2, 40)
+    assert _counters(empty) == (0, 42)
+
+    out = io.StringIO()
+    call_command("reconcile_rack_occupancy", stdout=out)
+    assert "0 racks" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_stale_rack_instance_keeps_counters():
+    rack = Rack.objects.create(name="stale-rack", bgp_number="BGP-S", as_number=65003)
+    baremetals = create_baremetals(1)
+    baremetals[0].rack = rack
+    baremetals[0].unit = Unit.objects.create(name="U1", unit_number=1, rack=rack)
+    baremetals[0].save()
+
+    rack.status = "maintenance"
+    rack.save()
+    assert _counters(rack) == (1, 41)
+
+    rack.height_units = 48
+    rack.save()
+    assert (rack.used_units, rack.available_units) == (1, 47)
+    assert _counters(rack) == (1, 47)
+
+
+@pytest.mark.django_db
+def test_counters_are_read_only_through_the_api(auth_client):
+    rack = create_baremetals(2)[0].rack
+    payload = {"used_units": 0, "available_units": 42, "height_units": 44}
+    r = auth_client.patch(f"/api/v1/racks/{rack.id}", payload, format="json")
+    assert r.status_code == 200
+    assert _counters(rack) == (2, 42)
+
+
+@pytest.mark.django_db
+def test_import_resize_keeps_counters():
+    rack = create_baremetals(2)[0].rack
+    Rack.objects.filter(pk=rack.pk).update(external_system_id="K-resize")
+    rows = [
+        {"external_system_id": "K-resize", "height_units": 40, "used_units": 0},
+    ]
+    HierarchyImporter(row_type="rack").run(iter_ndjson_rows(io.StringIO(ndjson(rows))))
+    assert _counters(rack) == (2, 38)
+
+
+@pytest.mark.django_db
+def test_data_migration_counts_existing_racks():
+    migration = importlib.import_module(
+        "inventory_api.api.migrations.0010_rack_occupancy_backfill"
+    )
+    rack = create_baremetals(3)[0].rack
+    Rack.objects.filter(pk=rack.pk).update(used_units=0, available_units=42)
+    migration.count_rack_occupancy(apps, None)
+    assert _counters(rack) == (3, 39)
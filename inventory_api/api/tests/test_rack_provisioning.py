@@ -0,0 +1,73 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Rack, Room, Unit
+from .base import auth_client, create_baremetals
+
+# ============================================================================
+# RACK PROVISIONING TESTS
+# ============================================================================
+
+
+@pytest.mark.django_db
+def test_provision_creates_missing_units_and_counters(auth_client):
+    baremetals = create_baremetals(3)
+    rack = baremetals[0].rack
+    rack.height_units = 10
+    rack.save()
+
+    r = auth_client.post(f"/api/v1/racks/{rack.id}/provision")
+    assert r.status_code == 200
+    assert r.data["units_created"] == 7
+    assert (r.data["rack"]["used_units"], r.data["rack"]["available_units"]) == (3, 7)
+    assert list(
+        Unit.objects.filter(rack=rack).order_by("unit_number").values_list("name", flat=True)
+    ) == [f"U{i}" for i in range(1, 11)]
+
+    r = auth_client.post(f"/api/v1/racks/{rack.id}/provision")
+    assert r.data["units_created"] == 0
+    assert Unit.objects.filter(rack=rack).count() == 10
+
+
+@pytest.mark.django_db
+def test_bulk_rack_import_provisions_units(auth_client):
+    room = Room.objects.create(name="hall-1")
+    payload = [
+        {
+            "name": f"hall-rack-{i}",
+            "room": str(room.id),
+            "bgp_number": f"BGP-H{i}",
+            "as_number": 65000 + i,
+            "height_units": 42 + i,
+        }
+        for i in range(3)
+    ]
+    r = auth_client.post("/api/v1/racks", payload, format="json")
+    assert r.status_code == 201
+    assert [rack["available_units"] for rack in r.data] == [42, 43, 44]
+    assert Unit.objects.filter(rack__room=room).count() == 42 + 43 + 44
+
+
+@pytest.mark.django_db
+def test_bulk_rack_import_query_count_is_independent_of_size(auth_client):
+    room = Room.objects.create(name="hall-2")
+    counts = []
+    for prefix, count in (("a", 2), ("b", 20)):
+        payload = [
+            {
+                "name": f"{prefix}-rack-{i}",
+                "room": str(room.id),
+                "bgp_number": f"BGP-{prefix}{i}",
+                "as_number": 65000,
+                # Small racks keep SQLite from splitting the unit insert into batches
+                "height_units": 4,
+            }
+            for i in range(count)
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            r = auth_client.post("/api/v1/racks/bulk", payload, format="json")
+        assert r.status_code == 201
+        counts.append(len(ctx.captured_queries))
+    assert counts[0] == counts[1]
+    assert Rack.objects.get(name="b-rack-19").units.count() == 4
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Baremetal
+from .base import auth_client, create_baremetals, create_export_inventory
+
+# ============================================================================
+# STREAMING EXPORT TESTS
+# ============================================================================
+
+
+def _body(response) -> str:
+    assert response.streaming
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_export_streams_json_array(auth_client):
+    create_baremetals(3)
+    r = auth_client.get("/api/v1/baremetals/export?expand=rack")
+    assert r.status_code == 200
+    assert r["Content-Type"] == "application/json"
+    rows = json.loads(_body(r))
+    listed = auth_client.get("/api/v1/baremetals?page_size=10&expand=rack").data["results"]
+    assert [row["id"] for row in rows] == [str(row["id"]) for row in listed]
+    assert rows[0]["rack"]["name"] == listed[0]["rack"]["name"]
+
+
+@pytest.mark.django_db
+def test_export_streams_ndjson_with_sparse_fields(auth_client):
+    baremetals = create_baremetals(2)
+    r = auth_client.get("/api/v1/baremetals/export?format=ndjson&fields=id,name")
+    assert r.status_code == 200
+    assert r["Content-Type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in _body(r).splitlines()]
+    assert rows == [
+        {"id": str(b.id), "name": b.name} for b in sorted(baremetals, key=lambda b: str(b.id))
+    ]
+
+
+@pytest.mark.django_db
+def test_export_empty_collection(auth_client):
+    r = auth_client.get("/api/v1/network-interfaces/export")
+    assert r.status_code == 200
+    assert _body(r) == "[]"
+
+
+@pytest.mark.django_db
+def test_export_query_count_is_independent_of_size(auth_client):
+    create_baremetals(1)
+    with CaptureQueriesContext(connection) as small:
+        _body(auth_client.get("/api/v1/baremetals/export"))
+    create_baremetals(20, offset=1)
+    with CaptureQueriesContext(connection) as large:
+        rows = json.loads(_body(auth_client.get("/api/v1/baremetals/export")))
+    assert len(rows) == Baremetal.objects.count() == 21
+    assert len(large.captured_queries) == len(small.captured_queries)
+
+
+@pytest.mark.django_db
+def test_virtual_machine_export(auth_client):
+    r = auth_client.get("/api/v1/virtual-machines/export?format=ndjson")
+    assert r.status_code == 200
+    assert _body(r) == ""
+
+
+@pytest.mark.django_db
+def test_inventory_export_streams_ndjson_records(auth_client):
+    inventory = create_export_inventory(2)
+    r = auth_client.get(f"/api/v1/ansible-inventories/{inventory.id}/export?format=ndjson")
+    assert r.status_code == 200
+    records = [json.loads(line) for line in _body(r).splitlines()]
+    assert records[0] == {"type": "vars", "vars": {"env": "prod", "ntp": "pool.ntp.org"}}
+    groups = {rec["name"]: rec for rec in records if rec["type"] == "group"}
+    assert groups["web"]["children"] == ["nginx"]
+    hosts = {rec["name"]: rec for rec in records if rec["type"] == "host"}
+    assert hosts["export-2-host-1"]["groups"] == ["nginx"]
+    assert hosts["export-2-host-1"]["vars"]["rack"] == "r1"
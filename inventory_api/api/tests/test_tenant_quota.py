@@ -0,0 +1,203 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import (
+    Baremetal,
+    BaremetalGroup,
+    BaremetalGroupTenantQuota,
+    K8sCluster,
+    VirtualMachine,
+    reconcile_tenant_quota_usage,
+)
+from .base import auth_client, placement
+
+# ============================================================================
+# TENANT QUOTA USAGE TESTS
+# ============================================================================
+
+
+def _usage(quota: BaremetalGroupTenantQuota) -> tuple:
+    quota.refresh_from_db()
+    return quota.used_cpu, quota.used_memory, quota.used_storage
+
+
+def _vm_payload(tenant, baremetal, spec, name: str) -> dict:
+    return {
+        "name": name,
+        "tenant": str(tenant.id),
+        "baremetal": str(baremetal.id),
+        "specification": str(spec.id),
+        "status": "running",
+    }
+
+
+@pytest.mark.django_db
+def test_vm_lifecycle_moves_quota_usage(placement):
+    baremetals, group, tenant, spec = placement
+    vm = VirtualMachine.objects.create(
+        name="vm-1", tenant=tenant, baremetal=baremetals[0], specification=spec, status="running"
+    )
+    # A new quota starts from the usage already there
+    quota = BaremetalGroupTenantQuota.objects.create(group=group, tenant=tenant)
+    assert _usage(quota) == (4, 16, 100)
+
+    VirtualMachine.objects.create(
+        name="vm-2", tenant=tenant, baremetal=baremetals[1], specification=spec, status="running"
+    )
+    VirtualMachine.objects.create(name="unplaced", tenant=tenant, specification=spec, status="new")
+    assert _usage(quota) == (8, 32, 200)
+
+    spec.required_cpu = 6
+    spec.save()
+    assert _usage(quota) == (12, 32, 200)
+
+    vm.delete()
+    assert _usage(quota) == (6, 16, 100)
+
+    # A stale copy of the quota never writes its counters back
+    quota.used_cpu = 0
+    quota.memory_quota = 64
+    quota.save()
+    assert _usage(quota) == (6, 16, 100)
+
+    Baremetal.objects.get(pk=baremetals[1].pk).delete()
+    assert _usage(quota) == (0, 0, 0)
+
+
+@pytest.mark.django_db
+def test_host_move_carries_quota_usage_to_the_new_group(auth_client, placement):
+    baremetals, group, tenant, spec = placement
+    other = BaremetalGroup.objects.create(
+        name="other-group",
+        total_cpu=0,
+        total_memory=0,
+        total_storage=0,
+        available_cpu=0,
+        available_memory=0,
+        available_storage=0,
+        status="active",
+    )
+    quota = BaremetalGroupTenantQuota.objects.create(group=group, tenant=tenant)
+    other_quota = BaremetalGroupTenantQuota.objects.create(group=other, tenant=tenant)
+    vms = [
+        VirtualMachine.objects.create(
+            name=f"vm-{i}", tenant=tenant, baremetal=baremetal, specification=spec, gpu=1
+        )
+        for i, baremetal in enumerate(baremetals)
+    ]
+    assert _usage(quota) == (8, 32, 200)
+
+    host = Baremetal.objects.get(pk=baremetals[0].pk)
+    host.group = other
+    host.save()
+    assert _usage(quota) == (4, 16, 100)
+    assert _usage(other_quota) == (4, 16, 100)
+    assert (quota.used_gpu, other_quota.used_gpu) == (1, 1)
+
+    r = auth_client.patch(
+        "/api/v1/baremetals/bulk",
+        [{"id": str(baremetals[1].id), "group": str(other.id)}],
+        format="json",
+    )
+    assert r.status_code == 200
+    assert _usage(quota) == (0, 0, 0)
+    assert _usage(other_quota) == (8, 32, 200)
+
+    # Deleting the moved VMs releases the usage where it now counts
+    for vm in vms:
+        vm.delete()
+    assert _usage(quota) == (0, 0, 0)
+    assert _usage(other_quota) == (0, 0, 0)
+    assert reconcile_tenant_quota_usage() == 0
+
+
+@pytest.mark.django_db
+def test_vm_create_is_checked_against_quota(auth_client, placement):
+    baremetals, group, tenant, spec = placement
+    # 25% of the group's 64 CPUs leaves room for four VMs; memory is not limited
+    quota = BaremetalGroupTenantQuota.objects.create(
+        group=group, tenant=tenant, cpu_quota_percentage=25
+    )
+    for i in range(4):
+        r = auth_client.post(
+            "/api/v1/virtual-machines",
+            _vm_payload(tenant, baremetals[i % 2], spec, f"vm-{i}"),
+            format="json",
+        )
+        assert r.status_code == 201
+    assert _usage(quota) == (16, 64, 400)
+
+    r = auth_client.post(
+        "/api/v1/virtual-machines", _vm_payload(tenant, baremetals[0], spec, "vm-4"), format="json"
+    )
+    assert r.status_code == 400
+    assert "cpu quota" in r.data["quota"][0]
+    assert VirtualMachine.objects.count() == 4
+    assert _usage(quota) == (16, 64, 400)
+
+    # VMs of other tenants or without a host are not limited by the quota
+    r = auth_client.post(
+        "/api/v1/virtual-machines",
+        {**_vm_payload(tenant, baremetals[0], spec, "vm-5"), "baremetal": None},
+        format="json",
+    )
+    assert r.status_code == 201
+
+
+@pytest.mark.django_db
+def test_bulk_and_batch_creates_are_checked_against_quota(auth_client, placement):
+    baremetals, group, tenant, spec = placement
+    quota = BaremetalGroupTenantQuota.objects.create(group=group, tenant=tenant, storage_quota=300)
+
+    payload = [_vm_payload(tenant, baremetals[i % 2], spec, f"bulk-{i}") for i in range(4)]
+    r = auth_client.post("/api/v1/virtual-machines/bulk", payload, format="json")
+    assert r.status_code == 400
+    assert "storage quota" in r.data["quota"][0]
+    assert not VirtualMachine.objects.exists()
+    assert _usage(quota) == (0, 0, 0)
+
+    r = auth_client.post("/api/v1/virtual-machines/bulk", payload[:2], format="json")
+    assert r.status_code == 201
+    assert _usage(quota) == (8, 32, 200)
+
+    cluster = K8sCluster.objects.create(name="quota", version="1.30", tenant=tenant, status="up")
+    vms = [{"name": f"worker-{i}", "specification": str(spec.id)} for i in range(2)]
+    r = auth_client.post(
+        f"/api/v1/k8s-clusters/{cluster.id}/place_batch", {"vms": vms}, format="json"
+    )
+    assert r.status_code == 400
+    assert VirtualMachine.objects.count() == 2
+
+    r = auth_client.post(
+        f"/api/v1/k8s-clusters/{cluster.id}/place_batch", {"vms": vms[:1]}, format="json"
+    )
+    assert r.status_code == 201
+    assert _usage(quota) == (12, 48, 300)
+
+
+@pytest.mark.django_db
+def test_reconcile_rebuilds_quota_usage_in_one_aggregate(placement):
+    baremetals, group, tenant, spec = placement
+    quota = BaremetalGroupTenantQuota.objects.create(group=group, tenant=tenant)
+    for i in range(3):
+        VirtualMachine.objects.create(
+            name=f"vm-{i}",
+            tenant=tenant,
+            baremetal=baremetals[i % 2],
+            specification=spec,
+            status="running",
+        )
+    BaremetalGroupTenantQuota.objects.filter(pk=quota.pk).update(used_cpu=0, used_storage=1)
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert reconcile_tenant_quota_usage() == 1
+    assert sum("GROUP BY" in query["sql"] for query in ctx.captured_queries) == 1
+    assert _usage(quota) == (12, 48, 300)
+
+    out = io.StringIO()
+    call_command("reconcile_quota_usage", stdout=out)
+    assert "0 tenant quotas" in out.getvalue()
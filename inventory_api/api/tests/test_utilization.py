@@ -0,0 +1,135 @@
+import io
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import UtilizationSnapshot, VirtualMachine
+from ..utilization import RETENTION, roll_up, run_snapshot_job, take_snapshot
+from .base import auth_client, placement
+
+# ============================================================================
+# UTILIZATION SNAPSHOT TESTS
+# ============================================================================
+
+T0 = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+
+def _series(scope: str, resolution: str) -> list:
+    return list(
+        UtilizationSnapshot.objects.filter(scope=scope, resolution=resolution)
+        .order_by("bucket")
+        .values_list("bucket", "samples", "used_cpu")
+    )
+
+
+@pytest.mark.django_db
+def test_snapshot_takes_one_aggregate_query_per_level(placement):
+    baremetals, group, tenant, spec = placement
+    VirtualMachine.objects.create(
+        name="vm-1", tenant=tenant, baremetal=baremetals[0], specification=spec, status="running"
+    )
+    with CaptureQueriesContext(connection) as ctx:
+        assert take_snapshot(T0) == 3
+    selects = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("SELECT")]
+    assert len(selects) == 3
+
+    rows = {
+        row.scope: row for row in UtilizationSnapshot.objects.filter(resolution="raw", bucket=T0)
+    }
+    assert rows["group"].object_id == group.id
+    assert (rows["group"].total_cpu, rows["group"].used_cpu) == (64, 4)
+    assert rows["rack"].object_id == baremetals[0].rack_id
+    assert (rows["rack"].total_memory, rows["rack"].used_memory) == (512, 16)
+    assert rows["tenant"].object_id == tenant.id
+    assert (rows["tenant"].total_cpu, rows["tenant"].used_storage) == (0, 100)
+
+
+@pytest.mark.django_db
+def test_rollups_average_complete_periods_once(placement):
+    baremetals, group, tenant, spec = placement
+    vms = []
+    # Two samples in each of 24 hours, with one more VM every hour
+    for hour in range(24):
+        vms.append(
+            VirtualMachine.objects.create(
+                name=f"vm-{hour}",
+                tenant=tenant,
+                baremetal=baremetals[hour % 2],
+                specification=spec,
+                status="running",
+            )
+        )
+        for minute in (0, 30):
+            take_snapshot(T0 + timedelta(hours=hour, minutes=minute))
+
+    assert roll_up("hourly", T0 + timedelta(hours=23, minutes=45)) == 3 * 23
+    assert roll_up("hourly", T0 + timedelta(hours=23, minutes=50)) == 0
+    assert roll_up("hourly", T0 + timedelta(days=1)) == 3
+    hourly = _series("tenant", "hourly")
+    assert len(hourly) == 24
+    assert hourly[0] == (T0, 2, 4)
+    assert hourly[-1] == (T0 + timedelta(hours=23), 2, 96)
+
+    assert roll_up("daily", T0 + timedelta(days=1)) == 3
+    # Mean of 4, 8, ..., 96 CPUs over the 48 samples of the day
+    assert _series("tenant", "daily") == [(T0, 48, 50)]
+    assert roll_up("daily", T0 + timedelta(days=2)) == 0
+
+
+@pytest.mark.django_db
+def test_snapshot_job_prunes_expired_rows(placement):
+    old = T0 - RETENTION["raw"] - timedelta(hours=1)
+    take_snapshot(old)
+    report = run_snapshot_job(T0)
+    assert report["raw"] == 2
+    # The old sample's hour and day are complete, the new one's are not
+    assert report["hourly"] == 2
+    assert report["daily"] == 2
+    assert report["pruned"] == 2
+    assert not UtilizationSnapshot.objects.filter(resolution="raw", bucket=old).exists()
+
+    out = io.StringIO()
+    call_command("snapshot_utilization", stdout=out)
+    assert "2 samples" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_utilization_range_reads_only_rollups(auth_client, placement):
+    baremetals, group, tenant, spec = placement
+    now = datetime.now(timezone.utc)
+    for day in range(90):
+        UtilizationSnapshot.objects.create(
+            scope="group",
+            object_id=group.id,
+            resolution="daily",
+            bucket=now - timedelta(days=90 - day),
+            samples=24,
+            total_cpu=64,
+            used_cpu=day,
+        )
+    UtilizationSnapshot.objects.create(
+        scope="group", object_id=group.id, resolution="raw", bucket=now - timedelta(hours=1)
+    )
+
+    start = (now - timedelta(days=91)).isoformat()
+    with CaptureQueriesContext(connection) as ctx:
+        r = auth_client.get(
+            "/api/v1/utilization", {"scope": "group", "object_id": str(group.id), "start": start}
+        )
+    assert r.status_code == 200
+    assert r.data["resolution"] == "daily"
+    assert [row["used_cpu"] for row in r.data["results"]] == list(range(90))
+    touched = [q["sql"] for q in ctx.captured_queries if "api_baremetal" in q["sql"]]
+    assert touched == []
+
+    r = auth_client.get("/api/v1/utilization", {"scope": "group"})
+    assert r.data["resolution"] == "hourly"
+    r = auth_client.get("/api/v1/utilization", {"scope": "group", "resolution": "raw"})
+    assert len(r.data["results"]) == 1
+
+    later = (now + timedelta(hours=1)).isoformat()
+    r = auth_client.get("/api/v1/utilization", {"scope": "group", "start": later})
+    assert r.status_code == 400
@@ -0,0 +1,68 @@
+from unittest import mock
+
+import pytest
+
+from ..models import AnsibleVariableSet
+from ..models.ansible import VARIABLE_SET_PARSE_CACHE, ParsedContentCache
+from .base import auth_client
+
+# ============================================================================
+# VARIABLE SET PARSE CACHE TESTS
+# ============================================================================
+
+
+@pytest.fixture
+def variable_set(db):
+    VARIABLE_SET_PARSE_CACHE.clear()
+    return AnsibleVariableSet.objects.create(
+        name="parse-cache", content="ntp: pool.ntp.org\nports: [80, 443]", content_type="yaml"
+    )
+
+
+@pytest.mark.django_db
+def test_parsed_content_is_persisted_on_save(variable_set):
+    stored = AnsibleVariableSet.objects.get(pk=variable_set.pk)
+    assert stored.parsed_content == {"ntp": "pool.ntp.org", "ports": [80, 443]}
+    assert stored.content_hash == variable_set.compute_content_hash()
+
+
+@pytest.mark.django_db
+def test_saved_sets_are_not_reparsed(auth_client, variable_set):
+    with mock.patch("yaml.safe_load", side_effect=AssertionError):
+        stored = AnsibleVariableSet.objects.get(pk=variable_set.pk)
+        assert stored.get_parsed_content()["ntp"] == "pool.ntp.org"
+        r = auth_client.get("/api/v1/ansible-variable-sets")
+        assert r.status_code == 200
+        assert r.data["results"][0]["parsed_content"]["ports"] == [80, 443]
+
+
+@pytest.mark.django_db
+def test_content_change_is_reparsed(variable_set):
+    variable_set.content = "ntp: time.example.com"
+    variable_set.save(update_fields=["content"])
+    assert AnsibleVariableSet.objects.get(pk=variable_set.pk).parsed_content == {
+        "ntp": "time.example.com"
+    }
+
+    # Writes that bypass save() are caught by the content hash
+    AnsibleVariableSet.objects.filter(pk=variable_set.pk).update(content="ntp: other")
+    assert AnsibleVariableSet.objects.get(pk=variable_set.pk).get_parsed_content() == {
+        "ntp": "other"
+    }
+
+
+@pytest.mark.django_db
+def test_callers_cannot_mutate_cached_content(variable_set):
+    variable_set.get_parsed_content()["ntp"] = "changed"
+    variable_set.get_parsed_content()["ports"].append(8080)
+    assert variable_set.get_parsed_content() == {"ntp": "pool.ntp.org", "ports": [80, 443]}
+
+
+def test_parse_cache_is_bounded():
+    cache = ParsedContentCache(maxsize=2)
+    cache.set((1, "a"), {"a": 1})
+    cache.set((2, "b"), {"b": 1})
+    assert cache.get((1, "a")) == {"a": 1}
+    cache.set((3, "c"), {"c": 1})
+    assert cache.get((2, "b")) is None
+    assert cache.get((1, "a")) == {"a": 1}
@@ -0,0 +1,126 @@
+import uuid
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..models import (
+    AnsibleGroup,
+    AnsibleGroupVariable,
+    AnsibleHost,
+    AnsibleHostVariable,
+    AnsibleInventory,
+    AnsibleInventoryVariable,
+    Tenant,
+)
+from .base import auth_client
+
+# ============================================================================
+# VARIABLE UPSERT TESTS
+# ============================================================================
+
+
+@pytest.fixture
+def inventory(db):
+    return AnsibleInventory.objects.create(name="upsert-inventory")
+
+
+@pytest.mark.django_db
+def test_upsert_group_variables(auth_client, inventory):
+    group = AnsibleGroup.objects.create(inventory=inventory, name="web")
+    existing = AnsibleGroupVariable.objects.create(group=group, key="http_port", value="80")
+
+    payload = {
+        "variables": {
+            "http_port": {"value": "8080", "value_type": "integer"},
+            "packages": {"value": ["nginx", "curl"], "value_type": "list"},
+            "tier": {"value": "frontend"},
+        }
+    }
+    r = auth_client.post(
+        f"/api/v1/ansible-groups/{group.id}/upsert_variables", payload, format="json"
+    )
+    assert r.status_code == 200
+    assert r.data["upserted"] == 3
+    assert r.data["variables"] == {
+        "http_port": 8080,
+        "packages": ["nginx", "curl"],
+        "tier": "frontend",
+    }
+    # Conflicting rows are updated in place
+    updated = AnsibleGroupVariable.objects.get(group=group, key="http_port")
+    assert updated.pk == existing.pk
+    assert updated.value_type == "integer"
+    assert updated.typed_value == 8080
+
+
+@pytest.mark.django_db
+def test_upsert_replace_deletes_missing_keys(auth_client, inventory):
+    AnsibleInventoryVariable.objects.create(inventory=inventory, key="env", value="prod")
+    AnsibleInventoryVariable.objects.create(inventory=inventory, key="stale", value="x")
+
+    payload = {"variables": {"env": {"value": "staging"}}, "replace": True}
+    r = auth_client.post(
+        f"/api/v1/ansible-inventories/{inventory.id}/upsert_variables", payload, format="json"
+    )
+    assert r.status_code == 200
+    assert r.data["deleted"] == 1
+    assert r.data["variables"] == {"env": "staging"}
+
+
+@pytest.mark.django_db
+def test_upsert_host_variables_in_one_write(auth_client, inventory):
+    host = AnsibleHost.objects.create(
+        inventory=inventory,
+        content_type=ContentType.objects.get_for_model(Tenant),
+        object_id=uuid.uuid4(),
+    )
+    payload = {"variables": {f"key{i}": {"value": str(i)} for i in range(50)}}
+    with CaptureQueriesContext(connection) as ctx:
+        r = auth_client.post(
+            f"/api/v1/ansible-hosts/{host.id}/upsert_variables", payload, format="json"
+        )
+    assert r.status_code == 200
+    assert AnsibleHostVariable.objects.filter(host=host).count() == 50
+    inserts = [
+        q for q in ctx.captured_queries if "INSERT" in q["sql"] and "hostvariable" in q["sql"]
+    ]
+    assert len(inserts) == 1
+
+
+@pytest.mark.django_db
+def test_upsert_rejects_invalid_values(auth_client, inventory):
+    group = AnsibleGroup.objects.create(inventory=inventory, name="db")
+    payload = {
+        "variables": {
+            "port": {"value": "abc", "value_type": "integer"},
+            "ok": {"value": "1", "value_type": "integer"},
+        }
+    }
+    r = auth_client.post(
+        f"/api/v1/ansible-groups/{group.id}/upsert_variables", payload, format="json"
+    )
+    assert r.status_code == 400
+    assert set(r.data["variables"]) == {"port"}
+    assert not AnsibleGroupVariable.objects.exists()
+
+
+@pytest.mark.django_db
+def test_upsert_invalidates_compiled_inventory(auth_client, inventory):
+    group = AnsibleGroup.objects.create(inventory=inventory, name="app")
+    inventory.refresh_from_db()
+    version = inventory.content_version
+    payload = {"variables": {"env": {"value": "prod"}}}
+    auth_client.post(f"/api/v1/ansible-groups/{group.id}/upsert_variables", payload, format="json")
+    inventory.refresh_from_db()
+    assert inventory.content_version > version
+
+
+@pytest.mark.django_db
+def test_set_variable_updates_existing(inventory):
+    group = AnsibleGroup.objects.create(inventory=inventory, name="cache")
+    group.set_variable("sizes", [1, 2], "list")
+    group.set_variable("sizes", [3], "list")
+    assert group.get_variable("sizes") == [3]
+    assert group.variables.count() == 1
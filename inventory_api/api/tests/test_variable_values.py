@@ -0,0 +1,131 @@
+import importlib
+from unittest import mock
+
+import pytest
+from django.apps import apps
+from django.core.exceptions import ValidationError
+
+from ..models import (
+    AnsibleGroup,
+    AnsibleGroupVariable,
+    AnsibleInventory,
+    AnsibleInventoryVariable,
+)
+from .base import auth_client
+
+# ============================================================================
+# DECODED VARIABLE VALUE TESTS
+# ============================================================================
+
+
+@pytest.fixture
+def inventory(db):
+    return AnsibleInventory.objects.create(name="typed-values")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "value, value_type, expected",
+    [
+        ("plain", "string", "plain"),
+        ("42", "integer", 42),
+        ("1.5", "float", 1.5),
+        ("Yes", "boolean", True),
+        ("off", "boolean", False),
+        ('{"a": [1, 2]}', "json", {"a": [1, 2]}),
+        ("[1, 2]", "list", [1, 2]),
+        ('{"a": 1}', "dict", {"a": 1}),
+    ],
+)
+def test_typed_value_is_decoded_on_save(inventory, value, value_type, expected):
+    var = AnsibleInventoryVariable.objects.create(
+        inventory=inventory, key="k", value=value, value_type=value_type
+    )
+    assert AnsibleInventoryVariable.objects.get(pk=var.pk).typed_value == expected
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "value, value_type",
+    [("abc", "integer"), ("maybe", "boolean"), ("{oops", "json"), ('{"a": 1}', "list")],
+)
+def test_invalid_value_is_rejected_on_save(inventory, value, value_type):
+    with pytest.raises(ValidationError):
+        AnsibleInventoryVariable.objects.create(
+            inventory=inventory, key="k", value=value, value_type=value_type
+        )
+
+
+@pytest.mark.django_db
+def test_invalid_value_is_rejected_by_api(auth_client, inventory):
+    payload = {
+        "inventory": str(inventory.id),
+        "key": "port",
+        "value": "x",
+        "value_type": "integer",
+    }
+    r = auth_client.post("/api/v1/ansible-inventory-variables", payload, format="json")
+    assert r.status_code == 400
+    assert "value" in r.data
+
+    payload["value"] = "80"
+    r = auth_client.post("/api/v1/ansible-inventory-variables", payload, format="json")
+    assert r.status_code == 201
+
+    # A partial update is validated against the stored value
+    r = auth_client.patch(
+        f"/api/v1/ansible-inventory-variables/{r.data['id']}",
+        {"value_type": "dict"},
+        format="json",
+    )
+    assert r.status_code == 400
+
+
+@pytest.mark.django_db
+def test_update_fields_save_refreshes_typed_value(inventory):
+    var = AnsibleInventoryVariable.objects.create(
+        inventory=inventory, key="k", value="1", value_type="integer"
+    )
+    var.value = "2"
+    var.save(update_fields=["value"])
+    assert AnsibleInventoryVariable.objects.get(pk=var.pk).typed_value == 2
+
+
+@pytest.mark.django_db
+def test_readers_do_not_decode(auth_client, inventory):
+    group = AnsibleGroup.objects.create(inventory=inventory, name="g")
+    AnsibleGroupVariable.objects.create(group=group, key="ports", value="[1]", value_type="list")
+    AnsibleInventoryVariable.objects.create(
+        inventory=inventory, key="n", value="3", value_type="integer"
+    )
+    with mock.patch(
+        "inventory_api.api.models.ansible.decode_variable_value", side_effect=AssertionError
+    ):
+        assert group.all_variables == {"n": 3, "ports": [1]}
+        r = auth_client.get(f"/api/v1/ansible-inventories/{inventory.id}/export")
+        assert r.json()["all"]["children"]["g"]["vars"] == {"ports": [1]}
+        r = auth_client.get(
+            f"/api/v1/ansible-inventories/{inventory.id}/merged_variables?group_id={group.id}"
+        )
+        assert r.data == {"n": 3, "ports": [1]}
+
+
+@pytest.mark.django_db
+def test_data_migration_decodes_existing_rows(inventory):
+    migration = importlib.import_module("inventory_api.api.migrations.0005_variable_typed_value")
+    AnsibleInventoryVariable.objects.create(
+        inventory=inventory, key="n", value="7", value_type="integer"
+    )
+    AnsibleInventoryVariable.objects.update(typed_value=None)
+    AnsibleInventoryVariable.objects.bulk_create(
+        [AnsibleInventoryVariable(inventory=inventory, key="bad", value="{x", value_type="json")]
+    )
+
+    migration.populate_typed_values(apps, None)
+
+    values = dict(
+        AnsibleInventoryVariable.objects.filter(inventory=inventory).values_list(
+            "key", "typed_value"
+        )
+    )
+    assert values == {"n": 7, "bad": "{x"}
@@ -256,8 +256,9 @@ class TestBaremetalViewSets:
         }
         response = auth_client.post("/api/v1/baremetal-groups", data, format="json")
         assert response.status_code == status.HTTP_201_CREATED
-        assert response.data["total_cpu"] == 1000
-        assert response.data["available_cpu"] == 500
+        # Capacity is derived from the group's baremetals, of which it has none yet
+        assert response.data["total_cpu"] == 0
+        assert response.data["available_cpu"] == 0
 
 
 @pytest.mark.django_db
@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from django.db import transaction
+from django.db.models import F, Max, QuerySet, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from . import models
+from .models.utilization import UTILIZATION_METRICS
+
+# How long each resolution is kept; daily rollups are kept forever
+RETENTION = {"raw": timedelta(days=2), "hourly": timedelta(days=30)}
+
+# Rollups: target resolution -> (source resolution, period, truncation)
+ROLLUPS = {
+    "hourly": ("raw", timedelta(hours=1), TruncHour),
+    "daily": ("hourly", timedelta(days=1), TruncDay),
+}
+
+RESOURCES = ["cpu", "memory", "storage", "gpu"]
+
+
+def group_utilization() -> QuerySet:
+    """Capacity of every group, from its maintained total_*/available_* counters"""
+    return models.BaremetalGroup.objects.order_by().values(
+        *[f"total_{r}" for r in RESOURCES],
+        object_id=F("pk"),
+        **{f"used_{r}": F(f"total_{r}") - F(f"available_{r}") for r in RESOURCES},
+    )
+
+
+def rack_utilization() -> QuerySet:
+    """Capacity of every rack holding baremetals, summed from them in one GROUP BY"""
+    return (
+        models.Baremetal.objects.filter(rack__isnull=False)
+        .order_by()
+        .values(object_id=F("rack"))
+        .annotate(
+            **{f"total_{r}": Sum(f"model__total_{r}") for r in RESOURCES},
+            **{f"used_{r}": Sum(f"model__total_{r}") - Sum(f"available_{r}") for r in RESOURCES},
+        )
+    )
+
+
+def tenant_utilization() -> QuerySet:
+    """Resources reserved by every tenant's placed VMs, in one GROUP BY"""
+    return (
+        models.VirtualMachine.objects.filter(baremetal__isnull=False)
+        .order_by()
+        .values(object_id=F("tenant"))
+        .annotate(
+            used_cpu=Sum("specification__required_cpu"),
+            used_memory=Sum("specification__required_memory"),
+            used_storage=Sum("specification__required_storage"),
+            used_gpu=Sum("gpu"),
+        )
+    )
+
+
+SNAPSHOT_LEVELS: Dict[str, Callable[[], QuerySet]] = {
+    "group": group_utilization,
+    "rack": rack_utilization,
+    "tenant": tenant_utilization,
+}
+
+
+def take_snapshot(now: Optional[datetime] = None) -> int:
+    """Write one raw row per group, rack and tenant; one aggregate query per level"""
+    now = now or timezone.now()
+    snapshots = [
+        models.UtilizationSnapshot(
+            scope=scope,
+            object_id=row["object_id"],
+            resolution="raw",
+            bucket=now,
+            **{metric: row.get(metric) or 0 for metric in UTILIZATION_METRICS},
+        )
+        for scope, rows in SNAPSHOT_LEVELS.items()
+        for row in rows()
+    ]
+    models.UtilizationSnapshot.objects.bulk_create(
+        snapshots, batch_size=1000, ignore_conflicts=True
+    )
+    return len(snapshots)
+
+
+def period_start(resolution: str, moment: datetime) -> datetime:
+    """Start of the hour/day holding ``moment``, in the current time zone like Trunc*"""
+    moment = timezone.localtime(moment).replace(minute=0, second=0, microsecond=0)
+    if resolution == "daily":
+        moment = moment.replace(hour=0)
+    return moment
+
+
+def roll_up(resolution: str, now: Optional[datetime] = None) -> int:
+    """
+    Average the source rows of every complete period not rolled up yet into one
+    ``resolution`` row per object, weighting each source row by its samples.
+    Costs one aggregate query, so a job that missed runs catches up in one go.
+    """
+    source, period, trunc = ROLLUPS[resolution]
+    rows = models.UtilizationSnapshot.objects.filter(
+        resolution=source, bucket__lt=period_start(resolution, now or timezone.now())
+    )
+    last = models.UtilizationSnapshot.objects.filter(resolution=resolution).aggregate(
+        last=Max("bucket")
+    )["last"]
+    if last is not None:
+        rows = rows.filter(bucket__gte=last + period)
+    rollups = []
+    for row in (
+        rows.order_by()
+        .values("scope", "object_id", period=trunc("bucket"))
+        .annotate(
+            total_samples=Sum("samples"),
+            **{f"sum_{metric}": Sum(F(metric) * F("samples")) for metric in UTILIZATION_METRICS},
+        )
+    ):
+        samples = row["total_samples"]
+        rollups.append(
+            models.UtilizationSnapshot(
+                scope=row["scope"],
+                object_id=row["object_id"],
+                resolution=resolution,
+                bucket=row["period"],
+                samples=samples,
+                **{
+                    metric: round(row[f"sum_{metric}"] / samples) for metric in UTILIZATION_METRICS
+                },
+            )
+        )
+    models.UtilizationSnapshot.objects.bulk_create(rollups, batch_size=1000, ignore_conflicts=True)
+    return len(rollups)
+
+
+def prune(now: Optional[datetime] = None) -> int:
+    """Delete rows older than the retention of their resolution"""
+    now = now or timezone.now()
+    deleted = 0
+    for resolution, retention in RETENTION.items():
+        # Nothing refers to snapshots, so this is a single DELETE statement
+        deleted += models.UtilizationSnapshot.objects.filter(
+            resolution=resolution, bucket__lt=now - retention
+        ).delete()[0]
+    return deleted
+
+
+def run_snapshot_job(now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Take a snapshot, roll up the completed hours and days, then prune"""
+    now = now or timezone.now()
+    with transaction.atomic():
+        report = {"raw": take_snapshot(now)}
+        for resolution in ROLLUPS:
+            report[resolution] = roll_up(resolution, now)
+        report["pruned"] = prune(now)
+    return report
+
+
+def pick_resolution(start: datetime, now: Optional[datetime] = None) -> str:
+    """Finest resolution still kept for a range beginning at ``start``"""
+    now = now or timezone.now()
+    for resolution, retention in RETENTION.items():
+        if start >= now - retention:
+            return resolution
+    return "daily"
@@ -0,0 +1,550 @@
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple, Type
+
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models import Model, QuerySet
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator
+
+from ..renderers import NDJSONRenderer
+from ..signals import bulk_created, bulk_updated, stored_values
+from ..streaming import streaming_export_response
+from .serializers import (
+    PreResolvedPrimaryKeyRelatedField,
+    VariableUpsertSerializer,
+    normalize_pk,
+)
+
+# (select_related paths, prefetch_related paths, only() columns)
+EagerLoadingPaths = Tuple[List[str], List[str], List[str]]
+
+# Cache of eager-loading paths per serializer shape; keys include client-supplied
+# ?fields=/?expand= values, so the cache is bounded
+_EAGER_LOADING_CACHE: Dict[Hashable, EagerLoadingPaths] = {}
+_EAGER_LOADING_CACHE_SIZE = 1024
+
+
+def _needs_loading(field: Any) -> Tuple[bool, Any]:
+    """Return whether a serializer field touches a relation, and its nested serializer"""
+    if isinstance(field, serializers.ListSerializer):
+        return True, field.child
+    if isinstance(field, serializers.BaseSerializer):
+        return True, field
+    if isinstance(field, serializers.ManyRelatedField):
+        return True, None
+    if isinstance(field, serializers.RelatedField) and not isinstance(
+        field, serializers.PrimaryKeyRelatedField
+    ):
+        # PrimaryKeyRelatedField reads the local "<name>_id" column and never queries
+        return True, None
+    return False, None
+
+
+def _concrete_field_names(model: Type[Model]) -> List[str]:
+    return [f.name for f in model._meta.concrete_fields]
+
+
+def _model_for_path(model: Type[Model], path: str) -> Optional[Type[Model]]:
+    for name in path.split("__"):
+        try:
+            model = model._meta.get_field(name).related_model
+        except FieldDoesNotExist:
+            return None
+        if model is None:
+            return None
+    return model
+
+
+def _walk_serializer(
+    serializer: serializers.BaseSerializer,
+    model: Type[Model],
+    prefix: str,
+    in_prefetch: bool,
+    select: List[str],
+    prefetch: List[str],
+    only: List[str],
+) -> None:
+    """Collect eager-loading paths and rendered columns for a serializer tree"""
+    meta = getattr(serializer, "Meta", None)
+    columns: Set[str] = {model._meta.pk.name}
+    restrict_columns = True
+
+    for hint in getattr(meta, "select_related_fields", ()):
+        (prefetch if in_prefetch else select).append(prefix + hint)
+        hint_model = _model_for_path(model, hint)
+        if not in_prefetch and hint_model is not None:
+            columns.add(hint.split("__")[0])
+            only.extend(f"{prefix}{hint}__{name}" for name in _concrete_field_names(hint_model))
+    for hint in getattr(meta, "prefetch_related_fields", ()):
+        prefetch.append(prefix + hint)
+        columns.add(hint.split("__")[0])
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == "*" or "." in field.source:
+            restrict_columns = False
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            # Method fields and properties may read any column
+            restrict_columns = False
+            continue
+        if isinstance(model_field, GenericForeignKey):
+            columns.update((model_field.ct_field, model_field.fk_field))
+        elif model_field.concrete:
+            columns.add(model_field.name)
+
+        needs_loading, nested = _needs_loading(field)
+        if not needs_loading or not model_field.is_relation:
+            continue
+
+        path = prefix + field.source
+        to_many = bool(model_field.many_to_many or model_field.one_to_many)
+        # GenericForeignKey cannot be joined and must be prefetched
+        generic = not getattr(model_field, "concrete", True) and bool(model_field.many_to_one)
+        use_prefetch = in_prefetch or to_many or generic
+        (prefetch if use_prefetch else select).append(path)
+
+        related_model = model_field.related_model
+        if isinstance(nested, serializers.ModelSerializer) and related_model is not None:
+            _walk_serializer(
+                nested, related_model, f"{path}__", use_prefetch, select, prefetch, only
+            )
+        elif not use_prefetch and related_model is not None:
+            only.extend(f"{path}__{name}" for name in _concrete_field_names(related_model))
+
+    # Columns of prefetched models are loaded by their own queries
+    if not in_prefetch:
+        if not restrict_columns:
+            columns.update(_concrete_field_names(model))
+        only.extend(prefix + name for name in sorted(columns))
+
+
+def collect_eager_loading_paths(serializer: serializers.BaseSerializer) -> EagerLoadingPaths:
+    """Derive eager-loading paths and rendered columns from a serializer instance"""
+    select: List[str] = []
+    prefetch: List[str] = []
+    only: List[str] = []
+    model = getattr(getattr(serializer, "Meta", None), "model", None)
+    if model is not None:
+        _walk_serializer(serializer, model, "", False, select, prefetch, only)
+    return (
+        list(dict.fromkeys(select)),
+        list(dict.fromkeys(prefetch)),
+        list(dict.fromkeys(only)),
+    )
+
+
+def get_eager_loading_paths(
+    serializer_class: Type[serializers.BaseSerializer],
+) -> Tuple[List[str], List[str]]:
+    """
+    Derive select_related/prefetch_related paths from a serializer's field tree.
+
+    Forward foreign keys and one-to-one relations rendered by nested serializers are
+    joined with select_related; many-to-many, reverse and generic relations (and
+    anything below them) are prefetched. Serializers can add paths for relations
+    used by SerializerMethodFields through ``Meta.select_related_fields`` and
+    ``Meta.prefetch_related_fields``.
+    """
+    if serializer_class not in _EAGER_LOADING_CACHE:
+        _EAGER_LOADING_CACHE[serializer_class] = collect_eager_loading_paths(serializer_class())
+    select, prefetch, _ = _EAGER_LOADING_CACHE[serializer_class]
+    return select, prefetch
+
+
+def _parse_list_param(value: Optional[str]) -> Optional[Set[str]]:
+    if value is None:
+        return None
+    return {item.strip() for item in value.split(",") if item.strip()}
+
+
+def prune_serializer_fields(
+    serializer: serializers.BaseSerializer,
+    fields: Optional[Set[str]],
+    expand: Optional[Set[str]],
+    path: str = "",
+) -> None:
+    """
+    Apply sparse fieldsets and expansion to a serializer in place.
+
+    Only the top-level ``fields`` are kept when given. Nested serializers listed in
+    ``expand`` (dotted paths, e.g. ``baremetal.rack``) are rendered in full; every
+    other nested relation, including those of a request without ``expand``, is
+    replaced by its primary key.
+    """
+    for name, field in list(serializer.fields.items()):
+        if not path and fields is not None and name not in fields:
+            del serializer.fields[name]
+            continue
+
+        many = isinstance(field, serializers.ListSerializer)
+        nested = field.child if many else field
+        if not isinstance(nested, serializers.BaseSerializer):
+            continue
+
+        field_path = f"{path}{name}"
+        if expand is not None and field_path in expand:
+            prune_serializer_fields(nested, None, expand, f"{field_path}.")
+            continue
+
+        kwargs: Dict[str, Any] = {"read_only": True, "many": many}
+        if field.source != name:
+            kwargs["source"] = field.source
+        serializer.fields[name] = serializers.PrimaryKeyRelatedField(**kwargs)
+
+
+class EagerLoadingMixin:
+    """
+    ViewSet mixin applying select_related/prefetch_related derived from the active
+    serializer, so a page costs a fixed number of queries regardless of its size.
+    """
+
+    # Actions that only render instances, where unrendered columns can be deferred
+    read_only_actions = ("list", "retrieve", "export")
+
+    def get_eager_loading_key(self) -> Hashable:
+        return self.get_serializer_class()  # type: ignore[attr-defined]
+
+    def get_eager_loading_paths(self) -> EagerLoadingPaths:
+        key = self.get_eager_loading_key()
+        if key not in _EAGER_LOADING_CACHE:
+            if len(_EAGER_LOADING_CACHE) >= _EAGER_LOADING_CACHE_SIZE:
+                _EAGER_LOADING_CACHE.clear()
+            _EAGER_LOADING_CACHE[key] = collect_eager_loading_paths(
+                self.get_serializer()  # type: ignore[attr-defined]
+            )
+        return _EAGER_LOADING_CACHE[key]
+
+    def get_queryset(self) -> QuerySet:
+        queryset = super().get_queryset()  # type: ignore[misc]
+        select, prefetch, only = self.get_eager_loading_paths()
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        # Deferring columns is only safe when the instances are rendered, never saved
+        if only and getattr(self, "action", None) in self.read_only_actions:
+            queryset = queryset.only(*only)
+        return queryset
+
+
+class DynamicFieldsMixin:
+    """
+    ViewSet mixin adding ``?fields=`` and ``?expand=`` query parameters to read
+    actions. Combined with EagerLoadingMixin, the queryset only joins the expanded
+    relations and only fetches the rendered columns.
+    """
+
+    dynamic_fields_actions = ("list", "retrieve", "export")
+
+    def _dynamic_fields_enabled(self) -> bool:
+        return (
+            getattr(self, "request", None) is not None
+            and getattr(self, "action", None) in self.dynamic_fields_actions
+        )
+
+    def _get_dynamic_fields_params(self) -> Tuple[Optional[Set[str]], Optional[Set[str]]]:
+        query_params = self.request.query_params  # type: ignore[attr-defined]
+        fields = _parse_list_param(query_params.get("fields"))
+        expand = _parse_list_param(query_params.get("expand"))
+        if expand is not None:
+            # Expanding "a.b" implies expanding "a"
+            for item in list(expand):
+                parts = item.split(".")
+                expand.update(".".join(parts[:i]) for i in range(1, len(parts)))
+        return fields, expand
+
+    def get_eager_loading_key(self) -> Hashable:
+        key = super().get_eager_loading_key()  # type: ignore[misc]
+        if not self._dynamic_fields_enabled():
+            return key
+        fields, expand = self._get_dynamic_fields_params()
+        return (
+            key,
+            frozenset(fields) if fields is not None else None,
+            frozenset(expand) if expand is not None else None,
+        )
+
+    def get_serializer(self, *args: Any, **kwargs: Any) -> serializers.BaseSerializer:
+        serializer = super().get_serializer(*args, **kwargs)  # type: ignore[misc]
+        if self._dynamic_fields_enabled():
+            fields, expand = self._get_dynamic_fields_params()
+            prune_serializer_fields(getattr(serializer, "child", serializer), fields, expand)
+        return serializer
+
+
+class StreamingExportMixin:
+    """
+    ViewSet mixin adding ``GET <collection>/export``, which streams every row of the
+    filtered queryset as a JSON array or, with ``?format=ndjson``, as NDJSON.
+
+    Rows are read through ``QuerySet.iterator()`` (a server-side cursor on PostgreSQL),
+    with prefetches applied per chunk, and encoded one at a time, so worker memory
+    does not grow with the number of rows exported.
+    """
+
+    export_chunk_size = 2000
+
+    @action(detail=False, methods=["get"], renderer_classes=[JSONRenderer, NDJSONRenderer])
+    def export(self, request: Any) -> StreamingHttpResponse:
+        queryset = self.filter_queryset(self.get_queryset())  # type: ignore[attr-defined]
+        serializer = self.get_serializer(many=True)  # type: ignore[attr-defined]
+        child = serializer.child
+        rows = (
+            child.to_representation(instance)
+            for instance in queryset.iterator(chunk_size=self.export_chunk_size)
+        )
+        return streaming_export_response(
+            rows,
+            request.accepted_renderer.format,
+            str(queryset.model._meta.verbose_name_plural).replace(" ", "_"),
+        )
+
+
+def resolve_related_objects(
+    serializer: serializers.BaseSerializer, items: List[Any]
+) -> Dict[str, Dict[Any, Model]]:
+    """Fetch every object referenced by ``items`` through pre-resolved fields, one query each"""
+    resolved: Dict[str, Dict[Any, Model]] = {}
+    for name, field in serializer.fields.items():
+        if field.read_only or not isinstance(field, PreResolvedPrimaryKeyRelatedField):
+            continue
+        queryset = field.get_queryset()
+        keys = {
+            normalize_pk(queryset.model, item[name])
+            for item in items
+            if isinstance(item, dict) and item.get(name) is not None
+        }
+        keys.discard(None)
+        resolved[name] = queryset.in_bulk(keys)
+    return resolved
+
+
+class BulkWriteMixin:
+    """
+    ViewSet mixin adding ``<collection>/bulk``, which creates (POST), updates (PATCH)
+    or deletes (DELETE) a list of objects in one request and one transaction. A POST
+    of a list to the collection itself is a bulk create.
+
+    The payload is validated in one pass: objects referenced through
+    PreResolvedPrimaryKeyRelatedField are fetched with one query per relation, and
+    unique fields are checked with one query per field. Nothing is written unless
+    every item is valid; otherwise the response lists the errors by item index.
+    Writes go through bulk_create()/bulk_update(), which skip save() and post_save,
+    so the ``bulk_created``/``bulk_updated`` signals are sent instead.
+    """
+
+    bulk_create_serializer_class: Optional[Type[serializers.BaseSerializer]] = None
+    bulk_update_serializer_class: Optional[Type[serializers.BaseSerializer]] = None
+    bulk_max_items = 1000
+
+    def create(self, request: Any, *args: Any, **kwargs: Any) -> Response:
+        if isinstance(request.data, list):
+            return self.bulk(request)
+        return super().create(request, *args, **kwargs)  # type: ignore[misc]
+
+    @action(detail=False, methods=["post", "patch", "delete"])
+    def bulk(self, request: Any) -> Response:
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"detail": "Expected a non-empty list of items."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > self.bulk_max_items:
+            return Response(
+                {"detail": f"At most {self.bulk_max_items} items can be sent at once."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if request.method == "POST":
+            return self.perform_bulk_create(items)
+        if request.method == "PATCH":
+            return self.perform_bulk_update(items)
+        return self.perform_bulk_destroy(items)
+
+    def _bulk_error_response(self, errors: Dict[int, Any]) -> Response:
+        return Response(
+            {"errors": [{"index": index, "errors": errors[index]} for index in sorted(errors)]},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    def _bulk_instances(self, items: List[Any], errors: Dict[int, Any]) -> List[Optional[Model]]:
+        """Instances for items identified by ``id`` (or given as bare ids), in one query"""
+        model = self.get_queryset().model  # type: ignore[attr-defined]
+        keys = [
+            normalize_pk(model, item.get("id") if isinstance(item, dict) else item)
+            for item in items
+        ]
+        queryset = self.get_queryset()  # type: ignore[attr-defined]
+        found = queryset.in_bulk({key for key in keys if key is not None})
+        instances = []
+        for index, key in enumerate(keys):
+            instance = found.get(key)
+            if instance is None:
+                errors[index] = {"id": ["Not found."]}
+            else:
+                self.check_object_permissions(self.request, instance)  # type: ignore[attr-defined]
+            instances.append(instance)
+        return instances
+
+    def _validate_bulk(
+        self,
+        serializer_class: Type[serializers.BaseSerializer],
+        items: List[Any],
+        errors: Dict[int, Any],
+        instances: Optional[List[Optional[Model]]] = None,
+    ) -> List[Optional[Dict[str, Any]]]:
+        context = self.get_serializer_context()  # type: ignore[attr-defined]
+        serializer = serializer_class(context=context, partial=instances is not None)
+        context["resolved_objects"] = resolve_related_objects(serializer, items)
+
+        # Unique fields are checked below for the whole payload at once
+        unique_fields = []
+        for name, field in serializer.fields.items():
+            validators = [v for v in field.validators if isinstance(v, UniqueValidator)]
+            if validators:
+                field.validators = [v for v in field.validators if v not in validators]
+                unique_fields.append((name, field.source, validators[0]))
+
+        validated: List[Optional[Dict[str, Any]]] = []
+        for index, item in enumerate(items):
+            if index in errors:
+                validated.append(None)
+                continue
+            serializer.instance = instances[index] if instances is not None else None
+            try:
+                validated.append(serializer.run_validation(item))
+            except serializers.ValidationError as exc:
+                errors[index] = exc.detail
+                validated.append(None)
+
+        for name, source, validator in unique_fields:
+            values = {
+                attrs[source]: None
+                for attrs in validated
+                if attrs and attrs.get(source) is not None
+            }
+            existing = dict(
+                validator.queryset.filter(**{f"{source}__in": list(values)}).values_list(
+                    source, "pk"
+                )
+            )
+            for index, attrs in enumerate(validated):
+                if not attrs or attrs.get(source) is None:
+                    continue
+                value = attrs[source]
+                own_pk = instances[index].pk if instances is not None else None
+                owner = existing.get(value, own_pk)
+                if owner != own_pk or values[value] is not None:
+                    errors.setdefault(index, {})[name] = [str(validator.message)]
+                values[value] = index
+        return validated
+
+    def _bulk_response(self, pks: List[Any], status_code: int) -> Response:
+        rendered = self.get_queryset().in_bulk(pks)  # type: ignore[attr-defined]
+        serializer = self.get_serializer(  # type: ignore[attr-defined]
+            [rendered[pk] for pk in pks], many=True
+        )
+        return Response(serializer.data, status=status_code)
+
+    def perform_bulk_create(self, items: List[Any]) -> Response:
+        errors: Dict[int, Any] = {}
+        validated = self._validate_bulk(self.bulk_create_serializer_class, items, errors)
+        if errors:
+            return self._bulk_error_response(errors)
+
+        model = self.get_queryset().model  # type: ignore[attr-defined]
+        instances = [model(**attrs) for attrs in validated]
+        with transaction.atomic():
+            self.before_bulk_create(instances)
+            model.objects.bulk_create(instances)
+            bulk_created.send(sender=model, instances=instances)
+            self.after_bulk_create(instances)
+        return self._bulk_response(
+            [instance.pk for instance in instances], status.HTTP_201_CREATED
+        )
+
+    def before_bulk_create(self, instances: List[Model]) -> None:
+        """Hook for checks that need the transaction of the bulk create, e.g. row locks"""
+
+    def after_bulk_create(self, instances: List[Model]) -> None:
+        """Hook for extra writes on bulk-created objects, inside the same transaction"""
+
+    def perform_bulk_update(self, items: List[Any]) -> Response:
+        errors: Dict[int, Any] = {}
+        instances = self._bulk_instances(items, errors)
+        payloads = [
+            (
+                {key: value for key, value in item.items() if key != "id"}
+                if isinstance(item, dict)
+                else item
+            )
+            for item in items
+        ]
+        validated = self._validate_bulk(
+            self.bulk_update_serializer_class, payloads, errors, instances
+        )
+        if errors:
+            return self._bulk_error_response(errors)
+
+        model = self.get_queryset().model  # type: ignore[attr-defined]
+        fields = {"updated_at"}
+        now = timezone.now()
+        previous = {}
+        for instance, attrs in zip(instances, validated):
+            previous[instance.pk] = stored_values(instance, attrs)
+            for key, value in attrs.items():
+                setattr(instance, key, value)
+            instance.updated_at = now
+            fields.update(attrs)
+        with transaction.atomic():
+            model.objects.bulk_update(instances, sorted(fields))
+            bulk_updated.send(
+                sender=model, instances=instances, fields=sorted(fields), previous=previous
+            )
+        return self._bulk_response([instance.pk for instance in instances], status.HTTP_200_OK)
+
+    def perform_bulk_destroy(self, items: List[Any]) -> Response:
+        errors: Dict[int, Any] = {}
+        instances = self._bulk_instances(items, errors)
+        if errors:
+            return self._bulk_error_response(errors)
+
+        model = self.get_queryset().model  # type: ignore[attr-defined]
+        pks = [instance.pk for instance in instances]
+        with transaction.atomic():
+            model.objects.filter(pk__in=pks).delete()
+        return Response({"deleted": [str(pk) for pk in pks]})
+
+
+class VariableUpsertMixin:
+    """
+    ViewSet mixin adding ``POST <object>/upsert_variables``, which writes a dict of
+    ``key -> {"value": ..., "value_type": ...}`` onto the object's variables in one
+    statement, optionally replacing (``"replace": true``) all of them.
+    """
+
+    variable_model: Type[Model]
+    variable_owner_field: str
+
+    @action(detail=True, methods=["post"])
+    def upsert_variables(self, request: Any, pk: Any = None) -> Response:
+        owner = self.get_object()  # type: ignore[attr-defined]
+        context = {
+            **self.get_serializer_context(),  # type: ignore[attr-defined]
+            "model": self.variable_model,
+            "owner_field": self.variable_owner_field,
+            "owner": owner,
+        }
+        serializer = VariableUpsertSerializer(data=request.data, context=context)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save())
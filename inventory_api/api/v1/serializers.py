@@ -1,10 +1,19 @@
-from datetime import datetime  # noqa: F401
+from datetime import datetime, timedelta  # noqa: F401
+from typing import Any, Dict, List, Optional
 from uuid import UUID  # noqa: F401
 
 from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from .. import models
+from ..hierarchy_import import IMPORT_CHUNK_SIZE, IMPORT_SPECS, ROW_READERS
+from ..models.baremetal import AVAILABLE_CAPACITY_FIELDS, TOTAL_CAPACITY_FIELDS
+from ..placement import place_batch, specification_requirements
+from ..signals import HOST_MODELS, bulk_created, quota_usage_deltas
+from ..utilization import pick_resolution
 
 
 class CustomUserSerializer(serializers.ModelSerializer):
@@ -21,6 +30,33 @@ class UserProfileSerializer(serializers.ModelSerializer):
         fields = ["id", "username", "email", "account", "status"]
 
 
+class PreResolvedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field that reads objects pre-fetched into ``context["resolved_objects"]``
+    (one query per relation for a whole bulk payload) instead of querying per value
+    """
+
+    def to_internal_value(self, data):
+        resolved = self.context.get("resolved_objects", {}).get(self.field_name)
+        if resolved is None or self.pk_field is not None:
+            return super().to_internal_value(data)
+        key = normalize_pk(self.get_queryset().model, data)
+        if key is None:
+            # Let the base class report the invalid value
+            return super().to_internal_value(data)
+        if key not in resolved:
+            self.fail("does_not_exist", pk_value=data)
+        return resolved[key]
+
+
+def normalize_pk(model, value) -> Any:
+    """``value`` converted to ``model``'s primary key type, or None when invalid"""
+    try:
+        return model._meta.pk.to_python(value)
+    except (DjangoValidationError, TypeError, ValueError):
+        return None
+
+
 # ------------------------------------------------------------------------------
 # Infrastructure Serializers
 # ------------------------------------------------------------------------------
@@ -125,6 +161,8 @@ class RackSerializer(serializers.ModelSerializer):
 
 
 class RackCreateSerializer(serializers.ModelSerializer):
+    serializer_related_field = PreResolvedPrimaryKeyRelatedField
+
     class Meta:
         model = models.Rack
         fields = [
@@ -142,9 +180,13 @@ class RackCreateSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        # Maintained from the baremetals holding units of the rack
+        read_only_fields = ["used_units", "available_units"]
 
 
 class RackUpdateSerializer(serializers.ModelSerializer):
+    serializer_related_field = PreResolvedPrimaryKeyRelatedField
+
     class Meta:
         model = models.Rack
         fields = [
@@ -162,6 +204,8 @@ class RackUpdateSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        # Maintained from the baremetals holding units of the rack
+        read_only_fields = ["used_units", "available_units"]
 
 
 class UnitSerializer(serializers.ModelSerializer):
@@ -184,6 +228,27 @@ class UnitUpdateSerializer(serializers.ModelSerializer):
         fields = ["id", "name", "unit_number", "rack", "created_at", "updated_at"]
 
 
+class HierarchyImportSerializer(serializers.Serializer):
+    """A CSV/NDJSON dump of Fab/Phase/DataCenter/Room/Rack/Baremetal rows"""
+
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=list(ROW_READERS), required=False)
+    type = serializers.ChoiceField(choices=list(IMPORT_SPECS), required=False)
+    chunk_size = serializers.IntegerField(
+        min_value=1, max_value=IMPORT_CHUNK_SIZE * 10, default=IMPORT_CHUNK_SIZE
+    )
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        if "format" not in attrs:
+            extension = attrs["file"].name.rsplit(".", 1)[-1].lower()
+            attrs["format"] = {"jsonl": "ndjson"}.get(extension, extension)
+            if attrs["format"] not in ROW_READERS:
+                raise serializers.ValidationError(
+                    {"format": "Cannot infer the format from the file name."}
+                )
+        return attrs
+
+
 # ------------------------------------------------------------------------------
 # Network Serializers
 # ------------------------------------------------------------------------------
@@ -306,6 +371,22 @@ class BaremetalGroupCreateSerializer(serializers.ModelSerializer):
             "available_gpu",
             "status",
         ]
+        # Derived from the group's baremetals and the VMs placed on them
+        read_only_fields = [
+            "total_cpu",
+            "total_memory",
+            "total_storage",
+            "total_gpu",
+            "available_cpu",
+            "available_memory",
+            "available_storage",
+            "available_gpu",
+        ]
+
+    def create(self, validated_data: Dict[str, Any]) -> models.BaremetalGroup:
+        # A new group has no baremetals yet
+        counters = TOTAL_CAPACITY_FIELDS + AVAILABLE_CAPACITY_FIELDS
+        return super().create({**validated_data, **dict.fromkeys(counters, 0)})
 
 
 class BaremetalGroupUpdateSerializer(serializers.ModelSerializer):
@@ -324,6 +405,17 @@ class BaremetalGroupUpdateSerializer(serializers.ModelSerializer):
             "available_gpu",
             "status",
         ]
+        # Derived from the group's baremetals and the VMs placed on them
+        read_only_fields = [
+            "total_cpu",
+            "total_memory",
+            "total_storage",
+            "total_gpu",
+            "available_cpu",
+            "available_memory",
+            "available_storage",
+            "available_gpu",
+        ]
 
 
 # ------------------------------------------------------------------------------
@@ -383,6 +475,7 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        select_related_fields = ["supplier"]
 
     def get_supplier(self, obj):
         """Get supplier details if exists"""
@@ -522,6 +615,8 @@ class BaremetalSerializer(serializers.ModelSerializer):
 
 
 class BaremetalCreateSerializer(serializers.ModelSerializer):
+    serializer_related_field = PreResolvedPrimaryKeyRelatedField
+
     class Meta:
         model = models.Baremetal
         fields = [
@@ -545,9 +640,18 @@ class BaremetalCreateSerializer(serializers.ModelSerializer):
             "po",
             "external_system_id",
         ]
+        # Start at the model's totals, then follow the VMs placed on the host
+        read_only_fields = [
+            "available_cpu",
+            "available_memory",
+            "available_storage",
+            "available_gpu",
+        ]
 
 
 class BaremetalUpdateSerializer(serializers.ModelSerializer):
+    serializer_related_field = PreResolvedPrimaryKeyRelatedField
+
     class Meta:
         model = models.Baremetal
         fields = [
@@ -571,6 +675,13 @@ class BaremetalUpdateSerializer(serializers.ModelSerializer):
             "po",
             "external_system_id",
         ]
+        # Maintained from the VMs placed on the host
+        read_only_fields = [
+            "available_cpu",
+            "available_memory",
+            "available_storage",
+            "available_gpu",
+        ]
 
 
 # Baremetal Group Tenant Quota Serializers
@@ -585,6 +696,10 @@ class BaremetalGroupTenantQuotaSerializer(serializers.ModelSerializer):
             "memory_quota",
             "storage_quota",
             "gpu_quota",
+            "used_cpu",
+            "used_memory",
+            "used_storage",
+            "used_gpu",
             "created_at",
             "updated_at",
         ]
@@ -726,6 +841,114 @@ class K8sClusterUpdateSerializer(serializers.ModelSerializer):
         ]
 
 
+class PlacementRequestSerializer(serializers.Serializer):
+    """A VM to place on the cluster's candidate baremetals"""
+
+    specification = serializers.PrimaryKeyRelatedField(
+        queryset=models.VirtualMachineSpecification.objects.all()
+    )
+    gpu = serializers.IntegerField(min_value=0, default=0, help_text="GPUs the VM needs")
+    group = serializers.PrimaryKeyRelatedField(
+        queryset=models.BaremetalGroup.objects.all(),
+        required=False,
+        help_text="Only consider baremetals of this group",
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=5)
+
+
+class BatchPlacementItemSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=255)
+    specification = serializers.UUIDField()
+    type = serializers.ChoiceField(
+        choices=models.VirtualMachine._meta.get_field("type").choices, default="other"
+    )
+    gpu = serializers.IntegerField(min_value=0, default=0, help_text="GPUs the VM needs")
+
+
+class BatchPlacementSerializer(serializers.Serializer):
+    """
+    Place and create a batch of VMs of one cluster (``context["cluster"]``) at once.
+
+    The candidate baremetals are locked with ``SELECT ... FOR UPDATE SKIP LOCKED``,
+    so concurrent batches work on disjoint hosts instead of overcommitting the same
+    ones; the batch is solved in memory, then every VM is inserted with one bulk
+    statement and the hosts' available_* (GPUs included, as each VM keeps its
+    ``gpu``) are decremented in the same transaction.
+    Nothing is written unless every VM fits, within the tenant's quotas.
+    """
+
+    vms = serializers.ListField(
+        child=BatchPlacementItemSerializer(), allow_empty=False, max_length=1000
+    )
+    group = serializers.PrimaryKeyRelatedField(
+        queryset=models.BaremetalGroup.objects.all(),
+        required=False,
+        help_text="Only consider baremetals of this group",
+    )
+    status = serializers.CharField(max_length=50, default="provisioning")
+
+    def validate_vms(self, vms: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        specifications = models.VirtualMachineSpecification.objects.in_bulk(
+            {item["specification"] for item in vms}
+        )
+        errors = {
+            index: {"specification": ["Specification does not exist."]}
+            for index, item in enumerate(vms)
+            if item["specification"] not in specifications
+        }
+        if errors:
+            raise serializers.ValidationError(errors)
+        return [{**item, "specification": specifications[item["specification"]]} for item in vms]
+
+    def create(self, validated_data: Dict[str, Any]) -> Dict[str, Any]:
+        cluster = self.context["cluster"]
+        items = validated_data["vms"]
+        candidates = models.Baremetal.objects.filter(status="active")
+        if "group" in validated_data:
+            candidates = candidates.filter(group=validated_data["group"])
+
+        with transaction.atomic():
+            engine, chosen = place_batch(
+                cluster,
+                [
+                    (specification_requirements(item["specification"]), item["gpu"])
+                    for item in items
+                ],
+                candidates.select_for_update(skip_locked=True, of=("self",)),
+            )
+            unplaced = {
+                index: ["No candidate baremetal has room for this VM."]
+                for index, candidate in enumerate(chosen)
+                if candidate is None
+            }
+            if unplaced:
+                raise serializers.ValidationError({"vms": unplaced})
+            vms = [
+                models.VirtualMachine(
+                    name=item["name"],
+                    tenant_id=cluster.tenant_id,
+                    baremetal_id=engine.ids[candidate],
+                    specification=item["specification"],
+                    k8s_cluster=cluster,
+                    type=item["type"],
+                    status=validated_data["status"],
+                    gpu=item["gpu"],
+                )
+                for item, candidate in zip(items, chosen)
+            ]
+            VirtualMachineCreateSerializer.check_quotas(vms)
+            models.VirtualMachine.objects.bulk_create(vms)
+            bulk_created.send(sender=models.VirtualMachine, instances=vms)
+
+        return {
+            "scheduling_mode": engine.mode,
+            "placements": [
+                {"id": vm.id, "vm": vm.name, "type": vm.type, **engine.describe(candidate)}
+                for vm, candidate in zip(vms, chosen)
+            ],
+        }
+
+
 # K8s Cluster Plugin Serializers
 class K8sClusterPluginSerializer(serializers.ModelSerializer):
     class Meta:
@@ -844,12 +1067,15 @@ class VirtualMachineSerializer(serializers.ModelSerializer):
             "k8s_cluster",
             "type",
             "status",
+            "gpu",
             "created_at",
             "updated_at",
         ]
 
 
 class VirtualMachineCreateSerializer(serializers.ModelSerializer):
+    serializer_related_field = PreResolvedPrimaryKeyRelatedField
+
     class Meta:
         model = models.VirtualMachine
         fields = [
@@ -861,10 +1087,31 @@ class VirtualMachineCreateSerializer(serializers.ModelSerializer):
             "k8s_cluster",
             "type",
             "status",
+            "gpu",
         ]
 
+    @staticmethod
+    def check_quotas(vms: List[models.VirtualMachine]) -> None:
+        """
+        Reject new ``vms`` that would take their tenants over a BaremetalGroupTenantQuota.
+        The quotas stay locked until the end of the transaction, which must be the
+        one creating the VMs (the usage counters are raised by their signals).
+        """
+        errors = models.BaremetalGroupTenantQuota.violations(
+            quota_usage_deltas([], [vm.serializable_value for vm in vms])
+        )
+        if errors:
+            raise serializers.ValidationError({"quota": errors})
+
+    def create(self, validated_data: Dict[str, Any]) -> models.VirtualMachine:
+        with transaction.atomic():
+            self.check_quotas([models.VirtualMachine(**validated_data)])
+            return super().create(validated_data)
+
 
 class VirtualMachineUpdateSerializer(serializers.ModelSerializer):
+    serializer_related_field = PreResolvedPrimaryKeyRelatedField
+
     class Meta:
         model = models.VirtualMachine
         fields = [
@@ -875,9 +1122,39 @@ class VirtualMachineUpdateSerializer(serializers.ModelSerializer):
             "k8s_cluster",
             "type",
             "status",
+            "gpu",
         ]
 
 
+# ------------------------------------------------------------------------------
+# Utilization Serializers
+# ------------------------------------------------------------------------------
+class UtilizationQuerySerializer(serializers.Serializer):
+    """A time range of utilization snapshots of one scope"""
+
+    scope = serializers.ChoiceField(
+        choices=models.UtilizationSnapshot._meta.get_field("scope").choices
+    )
+    object_id = serializers.UUIDField(required=False, help_text="Only this group/rack/tenant")
+    start = serializers.DateTimeField(required=False, help_text="Defaults to 7 days ago")
+    end = serializers.DateTimeField(required=False, help_text="Defaults to now")
+    resolution = serializers.ChoiceField(
+        choices=["auto", *dict(models.UtilizationSnapshot._meta.get_field("resolution").choices)],
+        default="auto",
+        help_text="auto picks the finest resolution still kept at start",
+    )
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        now = timezone.now()
+        attrs.setdefault("end", now)
+        attrs.setdefault("start", attrs["end"] - timedelta(days=7))
+        if attrs["start"] >= attrs["end"]:
+            raise serializers.ValidationError({"start": ["Must be before end."]})
+        if attrs["resolution"] == "auto":
+            attrs["resolution"] = pick_resolution(attrs["start"], now)
+        return attrs
+
+
 # ------------------------------------------------------------------------------
 # Permission Serializers
 # ------------------------------------------------------------------------------
@@ -917,14 +1194,18 @@ class AnsibleInventorySerializer(serializers.ModelSerializer):
             "updated_at",
         ]
 
+    # Counts are annotated by AnsibleInventoryViewSet; nested usages fall back to COUNT
     def get_groups_count(self, obj) -> int:
-        return obj.groups.count()
+        count = getattr(obj, "groups_count", None)
+        return count if count is not None else obj.groups.count()
 
     def get_hosts_count(self, obj) -> int:
-        return obj.hosts.count()
+        count = getattr(obj, "hosts_count", None)
+        return count if count is not None else obj.hosts.count()
 
     def get_associated_variable_sets_count(self, obj) -> int:
-        return obj.associated_variable_sets.count()
+        count = getattr(obj, "associated_variable_sets_count", None)
+        return count if count is not None else obj.associated_variable_sets.count()
 
 
 class AnsibleInventoryCreateSerializer(serializers.ModelSerializer):
@@ -956,7 +1237,101 @@ class AnsibleInventoryUpdateSerializer(serializers.ModelSerializer):
         ]
 
 
-class AnsibleInventoryVariableSerializer(serializers.ModelSerializer):
+class MergedHostVariablesRequestSerializer(serializers.Serializer):
+    """Hosts to resolve: an explicit list of host IDs, or every host in the inventory"""
+
+    host_ids = serializers.ListField(child=serializers.UUIDField(), required=False)
+    all_hosts = serializers.BooleanField(default=False)
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        if attrs["all_hosts"] == ("host_ids" in attrs):
+            raise serializers.ValidationError("Provide either host_ids or all_hosts=true.")
+        return attrs
+
+
+class TypedVariableSerializer(serializers.ModelSerializer):
+    """Rejects values that cannot be decoded as their value_type"""
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        attrs = super().validate(attrs)
+        value = attrs.get("value", getattr(self.instance, "value", None))
+        value_type = attrs.get("value_type", getattr(self.instance, "value_type", "string"))
+        if value is not None:
+            try:
+                models.decode_variable_value(value, value_type)
+            except ValueError as exc:
+                raise serializers.ValidationError({"value": f"Invalid {value_type} value: {exc}"})
+        return attrs
+
+
+class VariableValueSerializer(serializers.Serializer):
+    value = serializers.JSONField()
+    value_type = serializers.ChoiceField(
+        choices=models.AbstractVariable._meta.get_field("value_type").choices, default="string"
+    )
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        value_type = attrs["value_type"]
+        value = models.encode_variable_value(attrs["value"], value_type)
+        try:
+            typed_value = models.decode_variable_value(value, value_type)
+        except ValueError as exc:
+            raise serializers.ValidationError({"value": f"Invalid {value_type} value: {exc}"})
+        return {"value": value, "value_type": value_type, "typed_value": typed_value}
+
+
+class VariableUpsertSerializer(serializers.Serializer):
+    """
+    Create or update many variables of one owner with a single INSERT ... ON CONFLICT
+    on (owner, key). With ``replace``, the owner's variables missing from the payload
+    are deleted. The context provides the variable ``model``, its ``owner_field`` and
+    the ``owner``.
+    """
+
+    variables = serializers.DictField(child=VariableValueSerializer())
+    replace = serializers.BooleanField(default=False)
+
+    def validate_variables(self, value: Dict[str, Any]) -> Dict[str, Any]:
+        max_length = self.context["model"]._meta.get_field("key").max_length
+        invalid = [key for key in value if not key or len(key) > max_length]
+        if invalid:
+            raise serializers.ValidationError(
+                f"Keys must be 1 to {max_length} characters long: {invalid}"
+            )
+        return value
+
+    def create(self, validated_data: Dict[str, Any]) -> Dict[str, Any]:
+        model = self.context["model"]
+        owner_filter = {self.context["owner_field"]: self.context["owner"]}
+        variables = [
+            model(key=key, **entry, **owner_filter)
+            for key, entry in validated_data["variables"].items()
+        ]
+        with transaction.atomic():
+            deleted = 0
+            if validated_data["replace"]:
+                deleted, _ = (
+                    model.objects.filter(**owner_filter)
+                    .exclude(key__in=validated_data["variables"].keys())
+                    .delete()
+                )
+            model.objects.bulk_create(
+                variables,
+                update_conflicts=True,
+                unique_fields=[self.context["owner_field"], "key"],
+                update_fields=["value", "value_type", "typed_value", "updated_at"],
+            )
+            bulk_created.send(sender=model, instances=variables)
+        return {
+            "upserted": len(variables),
+            "deleted": deleted,
+            "variables": dict(
+                model.objects.filter(**owner_filter).values_list("key", "typed_value")
+            ),
+        }
+
+
+class AnsibleInventoryVariableSerializer(TypedVariableSerializer):
     inventory = AnsibleInventorySerializer(read_only=True)
 
     class Meta:
@@ -972,13 +1347,13 @@ class AnsibleInventoryVariableSerializer(serializers.ModelSerializer):
         ]
 
 
-class AnsibleInventoryVariableCreateSerializer(serializers.ModelSerializer):
+class AnsibleInventoryVariableCreateSerializer(TypedVariableSerializer):
     class Meta:
         model = models.AnsibleInventoryVariable
         fields = ["id", "inventory", "key", "value", "value_type"]
 
 
-class AnsibleInventoryVariableUpdateSerializer(serializers.ModelSerializer):
+class AnsibleInventoryVariableUpdateSerializer(TypedVariableSerializer):
     class Meta:
         model = models.AnsibleInventoryVariable
         fields = ["key", "value", "value_type"]
@@ -1010,8 +1385,10 @@ class AnsibleVariableSetSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
 
+    # Annotated by AnsibleVariableSetViewSet; nested usages fall back to COUNT
     def get_associated_inventories_count(self, obj) -> int:
-        return obj.associated_inventories.count()
+        count = getattr(obj, "associated_inventories_count", None)
+        return count if count is not None else obj.associated_inventories.count()
 
     def get_parsed_content(self, obj) -> dict:
         return obj.get_parsed_content()
@@ -1093,7 +1470,7 @@ class AnsibleInventoryVariableSetAssociationUpdateSerializer(serializers.ModelSe
 # ------------------------------------------------------------------------------
 # Ansible Host Variable Serializers
 # ------------------------------------------------------------------------------
-class AnsibleHostVariableSerializer(serializers.ModelSerializer):
+class AnsibleHostVariableSerializer(TypedVariableSerializer):
     host: serializers.PrimaryKeyRelatedField = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
@@ -1109,13 +1486,13 @@ class AnsibleHostVariableSerializer(serializers.ModelSerializer):
         ]
 
 
-class AnsibleHostVariableCreateSerializer(serializers.ModelSerializer):
+class AnsibleHostVariableCreateSerializer(TypedVariableSerializer):
     class Meta:
         model = models.AnsibleHostVariable
         fields = ["id", "host", "key", "value", "value_type"]
 
 
-class AnsibleHostVariableUpdateSerializer(serializers.ModelSerializer):
+class AnsibleHostVariableUpdateSerializer(TypedVariableSerializer):
     class Meta:
         model = models.AnsibleHostVariable
         fields = ["key", "value", "value_type"]
@@ -1211,7 +1588,7 @@ class AnsibleInventoryTemplateUpdateSerializer(serializers.ModelSerializer):
         ]
 
 
-class AnsibleGroupVariableSerializer(serializers.ModelSerializer):
+class AnsibleGroupVariableSerializer(TypedVariableSerializer):
     class Meta:
         model = models.AnsibleGroupVariable
         fields = [
@@ -1225,18 +1602,38 @@ class AnsibleGroupVariableSerializer(serializers.ModelSerializer):
         ]
 
 
-class AnsibleGroupVariableCreateSerializer(serializers.ModelSerializer):
+class AnsibleGroupVariableCreateSerializer(TypedVariableSerializer):
     class Meta:
         model = models.AnsibleGroupVariable
         fields = ["id", "group", "key", "value", "value_type"]
 
 
-class AnsibleGroupVariableUpdateSerializer(serializers.ModelSerializer):
+class AnsibleGroupVariableUpdateSerializer(TypedVariableSerializer):
     class Meta:
         model = models.AnsibleGroupVariable
         fields = ["key", "value", "value_type"]
 
 
+def validate_group_relationship(
+    instance: Optional[models.AnsibleGroupRelationship], attrs: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Reject relationships that would make the group hierarchy cyclic"""
+    parent = attrs.get("parent_group", getattr(instance, "parent_group", None))
+    child = attrs.get("child_group", getattr(instance, "child_group", None))
+    if parent is None or child is None:
+        return attrs
+    stored = (instance.parent_group_id, instance.child_group_id) if instance else None
+    if stored == (parent.pk, child.pk):
+        return attrs
+    edge = models.AnsibleGroupRelationship(parent_group=parent, child_group=child)
+    # On update the stored edge goes away, so paths through it do not count
+    if edge.creates_cycle(stored):
+        raise serializers.ValidationError(
+            "Relationship would create a cycle in the group hierarchy"
+        )
+    return attrs
+
+
 class AnsibleGroupRelationshipSerializer(serializers.ModelSerializer):
     parent_group = serializers.PrimaryKeyRelatedField(queryset=models.AnsibleGroup.objects.all())
     child_group = serializers.PrimaryKeyRelatedField(queryset=models.AnsibleGroup.objects.all())
@@ -1245,18 +1642,27 @@ class AnsibleGroupRelationshipSerializer(serializers.ModelSerializer):
         model = models.AnsibleGroupRelationship
         fields = ["id", "parent_group", "child_group", "created_at", "updated_at"]
 
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        return validate_group_relationship(self.instance, attrs)
+
 
 class AnsibleGroupRelationshipCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.AnsibleGroupRelationship
         fields = ["id", "parent_group", "child_group"]
 
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        return validate_group_relationship(None, attrs)
+
 
 class AnsibleGroupRelationshipUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.AnsibleGroupRelationship
         fields = ["parent_group", "child_group"]
 
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        return validate_group_relationship(self.instance, attrs)
+
 
 class AnsibleGroupSerializer(serializers.ModelSerializer):
     variables = AnsibleGroupVariableSerializer(many=True, read_only=True)
@@ -1290,7 +1696,11 @@ class AnsibleGroupSerializer(serializers.ModelSerializer):
         return [{"id": str(group.id), "name": group.name} for group in obj.parent_groups]
 
     def get_all_variables(self, obj):
-        return obj.all_variables
+        # One resolver per inventory, shared by every group serialized in this response
+        resolvers = self.context.setdefault("variable_resolvers", {})
+        if obj.inventory_id not in resolvers:
+            resolvers[obj.inventory_id] = obj.inventory.variable_resolver()
+        return resolvers[obj.inventory_id].group_variables(obj.pk)
 
     def get_all_hosts(self, obj):
         hosts = obj.all_hosts
@@ -1370,6 +1780,166 @@ class AnsibleHostCreateSerializer(serializers.ModelSerializer):
         return host
 
 
+class AnsibleHostConnectionSerializer(serializers.ModelSerializer):
+    """Connection settings of a host, all optional"""
+
+    class Meta:
+        model = models.AnsibleHost
+        fields = [
+            "ansible_host",
+            "ansible_port",
+            "ansible_user",
+            "ansible_ssh_private_key_file",
+            "ansible_ssh_common_args",
+            "ansible_ssh_extra_args",
+            "ansible_ssh_pipelining",
+            "ansible_ssh_executable",
+            "ansible_python_interpreter",
+            "ansible_shell_type",
+            "status",
+            "metadata",
+        ]
+
+
+class AnsibleHostEnrollmentItemSerializer(AnsibleHostConnectionSerializer):
+    content_type = serializers.IntegerField()
+    object_id = serializers.UUIDField()
+    groups = serializers.ListField(child=serializers.UUIDField(), required=False)
+
+    class Meta(AnsibleHostConnectionSerializer.Meta):
+        fields = [
+            "content_type",
+            "object_id",
+            "groups",
+        ] + AnsibleHostConnectionSerializer.Meta.fields
+
+
+class AnsibleHostEnrollmentSerializer(serializers.Serializer):
+    """
+    Enroll many VMs/baremetals into one inventory. ``groups`` and ``defaults`` apply
+    to every host; each host may add groups and override connection settings.
+
+    Hosts already in the inventory are not modified but still get the requested
+    group memberships, and memberships that already exist are skipped, so repeating
+    an enrollment is harmless. Hosts and memberships are inserted with one bulk
+    statement each.
+    """
+
+    inventory = serializers.PrimaryKeyRelatedField(queryset=models.AnsibleInventory.objects.all())
+    groups = serializers.ListField(child=serializers.UUIDField(), required=False, default=list)
+    defaults = AnsibleHostConnectionSerializer(required=False, default=dict)
+    hosts = serializers.ListField(
+        child=AnsibleHostEnrollmentItemSerializer(), allow_empty=False, max_length=10000
+    )
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        inventory = attrs["inventory"]
+        hosts = attrs["hosts"]
+
+        group_ids = set(attrs["groups"]).union(*(item.get("groups", []) for item in hosts))
+        found_groups = set(
+            models.AnsibleGroup.objects.filter(pk__in=group_ids, inventory=inventory).values_list(
+                "pk", flat=True
+            )
+        )
+        missing_groups = group_ids - found_groups
+        if missing_groups:
+            raise serializers.ValidationError(
+                {"groups": [f"Groups not in this inventory: {sorted(map(str, missing_groups))}"]}
+            )
+
+        # Only VMs and baremetals can be hosts; one existence query per content type
+        host_types = {
+            content_type.id: model
+            for model, content_type in ContentType.objects.get_for_models(*HOST_MODELS).items()
+        }
+        errors: Dict[int, Any] = {}
+        object_ids: Dict[int, List[Any]] = {}
+        for index, item in enumerate(hosts):
+            if item["content_type"] not in host_types:
+                errors[index] = {"content_type": ["Unknown content type."]}
+                continue
+            object_ids.setdefault(item["content_type"], []).append(item["object_id"])
+        existing_objects = set()
+        for content_type_id, ids in object_ids.items():
+            model = host_types[content_type_id]
+            existing_objects.update(
+                (content_type_id, pk)
+                for pk in model._default_manager.filter(pk__in=ids).values_list("pk", flat=True)
+            )
+        for index, item in enumerate(hosts):
+            if (
+                index not in errors
+                and (item["content_type"], item["object_id"]) not in existing_objects
+            ):
+                errors[index] = {"object_id": ["Object does not exist."]}
+        if errors:
+            raise serializers.ValidationError({"hosts": errors})
+        return attrs
+
+    def create(self, validated_data: Dict[str, Any]) -> Dict[str, Any]:
+        inventory = validated_data["inventory"]
+        defaults = validated_data["defaults"]
+
+        # The first entry for a (content_type, object_id) pair wins
+        entries: Dict[Any, Dict[str, Any]] = {}
+        for item in validated_data["hosts"]:
+            entries.setdefault((item["content_type"], item["object_id"]), item)
+
+        def existing_hosts() -> Dict[Any, Any]:
+            return {
+                (content_type_id, object_id): pk
+                for pk, content_type_id, object_id in models.AnsibleHost.objects.filter(
+                    inventory=inventory, object_id__in={key[1] for key in entries}
+                ).values_list("pk", "content_type_id", "object_id")
+                if (content_type_id, object_id) in entries
+            }
+
+        with transaction.atomic():
+            existing = existing_hosts()
+            new_hosts = {}
+            for key, item in entries.items():
+                if key in existing:
+                    continue
+                fields = {**defaults, **item}
+                fields.pop("groups", None)
+                fields["content_type_id"] = fields.pop("content_type")
+                new_hosts[key] = models.AnsibleHost(inventory=inventory, **fields)
+            # Conflicts with concurrent enrollments are skipped, so read the ids back;
+            # a skipped host was inserted by the other enrollment under another id
+            models.AnsibleHost.objects.bulk_create(new_hosts.values(), ignore_conflicts=True)
+            host_ids = existing_hosts()
+            inserted = {key for key, host in new_hosts.items() if host_ids.get(key) == host.pk}
+            bulk_created.send(
+                sender=models.AnsibleHost, instances=[new_hosts[key] for key in inserted]
+            )
+
+            Membership = models.AnsibleHost.groups.through
+            wanted = {
+                (host_ids[key], group_id)
+                for key, item in entries.items()
+                for group_id in set(validated_data["groups"]).union(item.get("groups", []))
+            }
+            present = set(
+                Membership.objects.filter(
+                    ansiblehost_id__in=host_ids.values(),
+                    ansiblegroup_id__in={group_id for _, group_id in wanted},
+                ).values_list("ansiblehost_id", "ansiblegroup_id")
+            )
+            memberships = [
+                Membership(ansiblehost_id=host_id, ansiblegroup_id=group_id)
+                for host_id, group_id in sorted(wanted - present, key=str)
+            ]
+            Membership.objects.bulk_create(memberships, ignore_conflicts=True)
+            bulk_created.send(sender=Membership, instances=memberships)
+
+        return {
+            "created": [str(host_ids[key]) for key in entries if key in inserted],
+            "existing": [str(host_ids[key]) for key in entries if key not in inserted],
+            "memberships_added": len(memberships),
+        }
+
+
 class AnsibleHostUpdateSerializer(serializers.ModelSerializer):
     groups = serializers.PrimaryKeyRelatedField(
         queryset=models.AnsibleGroup.objects.all(), many=True, required=False
@@ -19,6 +19,8 @@ router.register(r"data-centers", views.DataCenterViewSet)
 router.register(r"rooms", views.RoomViewSet)
 router.register(r"units", views.UnitViewSet)
 router.register(r"racks", views.RackViewSet)
+router.register(r"hierarchy-import", views.HierarchyImportViewSet, basename="hierarchy-import")
+router.register(r"fleet-rollup", views.FleetRollupViewSet, basename="fleet-rollup")
 
 # Network routes
 router.register(r"vlans", views.VLANViewSet)
@@ -47,6 +49,7 @@ router.register(r"bastion-cluster-associations", views.BastionClusterAssociation
 router.register(r"k8s-cluster-service-meshes", views.K8sClusterToServiceMeshViewSet)
 router.register(r"service-meshes", views.ServiceMeshViewSet)
 router.register(r"virtual-machines", views.VirtualMachineViewSet)
+router.register(r"utilization", views.UtilizationViewSet, basename="utilization")
 
 # Ansible Inventory routes
 router.register(r"ansible-inventories", views.AnsibleInventoryViewSet)
@@ -1,28 +1,60 @@
+import hashlib
 import os
 import time
-from typing import Type
+from typing import Any, Callable, List, Type
 
 import psutil
 from django.conf import settings
 from django.core.cache import cache
 from django.db import connection
+from django.db.models import Count, Model, OuterRef, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+from django.http.response import HttpResponseBase
 from django.shortcuts import get_object_or_404
-from rest_framework import viewsets
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.serializers import BaseSerializer
 
 from .. import models
+from ..fleet_rollup import fleet_rollup
+from ..hierarchy_import import ROW_READERS, HierarchyImporter, open_text
+from ..inventory_export import CompiledInventory, iter_inventory_records
+from ..models.utilization import UTILIZATION_METRICS
 from ..permissions import HasPermissionForObject
+from ..placement import PlacementEngine, specification_requirements
+from ..renderers import AnsibleINIRenderer, NDJSONRenderer, YAMLRenderer
+from ..streaming import streaming_export_response
 from . import serializers
+from .mixins import (
+    BulkWriteMixin,
+    DynamicFieldsMixin,
+    EagerLoadingMixin,
+    StreamingExportMixin,
+    VariableUpsertMixin,
+)
 from .serializers import CustomUserSerializer
 
 
+def count_subquery(model: Type[Model], field: str) -> Coalesce:
+    """Correlated COUNT of ``model`` rows whose ``field`` points at the outer row"""
+    counts = (
+        model.objects.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
 # ------------------------------------------------------------------------------
 # User ViewSets
 # ------------------------------------------------------------------------------
-class CustomUserViewSet(viewsets.ModelViewSet):
+class CustomUserViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.CustomUser.objects.all().order_by("id")
     serializer_class = CustomUserSerializer
 
@@ -30,7 +62,7 @@ class CustomUserViewSet(viewsets.ModelViewSet):
 # ------------------------------------------------------------------------------
 # Infrastructure ViewSets
 # ------------------------------------------------------------------------------
-class FabViewSet(viewsets.ModelViewSet):
+class FabViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.Fab.objects.all().order_by("id")
     serializer_class = serializers.FabSerializer
 
@@ -42,7 +74,7 @@ class FabViewSet(viewsets.ModelViewSet):
         return serializers.FabSerializer
 
 
-class PhaseViewSet(viewsets.ModelViewSet):
+class PhaseViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.Phase.objects.all().order_by("id")
     serializer_class = serializers.PhaseSerializer
 
@@ -54,7 +86,7 @@ class PhaseViewSet(viewsets.ModelViewSet):
         return serializers.PhaseSerializer
 
 
-class DataCenterViewSet(viewsets.ModelViewSet):
+class DataCenterViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.DataCenter.objects.all().order_by("id")
     serializer_class = serializers.DataCenterSerializer
 
@@ -66,7 +98,7 @@ class DataCenterViewSet(viewsets.ModelViewSet):
         return serializers.DataCenterSerializer
 
 
-class RoomViewSet(viewsets.ModelViewSet):
+class RoomViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.Room.objects.all().order_by("id")
     serializer_class = serializers.RoomSerializer
 
@@ -78,9 +110,11 @@ class RoomViewSet(viewsets.ModelViewSet):
         return serializers.RoomSerializer
 
 
-class RackViewSet(viewsets.ModelViewSet):
+class RackViewSet(BulkWriteMixin, DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.Rack.objects.all().order_by("id")
     serializer_class = serializers.RackSerializer
+    bulk_create_serializer_class = serializers.RackCreateSerializer
+    bulk_update_serializer_class = serializers.RackUpdateSerializer
 
     def get_serializer_class(self) -> Type[BaseSerializer]:
         if self.action == "create":
@@ -89,8 +123,19 @@ class RackViewSet(viewsets.ModelViewSet):
             return serializers.RackUpdateSerializer
         return serializers.RackSerializer
 
+    def after_bulk_create(self, instances: List[Model]) -> None:
+        # Racks imported in bulk come with all their units
+        models.provision_rack_units(instances)
+
+    @action(detail=True, methods=["post"])
+    def provision(self, request, pk=None) -> Response:
+        """Create the rack's missing U1..U<height_units> units and reset its unit counters"""
+        rack = self.get_object()
+        units_created = rack.provision_units()
+        return Response({"units_created": units_created, "rack": self.get_serializer(rack).data})
+
 
-class UnitViewSet(viewsets.ModelViewSet):
+class UnitViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.Unit.objects.all().order_by("id")
     serializer_class = serializers.UnitSerializer
 
@@ -102,25 +147,56 @@ class UnitViewSet(viewsets.ModelViewSet):
         return serializers.UnitSerializer
 
 
+class HierarchyImportViewSet(viewsets.ViewSet):
+    """
+    Bulk upsert of the physical hierarchy from a CSV/NDJSON upload, keyed on
+    external_system_id. See ``HierarchyImporter`` for the row format.
+    """
+
+    permission_classes = [HasPermissionForObject]
+
+    def create(self, request) -> Response:
+        serializer = serializers.HierarchyImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        importer = HierarchyImporter(row_type=data.get("type"), chunk_size=data["chunk_size"])
+        rows = ROW_READERS[data["format"]](open_text(data["file"].file))
+        return Response(importer.run(rows))
+
+
+class FleetRollupViewSet(viewsets.ViewSet):
+    """
+    Baremetal counts by status and summed available_* at every level of the
+    Fab -> Phase -> DataCenter -> Room -> Rack hierarchy, from a single query.
+    """
+
+    permission_classes = [HasPermissionForObject]
+
+    def list(self, request) -> Response:
+        return Response(fleet_rollup())
+
+
 # ------------------------------------------------------------------------------
 # Network ViewSets
 # ------------------------------------------------------------------------------
-class VLANViewSet(viewsets.ModelViewSet):
+class VLANViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.VLAN.objects.all().order_by("id")
     serializer_class = serializers.VLANSerializer
 
 
-class VRFViewSet(viewsets.ModelViewSet):
+class VRFViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.VRF.objects.all().order_by("id")
     serializer_class = serializers.VRFSerializer
 
 
-class BGPConfigViewSet(viewsets.ModelViewSet):
+class BGPConfigViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.BGPConfig.objects.all().order_by("id")
     serializer_class = serializers.BGPConfigSerializer
 
 
-class NetworkInterfaceViewSet(viewsets.ModelViewSet):
+class NetworkInterfaceViewSet(
+    StreamingExportMixin, DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet
+):
     queryset = models.NetworkInterface.objects.all().order_by("id")
     serializer_class = serializers.NetworkInterfaceSerializer
 
@@ -128,12 +204,12 @@ class NetworkInterfaceViewSet(viewsets.ModelViewSet):
 # ------------------------------------------------------------------------------
 # Purchase ViewSets
 # ------------------------------------------------------------------------------
-class PurchaseRequisitionViewSet(viewsets.ModelViewSet):
+class PurchaseRequisitionViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.PurchaseRequisition.objects.all().order_by("id")
     serializer_class = serializers.PurchaseRequisitionSerializer
 
 
-class PurchaseOrderViewSet(viewsets.ModelViewSet):
+class PurchaseOrderViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.PurchaseOrder.objects.all().order_by("id")
     serializer_class = serializers.PurchaseOrderSerializer
 
@@ -148,17 +224,17 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
 # ------------------------------------------------------------------------------
 # Baremetal ViewSets
 # ------------------------------------------------------------------------------
-class ManufacturerViewSet(viewsets.ModelViewSet):
+class ManufacturerViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.Manufacturer.objects.all().order_by("id")
     serializer_class = serializers.ManufacturerSerializer
 
 
-class SupplierViewSet(viewsets.ModelViewSet):
+class SupplierViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.Supplier.objects.all().order_by("id")
     serializer_class = serializers.SupplierSerializer
 
 
-class BaremetalModelViewSet(viewsets.ModelViewSet):
+class BaremetalModelViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.BaremetalModel.objects.all().order_by("id")
     serializer_class = serializers.BaremetalModelSerializer
 
@@ -176,7 +252,7 @@ class BaremetalModelViewSet(viewsets.ModelViewSet):
 
 
 # Baremetal Group ViewSet
-class BaremetalGroupViewSet(viewsets.ModelViewSet):
+class BaremetalGroupViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.BaremetalGroup.objects.all().order_by("id")
     serializer_class = serializers.BaremetalGroupSerializer
 
@@ -189,9 +265,17 @@ class BaremetalGroupViewSet(viewsets.ModelViewSet):
 
 
 # Baremetal ViewSet
-class BaremetalViewSet(viewsets.ModelViewSet):
+class BaremetalViewSet(
+    BulkWriteMixin,
+    StreamingExportMixin,
+    DynamicFieldsMixin,
+    EagerLoadingMixin,
+    viewsets.ModelViewSet,
+):
     queryset = models.Baremetal.objects.all().order_by("id")
     serializer_class = serializers.BaremetalSerializer
+    bulk_create_serializer_class = serializers.BaremetalCreateSerializer
+    bulk_update_serializer_class = serializers.BaremetalUpdateSerializer
 
     def get_serializer_class(self) -> Type[BaseSerializer]:
         if self.action == "create":
@@ -200,9 +284,15 @@ class BaremetalViewSet(viewsets.ModelViewSet):
             return serializers.BaremetalUpdateSerializer
         return serializers.BaremetalSerializer
 
+    def before_bulk_create(self, instances: List[Model]) -> None:
+        # bulk_create() bypasses Baremetal.save(), which derives them one by one
+        models.Baremetal.derive_initial_capacity(instances)
+
 
 # Baremetal Group Tenant Quota ViewSet
-class BaremetalGroupTenantQuotaViewSet(viewsets.ModelViewSet):
+class BaremetalGroupTenantQuotaViewSet(
+    DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet
+):
     queryset = models.BaremetalGroupTenantQuota.objects.all().order_by("id")
     serializer_class = serializers.BaremetalGroupTenantQuotaSerializer
 
@@ -215,7 +305,7 @@ class BaremetalGroupTenantQuotaViewSet(viewsets.ModelViewSet):
 
 
 # Tenant ViewSet
-class TenantViewSet(viewsets.ModelViewSet):
+class TenantViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.Tenant.objects.all().order_by("id")
     serializer_class = serializers.TenantSerializer
 
@@ -228,7 +318,9 @@ class TenantViewSet(viewsets.ModelViewSet):
 
 
 # Virtual Machine Specification ViewSet
-class VirtualMachineSpecificationViewSet(viewsets.ModelViewSet):
+class VirtualMachineSpecificationViewSet(
+    DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet
+):
     queryset = models.VirtualMachineSpecification.objects.all().order_by("id")
     serializer_class = serializers.VirtualMachineSpecificationSerializer
 
@@ -241,7 +333,7 @@ class VirtualMachineSpecificationViewSet(viewsets.ModelViewSet):
 
 
 # K8s Cluster ViewSet
-class K8sClusterViewSet(viewsets.ModelViewSet):
+class K8sClusterViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.K8sCluster.objects.all().order_by("id")
     serializer_class = serializers.K8sClusterSerializer
 
@@ -252,9 +344,40 @@ class K8sClusterViewSet(viewsets.ModelViewSet):
             return serializers.K8sClusterUpdateSerializer
         return serializers.K8sClusterSerializer
 
+    @action(detail=True, methods=["post"])
+    def placement(self, request, pk=None) -> Response:
+        """Rank baremetals for a VM of this cluster according to its scheduling_mode"""
+        cluster = self.get_object()
+        serializer = serializers.PlacementRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        requirements = specification_requirements(data["specification"])
+        candidates = models.Baremetal.objects.filter(status="active")
+        if "group" in data:
+            candidates = candidates.filter(group=data["group"])
+        engine = PlacementEngine(cluster, requirements, data["gpu"], candidates)
+        ranked = engine.rank(requirements, data["gpu"], data["limit"])
+        return Response(
+            {
+                "scheduling_mode": engine.mode,
+                "candidates": len(engine),
+                "placements": [engine.describe(index, score) for index, score in ranked],
+            }
+        )
+
+    @action(detail=True, methods=["post"])
+    def place_batch(self, request, pk=None) -> Response:
+        """Place and create many VMs of this cluster together, all or nothing"""
+        serializer = serializers.BatchPlacementSerializer(
+            data=request.data,
+            context={**self.get_serializer_context(), "cluster": self.get_object()},
+        )
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save(), status=status.HTTP_201_CREATED)
+
 
 # K8s Cluster Plugin ViewSet
-class K8sClusterPluginViewSet(viewsets.ModelViewSet):
+class K8sClusterPluginViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.K8sClusterPlugin.objects.all().order_by("id")
     serializer_class = serializers.K8sClusterPluginSerializer
 
@@ -267,7 +390,9 @@ class K8sClusterPluginViewSet(viewsets.ModelViewSet):
 
 
 # Bastion Cluster Association ViewSet
-class BastionClusterAssociationViewSet(viewsets.ModelViewSet):
+class BastionClusterAssociationViewSet(
+    DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet
+):
     queryset = models.BastionClusterAssociation.objects.all().order_by("id")
     serializer_class = serializers.BastionClusterAssociationSerializer
 
@@ -280,7 +405,7 @@ class BastionClusterAssociationViewSet(viewsets.ModelViewSet):
 
 
 # K8s Cluster To Service Mesh ViewSet
-class K8sClusterToServiceMeshViewSet(viewsets.ModelViewSet):
+class K8sClusterToServiceMeshViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.K8sClusterToServiceMesh.objects.all().order_by("id")
     serializer_class = serializers.K8sClusterToServiceMeshSerializer
 
@@ -293,7 +418,7 @@ class K8sClusterToServiceMeshViewSet(viewsets.ModelViewSet):
 
 
 # Service Mesh ViewSet
-class ServiceMeshViewSet(viewsets.ModelViewSet):
+class ServiceMeshViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.ServiceMesh.objects.all().order_by("id")
     serializer_class = serializers.ServiceMeshSerializer
 
@@ -306,9 +431,17 @@ class ServiceMeshViewSet(viewsets.ModelViewSet):
 
 
 # Virtual Machine ViewSet
-class VirtualMachineViewSet(viewsets.ModelViewSet):
+class VirtualMachineViewSet(
+    BulkWriteMixin,
+    StreamingExportMixin,
+    DynamicFieldsMixin,
+    EagerLoadingMixin,
+    viewsets.ModelViewSet,
+):
     queryset = models.VirtualMachine.objects.all().order_by("id")
     serializer_class = serializers.VirtualMachineSerializer
+    bulk_create_serializer_class = serializers.VirtualMachineCreateSerializer
+    bulk_update_serializer_class = serializers.VirtualMachineUpdateSerializer
 
     def get_serializer_class(self) -> Type[BaseSerializer]:
         if self.action == "create":
@@ -317,13 +450,56 @@ class VirtualMachineViewSet(viewsets.ModelViewSet):
             return serializers.VirtualMachineUpdateSerializer
         return serializers.VirtualMachineSerializer
 
+    def before_bulk_create(self, instances: List[Model]) -> None:
+        serializers.VirtualMachineCreateSerializer.check_quotas(instances)
+
+
+class UtilizationViewSet(viewsets.ViewSet):
+    """
+    Capacity trends of baremetal groups, racks and tenants. Reads only the
+    pre-aggregated rows written by the ``snapshot_utilization`` job, never the
+    live tables, so long ranges cost one indexed range query.
+    """
+
+    permission_classes = [HasPermissionForObject]
+
+    def list(self, request) -> Response:
+        serializer = serializers.UtilizationQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        rows = models.UtilizationSnapshot.objects.filter(
+            scope=params["scope"],
+            resolution=params["resolution"],
+            bucket__gte=params["start"],
+            bucket__lt=params["end"],
+        )
+        if "object_id" in params:
+            rows = rows.filter(object_id=params["object_id"])
+        return Response(
+            {
+                "scope": params["scope"],
+                "resolution": params["resolution"],
+                "start": params["start"],
+                "end": params["end"],
+                "results": list(
+                    rows.order_by("object_id", "bucket").values(
+                        "object_id", "bucket", "samples", *UTILIZATION_METRICS
+                    )
+                ),
+            }
+        )
+
 
 # ------------------------------------------------------------------------------
 # Ansible Inventory ViewSets
 # ------------------------------------------------------------------------------
-class AnsibleInventoryViewSet(viewsets.ModelViewSet):
+class AnsibleInventoryViewSet(
+    VariableUpsertMixin, DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet
+):
     queryset = models.AnsibleInventory.objects.all().order_by("name")
     serializer_class = serializers.AnsibleInventorySerializer
+    variable_model = models.AnsibleInventoryVariable
+    variable_owner_field = "inventory"
 
     def get_serializer_class(self) -> Type[BaseSerializer]:
         if self.action == "create":
@@ -332,6 +508,19 @@ class AnsibleInventoryViewSet(viewsets.ModelViewSet):
             return serializers.AnsibleInventoryUpdateSerializer
         return serializers.AnsibleInventorySerializer
 
+    def get_queryset(self) -> QuerySet:
+        return (
+            super()
+            .get_queryset()
+            .annotate(
+                groups_count=count_subquery(models.AnsibleGroup, "inventory"),
+                hosts_count=count_subquery(models.AnsibleHost, "inventory"),
+                associated_variable_sets_count=count_subquery(
+                    models.AnsibleInventoryVariableSetAssociation, "inventory"
+                ),
+            )
+        )
+
     @action(detail=True, methods=["get"])
     def merged_variables(self, request, pk=None) -> Response:
         """Get merged variables for this inventory"""
@@ -339,44 +528,115 @@ class AnsibleInventoryViewSet(viewsets.ModelViewSet):
         group_id = request.query_params.get("group_id")
         host_id = request.query_params.get("host_id")
 
-        # Get merged variables
-        merged_vars = {}
-
-        # Inventory-level variables
-        for var in inventory.variables.all():
-            merged_vars[var.key] = var.get_typed_value()
+        # Only active groups of this inventory count, as in the compiled inventory
+        groups = models.AnsibleGroup.objects.filter(inventory=inventory, status="active")
+        group_ids = []
+        host_vars = {}
+        if group_id:
+            group_ids.extend(groups.filter(id=group_id).values_list("id", flat=True))
+        if host_id:
+            host = models.AnsibleHost.objects.filter(
+                id=host_id, inventory=inventory, status="active"
+            ).first()
+            if host is not None:
+                group_ids.extend(groups.filter(hosts=host).values_list("id", flat=True))
+                host_vars = dict(host.structured_variables.values_list("key", "typed_value"))
+
+        # Inventory vars, then inherited and own group vars, then host vars; inactive
+        # ancestors are left out of the lineages like inactive groups
+        resolver = inventory.variable_resolver(groups.values_list("id", flat=True))
+        merged_vars = resolver.host_variables(group_ids, host_vars)
 
-        # Associated variable sets
-        associated_sets = inventory.associated_variable_sets.filter(
-            enabled=True, variable_set__status="active"
-        ).order_by("load_priority", "variable_set__priority")
+        return Response(merged_vars)
 
-        for association in associated_sets:
-            set_vars = association.variable_set.get_parsed_content()
-            merged_vars.update(set_vars)
+    @action(detail=True, methods=["post"])
+    def merged_host_variables(self, request, pk=None) -> Response:
+        """
+        Get the fully merged variables of many hosts in one call, either the hosts
+        listed in ``host_ids`` or every host in the inventory (``all_hosts: true``)
+        """
+        inventory = self.get_object()
+        params = serializers.MergedHostVariablesRequestSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        host_ids = [str(host_id) for host_id in params.validated_data.get("host_ids", [])]
 
-        # Group variables if specified
-        if group_id:
-            try:
-                group = models.AnsibleGroup.objects.get(id=group_id)
-                for var in group.variables.all():
-                    merged_vars[var.key] = var.get_typed_value()
-            except models.AnsibleGroup.DoesNotExist:
-                pass
+        compiled = CompiledInventory.get(inventory)
+        merged = compiled.merged_host_variables(
+            None if params.validated_data["all_hosts"] else host_ids
+        )
+        return Response(
+            {
+                "count": len(merged),
+                "hosts": {
+                    host_id: {"name": compiled.host_ids[host_id], "variables": variables}
+                    for host_id, variables in merged.items()
+                },
+                "missing": [host_id for host_id in host_ids if host_id not in merged],
+            }
+        )
 
-        # Host variables if specified
-        if host_id:
-            try:
-                host = models.AnsibleHost.objects.get(id=host_id)
-                for var in host.structured_variables.all():
-                    merged_vars[var.key] = var.get_typed_value()
-            except models.AnsibleHost.DoesNotExist:
-                pass
+    def compiled_inventory_response(
+        self, request, build: Callable[[CompiledInventory], Any]
+    ) -> Response:
+        """
+        Respond with data derived from the cached compiled inventory, tagged with an
+        ETag tied to the inventory's content version so unchanged polls get a 304
+        """
+        inventory = self.get_object()
+        fingerprint = ":".join(
+            [
+                str(inventory.pk),
+                str(inventory.content_version),
+                self.action,
+                request.accepted_renderer.format,
+                request.query_params.urlencode(),
+            ]
+        )
+        etag = quote_etag(hashlib.sha256(fingerprint.encode()).hexdigest()[:32])
+        if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(build(CompiledInventory.get(inventory)))
+        response["ETag"] = etag
+        return response
+
+    @action(
+        detail=True,
+        methods=["get"],
+        renderer_classes=[JSONRenderer, YAMLRenderer, AnsibleINIRenderer, NDJSONRenderer],
+    )
+    def export(self, request, pk=None) -> HttpResponseBase:
+        """
+        Export the whole inventory as an Ansible static inventory (?format=json|yaml|ini),
+        or stream it as NDJSON records (?format=ndjson)
+        """
+        if request.accepted_renderer.format == NDJSONRenderer.format:
+            inventory = self.get_object()
+            return streaming_export_response(
+                iter_inventory_records(inventory), NDJSONRenderer.format, inventory.name
+            )
+        return self.compiled_inventory_response(request, lambda compiled: compiled.as_dict())
 
-        return Response(merged_vars)
+    @action(detail=True, methods=["get"])
+    def dynamic_inventory(self, request, pk=None) -> Response:
+        """
+        Ansible dynamic inventory protocol: the ``--list`` document with ``_meta.hostvars``,
+        or the variables of a single host with ``?host=<name>``
+        """
+        host = request.query_params.get("host")
+        if host is not None:
+            return self.compiled_inventory_response(
+                request, lambda compiled: compiled.hostvars.get(host, {})
+            )
+        return self.compiled_inventory_response(
+            request, lambda compiled: compiled.as_dynamic_inventory()
+        )
 
 
-class AnsibleInventoryVariableViewSet(viewsets.ModelViewSet):
+class AnsibleInventoryVariableViewSet(
+    DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet
+):
     queryset = models.AnsibleInventoryVariable.objects.all().order_by("inventory__name", "key")
     serializer_class = serializers.AnsibleInventoryVariableSerializer
 
@@ -388,7 +648,7 @@ class AnsibleInventoryVariableViewSet(viewsets.ModelViewSet):
         return serializers.AnsibleInventoryVariableSerializer
 
 
-class AnsibleVariableSetViewSet(viewsets.ModelViewSet):
+class AnsibleVariableSetViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.AnsibleVariableSet.objects.all().order_by("priority", "name")
     serializer_class = serializers.AnsibleVariableSetSerializer
 
@@ -399,17 +659,28 @@ class AnsibleVariableSetViewSet(viewsets.ModelViewSet):
             return serializers.AnsibleVariableSetUpdateSerializer
         return serializers.AnsibleVariableSetSerializer
 
+    def get_queryset(self) -> QuerySet:
+        return (
+            super()
+            .get_queryset()
+            .annotate(
+                associated_inventories_count=count_subquery(
+                    models.AnsibleInventoryVariableSetAssociation, "variable_set"
+                )
+            )
+        )
+
     @action(detail=False, methods=["get"])
     def by_tags(self, request) -> Response:
         """Get variable sets filtered by tags"""
         tags = request.query_params.getlist("tags")
         if tags:
             # Use AND logic: all specified tags must be present
-            queryset = self.queryset.filter(status="active")
+            queryset = self.get_queryset().filter(status="active")
             for tag in tags:
                 queryset = queryset.filter(tags__contains=tag)
         else:
-            queryset = self.queryset.filter(status="active")
+            queryset = self.get_queryset().filter(status="active")
 
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
@@ -422,7 +693,9 @@ class AnsibleVariableSetViewSet(viewsets.ModelViewSet):
         return Response({"valid": is_valid})
 
 
-class AnsibleInventoryVariableSetAssociationViewSet(viewsets.ModelViewSet):
+class AnsibleInventoryVariableSetAssociationViewSet(
+    DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet
+):
     queryset = models.AnsibleInventoryVariableSetAssociation.objects.all().order_by(
         "inventory__name", "load_priority"
     )
@@ -436,7 +709,7 @@ class AnsibleInventoryVariableSetAssociationViewSet(viewsets.ModelViewSet):
         return serializers.AnsibleInventoryVariableSetAssociationSerializer
 
 
-class AnsibleHostVariableViewSet(viewsets.ModelViewSet):
+class AnsibleHostVariableViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.AnsibleHostVariable.objects.all().order_by("host__id", "key")
     serializer_class = serializers.AnsibleHostVariableSerializer
 
@@ -448,7 +721,7 @@ class AnsibleHostVariableViewSet(viewsets.ModelViewSet):
         return serializers.AnsibleHostVariableSerializer
 
 
-class AnsibleInventoryPluginViewSet(viewsets.ModelViewSet):
+class AnsibleInventoryPluginViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.AnsibleInventoryPlugin.objects.all().order_by(
         "inventory__name", "priority", "name"
     )
@@ -462,7 +735,9 @@ class AnsibleInventoryPluginViewSet(viewsets.ModelViewSet):
         return serializers.AnsibleInventoryPluginSerializer
 
 
-class AnsibleInventoryTemplateViewSet(viewsets.ModelViewSet):
+class AnsibleInventoryTemplateViewSet(
+    DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet
+):
     queryset = models.AnsibleInventoryTemplate.objects.all().order_by("name")
     serializer_class = serializers.AnsibleInventoryTemplateSerializer
 
@@ -493,9 +768,13 @@ class AnsibleInventoryTemplateViewSet(viewsets.ModelViewSet):
             return Response({"error": str(e)}, status=400)
 
 
-class AnsibleGroupViewSet(viewsets.ModelViewSet):
+class AnsibleGroupViewSet(
+    VariableUpsertMixin, DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet
+):
     queryset = models.AnsibleGroup.objects.all().order_by("name")
     serializer_class = serializers.AnsibleGroupSerializer
+    variable_model = models.AnsibleGroupVariable
+    variable_owner_field = "group"
 
     def get_serializer_class(self) -> Type[BaseSerializer]:
         if self.action == "create":
@@ -527,7 +806,7 @@ class AnsibleGroupViewSet(viewsets.ModelViewSet):
         )
 
 
-class AnsibleGroupVariableViewSet(viewsets.ModelViewSet):
+class AnsibleGroupVariableViewSet(DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = models.AnsibleGroupVariable.objects.all().order_by("group__name", "key")
     serializer_class = serializers.AnsibleGroupVariableSerializer
 
@@ -539,7 +818,9 @@ class AnsibleGroupVariableViewSet(viewsets.ModelViewSet):
         return serializers.AnsibleGroupVariableSerializer
 
 
-class AnsibleGroupRelationshipViewSet(viewsets.ModelViewSet):
+class AnsibleGroupRelationshipViewSet(
+    DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet
+):
     queryset = models.AnsibleGroupRelationship.objects.all().order_by(
         "parent_group__name", "child_group__name"
     )
@@ -553,9 +834,13 @@ class AnsibleGroupRelationshipViewSet(viewsets.ModelViewSet):
         return serializers.AnsibleGroupRelationshipSerializer
 
 
-class AnsibleHostViewSet(viewsets.ModelViewSet):
+class AnsibleHostViewSet(
+    VariableUpsertMixin, DynamicFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet
+):
     queryset = models.AnsibleHost.objects.all().order_by("id")
     serializer_class = serializers.AnsibleHostSerializer
+    variable_model = models.AnsibleHostVariable
+    variable_owner_field = "host"
 
     def get_serializer_class(self) -> Type[BaseSerializer]:
         if self.action == "create":
@@ -564,6 +849,15 @@ class AnsibleHostViewSet(viewsets.ModelViewSet):
             return serializers.AnsibleHostUpdateSerializer
         return serializers.AnsibleHostSerializer
 
+    @action(detail=False, methods=["post"])
+    def enroll(self, request) -> Response:
+        """Enroll many VMs/baremetals into an inventory and its groups in one call"""
+        serializer = serializers.AnsibleHostEnrollmentSerializer(
+            data=request.data, context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save(), status=status.HTTP_201_CREATED)
+
 
 # ------------------------------------------------------------------------------
 # System Info ViewSet
@@ -0,0 +1,108 @@
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+)
+
+
+class VariableResolver:
+    """
+    Effective variables of groups and hosts, following Ansible's precedence.
+
+    Each group's effective variables are the inventory-wide ``base_vars``, then the
+    variables of every group in its lineage (the group and all its ancestors) from
+    the shallowest to the deepest, ties broken by name, so children override their
+    parents. A host gets the same treatment over the union of its groups' lineages,
+    then its own variables on top.
+
+    Depths and lineages are computed once, in topological order over the group DAG
+    (cycles left by legacy data are broken), and merged layers are memoized, so
+    resolving many groups or hosts of the same inventory only merges each distinct
+    set of groups once. Groups are identified by any hashable key; ``names`` maps
+    keys to group names for tie-breaking.
+    """
+
+    def __init__(
+        self,
+        base_vars: Mapping[str, Any],
+        group_vars: Mapping[Hashable, Mapping[str, Any]],
+        parents: Mapping[Hashable, Iterable[Hashable]],
+        names: Optional[Mapping[Hashable, str]] = None,
+    ) -> None:
+        self.base_vars = dict(base_vars)
+        self.group_vars = group_vars
+        self.names = names if names is not None else {key: str(key) for key in group_vars}
+        self.parents: Dict[Hashable, List[Hashable]] = {key: [] for key in group_vars}
+        for child, child_parents in parents.items():
+            if child in self.parents:
+                self.parents[child] = [parent for parent in child_parents if parent in group_vars]
+
+        self.depths: Dict[Hashable, int] = {}
+        self.lineages: Dict[Hashable, FrozenSet[Hashable]] = {}
+        for key in self._topological_order():
+            # Ansible puts "all" at depth 0 and its children at depth 1
+            self.depths[key] = (
+                0
+                if self.names.get(key) == "all"
+                else 1 + max((self.depths[parent] for parent in self.parents[key]), default=0)
+            )
+            self.lineages[key] = frozenset([key]).union(
+                *(self.lineages[parent] for parent in self.parents[key])
+            )
+        self._layers: Dict[FrozenSet[Hashable], Dict[str, Any]] = {}
+
+    def _topological_order(self) -> List[Hashable]:
+        """
+        Groups ordered so that every parent comes before its children. Legacy data may
+        hold cycles; like the closure migration, an edge to a group still being
+        visited is ignored (and dropped from ``parents``) instead of followed.
+        """
+        order: List[Hashable] = []
+        done: Set[Hashable] = set()
+        visiting: Set[Hashable] = set()
+        end = object()
+        for root in sorted(self.parents, key=lambda key: (self.names.get(key, ""), str(key))):
+            if root in done:
+                continue
+            visiting.add(root)
+            stack = [(root, iter(list(self.parents[root])))]
+            while stack:
+                key, pending = stack[-1]
+                parent = next(pending, end)
+                if parent is end:
+                    stack.pop()
+                    visiting.discard(key)
+                    done.add(key)
+                    order.append(key)
+                elif parent in visiting:
+                    self.parents[key].remove(parent)
+                elif parent not in done:
+                    visiting.add(parent)
+                    stack.append((parent, iter(list(self.parents[parent]))))
+        return order
+
+    def _layer(self, group_keys: FrozenSet[Hashable]) -> Dict[str, Any]:
+        if group_keys not in self._layers:
+            lineage = frozenset().union(*(self.lineages[key] for key in group_keys))
+            layer = dict(self.base_vars)
+            for key in sorted(lineage, key=lambda k: (self.depths[k], self.names.get(k, ""))):
+                layer.update(self.group_vars[key])
+            self._layers[group_keys] = layer
+        return self._layers[group_keys]
+
+    def group_variables(self, group_key: Hashable) -> Dict[str, Any]:
+        """Effective variables of one group, including everything it inherits"""
+        return dict(self._layer(frozenset([group_key])))
+
+    def host_variables(
+        self, group_keys: Iterable[Hashable], host_vars: Mapping[str, Any]
+    ) -> Dict[str, Any]:
+        """Effective variables of a host in ``group_keys`` with its own ``host_vars``"""
+        direct = frozenset(key for key in group_keys if key in self.lineages)
+        return {**self._layer(direct), **host_vars}
@@ -199,6 +199,18 @@ GUARDIAN_MONKEY_PATCH_USER = False
 # URL Configuration
 APPEND_SLASH = False  # Disable automatic trailing slash to avoid redirect errors
 
+# =============================================================================
+# Ansible Inventory Cache
+# =============================================================================
+# Compiled inventories are cached per content version; the version is bumped on
+# every change, so the timeout only bounds memory use
+ANSIBLE_INVENTORY_CACHE_TIMEOUT = int(os.environ.get("ANSIBLE_INVENTORY_CACHE_TIMEOUT", "3600"))
+
+# Parsed variable set contents kept per process, keyed by (set id, content hash)
+ANSIBLE_VARIABLE_SET_PARSE_CACHE_SIZE = int(
+    os.environ.get("ANSIBLE_VARIABLE_SET_PARSE_CACHE_SIZE", "256")
+)
+
 # =============================================================================
 # Django REST Framework Configuration
 # =============================================================================
@@ -210,7 +222,7 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "inventory_api.api.permissions.HasPermissionForObject",
     ],
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "inventory_api.api.pagination.DefaultPagination",
     "PAGE_SIZE": int(os.environ.get("DRF_PAGE_SIZE", "10")),
     "DEFAULT_SCHEMA_CLASS": "inventory_api.schema.CustomAutoSchema",
     "DEFAULT_RENDERER_CLASSES": [